@@ -1,18 +1,53 @@
-from django.contrib import admin
-from .models import RuckusR1TenantConfig, RuckusR1SyncLog, RuckusR1Client
-
-@admin.register(RuckusR1TenantConfig)
-class RuckusR1TenantConfigAdmin(admin.ModelAdmin):
-    list_display = ("tenant", "api_base_url", "ruckus_tenant_id", "enabled", "last_sync", "last_sync_status")
-    search_fields = ("tenant__name", "api_base_url", "ruckus_tenant_id")
-
-@admin.register(RuckusR1SyncLog)
-class RuckusR1SyncLogAdmin(admin.ModelAdmin):
-    list_display = ("tenant", "started", "finished", "status", "devices", "interfaces", "vlans", "ips", "wlans", "cables", "clients")
-    search_fields = ("tenant__name", "status")
-
-@admin.register(RuckusR1Client)
-class RuckusR1ClientAdmin(admin.ModelAdmin):
-    list_display = ("tenant", "mac", "ip", "ssid", "vlan", "ap_serial", "last_seen")
-    search_fields = ("tenant__name", "mac", "ip", "ssid", "ap_serial")
- 
\ No newline at end of file
+from django.contrib import admin
+from .models import (
+    RuckusR1TenantConfig, RuckusR1SyncLog, RuckusR1Client, RuckusR1ClientObservation, RuckusR1ObjectMap,
+    RuckusR1SyncProfile, RuckusR1TopologySnapshot,
+)
+
+@admin.register(RuckusR1TenantConfig)
+class RuckusR1TenantConfigAdmin(admin.ModelAdmin):
+    list_display = ("tenant", "api_base_url", "ruckus_tenant_id", "enabled", "last_sync", "last_sync_status")
+    search_fields = ("tenant__name", "api_base_url", "ruckus_tenant_id")
+
+@admin.register(RuckusR1SyncLog)
+class RuckusR1SyncLogAdmin(admin.ModelAdmin):
+    list_display = ("tenant", "started", "finished", "status", "devices", "interfaces", "vlans", "ips", "wlans", "cables", "clients")
+    search_fields = ("tenant__name", "status")
+
+@admin.register(RuckusR1Client)
+class RuckusR1ClientAdmin(admin.ModelAdmin):
+    list_display = ("tenant", "mac", "ip", "ssid", "vlan", "ap_serial", "last_seen")
+    search_fields = ("tenant__name", "mac", "ip", "ssid", "ap_serial")
+ 
+
+@admin.register(RuckusR1ObjectMap)
+class RuckusR1ObjectMapAdmin(admin.ModelAdmin):
+    list_display = ("tenant_config", "object_type", "r1_key", "netbox_content_type", "netbox_object_id", "last_r1_name", "last_seen")
+    list_filter = ("object_type",)
+    search_fields = ("r1_key", "last_r1_name")
+
+
+@admin.register(RuckusR1ClientObservation)
+class RuckusR1ClientObservationAdmin(admin.ModelAdmin):
+    list_display = ("tenant", "mac", "observed", "ruckus_id", "ip_address", "ssid", "vlan")
+    search_fields = ("mac", "ruckus_id", "ip_address")
+
+
+@admin.register(RuckusR1TopologySnapshot)
+class RuckusR1TopologySnapshotAdmin(admin.ModelAdmin):
+    list_display = ("tenant_config", "venue_name", "venue_id", "node_count", "edge_count", "changed_in_last_check", "last_changed", "last_checked")
+    list_filter = ("tenant_config",)
+    search_fields = ("venue_name", "venue_id")
+    exclude = ("blob",)
+    readonly_fields = ("content_hash", "previous_hash", "applied_keys", "last_checked", "last_changed")
+
+    @admin.display(boolean=True, description="Changed in last run")
+    def changed_in_last_check(self, obj):
+        return obj.changed_in_last_check
+
+
+@admin.register(RuckusR1SyncProfile)
+class RuckusR1SyncProfileAdmin(admin.ModelAdmin):
+    list_display = ("sync_log", "created", "profiler", "seconds", "size")
+    exclude = ("data",)
+    readonly_fields = ("sync_log", "created", "profiler", "seconds", "size", "top_functions")
@@ -22,7 +22,12 @@ class RuckusR1TenantConfigSerializer(NetBoxModelSerializer):
             "authoritative_devices", "authoritative_interfaces", "authoritative_ips",
             "authoritative_vlans", "authoritative_wireless", "authoritative_cabling",
             "default_site_group", "default_device_role", "default_manufacturer",
-            "last_sync", "last_sync_status", "last_sync_message",
+
+            # performance
+            "venue_workers", "incremental_sync", "full_sync_interval_hours", "sync_watermarks", "changelog_mode",
+            "client_storage_mode", "client_raw_storage", "query_stats", "profile_sync", "memory_stats",
+
+            "last_sync", "last_full_sync", "last_sync_status", "last_sync_message",
         ]
 
 
@@ -33,9 +38,10 @@ class RuckusR1SyncLogSerializer(NetBoxModelSerializer):
             "id", "url", "display", "created", "last_updated",
             "tenant",
             "status", "summary", "message", "error",
-            "started", "finished",
+            "started", "finished", "sync_mode", "phase", "watermarks",
             "venues", "networks", "devices", "interfaces", "macs", "vlans", "ips",
             "wlans", "wlan_groups", "tunnels", "cables", "clients",
+            "venue_results", "stats", "timings",
         ]
 
 
@@ -1,6 +1,12 @@
+from django.http import HttpResponse
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.response import Response
+
 from netbox.api.viewsets import NetBoxModelViewSet
 
-from ..models import RuckusR1TenantConfig, RuckusR1SyncLog, RuckusR1Client
+from ..models import RuckusR1TenantConfig, RuckusR1SyncLog, RuckusR1SyncProfile, RuckusR1Client
+from ..sync import materialize_clients
 from .serializers import (
     RuckusR1TenantConfigSerializer,
     RuckusR1SyncLogSerializer,
@@ -17,7 +23,36 @@ class RuckusR1SyncLogViewSet(NetBoxModelViewSet):
     queryset = RuckusR1SyncLog.objects.all()
     serializer_class = RuckusR1SyncLogSerializer
 
+    @action(detail=True, methods=["get"], url_path="profile")
+    def profile(self, request, pk=None):
+        """GET the run's cProfile capture as a pstats file (404 if the run was not profiled)."""
+        try:
+            profile = self.get_object().profile
+        except RuckusR1SyncProfile.DoesNotExist:
+            raise NotFound("This sync run was not profiled.")
+        response = HttpResponse(profile.get_data(), content_type="application/octet-stream")
+        response["Content-Disposition"] = f'attachment; filename="{profile.filename}"'
+        return response
+
 
 class RuckusR1ClientViewSet(NetBoxModelViewSet):
     queryset = RuckusR1Client.objects.all()
     serializer_class = RuckusR1ClientSerializer
+
+    @action(detail=False, methods=["post"], url_path="materialize")
+    def materialize(self, request):
+        """POST {"ids": [...]} or {"macs": [...]}: create/update dcim devices for the selected clients."""
+        if not request.user.has_perm("dcim.add_device"):
+            raise PermissionDenied("Materializing clients requires the dcim.add_device permission.")
+        ids = request.data.get("ids") or []
+        macs = [str(m).strip().lower() for m in (request.data.get("macs") or [])]
+        if not ids and not macs:
+            raise ValidationError("Provide 'ids' or 'macs'.")
+        qs = self.get_queryset()
+        qs = qs.filter(pk__in=ids) if ids else qs.filter(mac__in=macs)
+        return Response(dict(materialize_clients(qs)))
+
+    @action(detail=True, methods=["get"], url_path="raw")
+    def raw(self, request, pk=None):
+        """GET the client's R1 row, expanded from the stored (full, projected, compressed or hash-only) form."""
+        return Response(self.get_object().get_raw())
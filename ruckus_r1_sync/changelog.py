@@ -0,0 +1,188 @@
+"""
+Coalesced change logging for sync runs (TenantConfig.changelog_mode = "summary").
+
+NetBox writes one ObjectChange row and refreshes the search cache on every save(). While a
+ChangeCollector is active in the current context (one venue transaction):
+  - NetBox's own change logging is suspended (it only logs while a request is set),
+  - each changed object gets one ObjectChange (its last state) written in one bulk insert on flush(),
+    attributed to the user/request that started the sync, or to SYNC_USER_NAME in a system job,
+  - search cache updates are skipped per save and done per model in one pass on flush().
+Outside a collector (other threads, UI requests, changelog_mode = "full") nothing changes.
+
+Event rules and webhooks are queued by NetBox's change logging as well, so objects changed in summary
+mode trigger none of them; use changelog_mode = "full" (the default) where those must fire.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from netbox.context import current_request
+
+_collector: ContextVar[Optional["ChangeCollector"]] = ContextVar("ruckus_r1_sync_change_collector", default=None)
+
+# user_name of the ObjectChanges written for syncs without a request (system jobs, management command)
+SYNC_USER_NAME = "ruckus_r1_sync"
+
+
+def _object_change_model():
+    # core.ObjectChange since NetBox 4.1, extras.ObjectChange before
+    try:
+        return apps.get_model("core", "ObjectChange")
+    except LookupError:
+        return apps.get_model("extras", "ObjectChange")
+
+
+class ChangeCollector:
+    def __init__(self, request=None, *, defer_search: bool = False) -> None:
+        self.request = request
+        self.request_id = getattr(request, "id", None) or uuid.uuid4()
+        self.defer_search = defer_search
+        # (content_type_id, pk) -> (action, instance); "create" wins over later updates
+        self.changes: Dict[Tuple[int, Any], Tuple[str, Any]] = {}
+        self.deletes: List[Any] = []
+        self.reindex: Dict[Tuple[type, Any], Any] = {}
+
+    def record_save(self, instance, created: bool) -> None:
+        if not hasattr(instance, "to_objectchange"):
+            return
+        key = (ContentType.objects.get_for_model(instance.__class__).id, instance.pk)
+        prev = self.changes.get(key)
+        action = "create" if created or (prev and prev[0] == "create") else "update"
+        self.changes[key] = (action, instance)
+
+    def record_delete(self, instance) -> None:
+        self.reindex.pop((instance.__class__, instance.pk), None)
+        if not hasattr(instance, "to_objectchange"):
+            return
+        key = (ContentType.objects.get_for_model(instance.__class__).id, instance.pk)
+        prev = self.changes.pop(key, None)
+        if prev and prev[0] == "create":
+            return  # created and deleted within the same batch: nothing to report
+        self.deletes.append(instance.to_objectchange("delete"))
+
+    def _attribute(self, change) -> None:
+        user = getattr(self.request, "user", None)
+        if user is not None and getattr(user, "is_authenticated", False):
+            change.user = user
+            change.user_name = user.username
+        else:
+            change.user_name = SYNC_USER_NAME
+        change.request_id = self.request_id
+
+    def flush(self) -> Counter:
+        """Write the collected ObjectChanges and search cache entries; call inside the venue transaction."""
+        stats: Counter = Counter()
+        changes = [instance.to_objectchange(action) for action, instance in self.changes.values()] + self.deletes
+        if changes:
+            for change in changes:
+                self._attribute(change)
+            _object_change_model().objects.bulk_create(changes, batch_size=1000)
+            stats["changelog_entries"] += len(changes)
+        self.changes = {}
+        self.deletes = []
+
+        if self.reindex:
+            from netbox.search.backends import search_backend
+
+            by_model: Dict[type, List[Any]] = {}
+            for (model, _), instance in self.reindex.items():
+                by_model.setdefault(model, []).append(instance)
+            for model, instances in by_model.items():
+                try:
+                    # savepoint: a failing indexer must not poison the venue transaction
+                    with transaction.atomic():
+                        search_backend.cache(instances, remove_existing=True)
+                    stats["search_reindexed"] += len(instances)
+                except Exception:
+                    stats["search_reindex_failed"] += len(instances)
+            self.reindex = {}
+        return stats
+
+
+# -----------------
+# Search cache deferral
+# -----------------
+
+_search_lock = threading.Lock()
+_search_handler = None  # NetBox's post_save search cache receiver, once _deferred_search_handler stands in for it
+
+
+def _deferred_search_handler(sender, instance, **kwargs) -> None:
+    # short-circuits only inside a collector of the current context; everywhere else NetBox's receiver runs as is
+    collector = _collector.get()
+    if collector is not None and collector.defer_search:
+        collector.reindex[(instance.__class__, instance.pk)] = instance
+        return
+    _search_handler(sender, instance=instance, **kwargs)
+
+
+def _install_search_deferral() -> bool:
+    """
+    Put _deferred_search_handler in the place of NetBox's search cache receiver (once per process). It calls
+    the original receiver unchanged for every save outside a ChangeCollector, so other threads and requests keep
+    indexing per save. Returns False if NetBox's receiver could not be found; saves are then indexed one by one.
+    """
+    global _search_handler
+    with _search_lock:
+        if _search_handler is not None:
+            return True
+        try:
+            from netbox.search.backends import search_backend
+        except Exception:
+            return False
+        handler = getattr(search_backend, "caching_handler", None)
+        if handler is None:
+            return False
+        # connect the stand-in first: no save in between goes unindexed
+        _search_handler = handler
+        post_save.connect(_deferred_search_handler, weak=False, dispatch_uid="ruckus_r1_sync_deferred_search")
+        if not post_save.disconnect(handler):
+            post_save.disconnect(dispatch_uid="ruckus_r1_sync_deferred_search")
+            _search_handler = None
+            return False
+        return True
+
+
+@receiver(post_save, dispatch_uid="ruckus_r1_sync_collect_save")
+def _collect_save(sender, instance, created=False, raw=False, **kwargs) -> None:
+    collector = _collector.get()
+    if collector is not None and not raw:
+        collector.record_save(instance, created)
+
+
+@receiver(pre_delete, dispatch_uid="ruckus_r1_sync_collect_delete")
+def _collect_delete(sender, instance, **kwargs) -> None:
+    collector = _collector.get()
+    if collector is not None:
+        collector.record_delete(instance)
+
+
+@contextmanager
+def coalesced_changes(enabled: bool) -> Iterator[Optional[ChangeCollector]]:
+    """
+    Collect changes instead of logging and indexing every save while the block runs (yields None when disabled).
+    The caller flushes the collector before its transaction commits; unflushed changes are dropped.
+    """
+    if not enabled:
+        yield None
+        return
+    collector = ChangeCollector(current_request.get(), defer_search=_install_search_deferral())
+    token = _collector.set(collector)
+    request_token = current_request.set(None)
+    try:
+        yield collector
+    finally:
+        current_request.reset(request_token)
+        _collector.reset(token)
@@ -101,6 +101,17 @@ class RuckusR1TenantConfigForm(NetBoxModelForm):
 
             # Venue selection
             "venues_selected",
+
+            # Performance
+            "venue_workers",
+            "incremental_sync",
+            "full_sync_interval_hours",
+            "changelog_mode",
+            "client_storage_mode",
+            "client_raw_storage",
+            "query_stats",
+            "profile_sync",
+            "memory_stats",
         ]
 
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,132 @@
+"""
+Client observation history (RuckusR1ClientObservation).
+
+On PostgreSQL the table is partitioned by RANGE (observed), one partition per calendar month (UTC), named
+<table>_pYYYYMM. Partitions are created on demand before rows are written and dropped as a whole once they
+are older than the retention window, so retention never deletes rows one by one. On other databases the
+table is a plain table and retention falls back to batched deletes.
+"""
+
+from __future__ import annotations
+
+import datetime
+import threading
+from typing import Iterable, List, Optional, Set
+
+from django.db import connection, transaction
+
+from .models import RuckusR1ClientObservation
+
+_lock = threading.Lock()
+_known_partitions: Set[str] = set()
+_partitioned: Optional[bool] = None
+
+
+def _table() -> str:
+    return RuckusR1ClientObservation._meta.db_table
+
+
+def is_partitioned() -> bool:
+    """True if the observation table is a PostgreSQL partitioned table (checked once per process)."""
+    global _partitioned
+    if _partitioned is None:
+        if connection.vendor != "postgresql":
+            _partitioned = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [_table()])
+                row = cursor.fetchone()
+            _partitioned = bool(row) and row[0] == "p"
+    return _partitioned
+
+
+def month_start(dt: datetime.datetime) -> datetime.datetime:
+    dt = dt.astimezone(datetime.timezone.utc) if dt.tzinfo else dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(month: datetime.datetime) -> datetime.datetime:
+    return month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+
+
+def partition_name(month: datetime.datetime) -> str:
+    return f"{_table()}_p{month:%Y%m}"
+
+
+def ensure_partitions(times: Iterable[datetime.datetime]) -> None:
+    """Create the monthly partitions covering `times` (no-op if unpartitioned or already created)."""
+    if not is_partitioned():
+        return
+    months = {month_start(t) for t in times if t is not None}
+    with _lock:
+        for month in sorted(months):
+            name = partition_name(month)
+            if name in _known_partitions:
+                continue
+            # bounds are generated here, not user input; DDL does not take bind parameters
+            sql = (
+                f"CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(name)} "
+                f"PARTITION OF {connection.ops.quote_name(_table())} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+            )
+            try:
+                # savepoint: a partition created concurrently by another worker must not abort the caller
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(sql)
+            except Exception:
+                if not _partition_exists(name):
+                    raise
+            # only cached once committed; a rolled back venue transaction takes its partition with it
+            transaction.on_commit(lambda name=name: _known_partitions.add(name))
+
+
+def _partition_exists(name: str) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+        return bool(cursor.fetchone()[0])
+
+
+def _partitions() -> List[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname",
+            [_table()],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def drop_history_before(cutoff: datetime.datetime, *, batch_size: int = 5000) -> int:
+    """
+    Remove observations older than `cutoff`. Partitioned: drops every monthly partition that ends at or before
+    `cutoff` and returns the number of partitions dropped. Otherwise: deletes rows in primary-key batches and
+    returns the number of rows deleted.
+    """
+    if not is_partitioned():
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                ids = list(
+                    RuckusR1ClientObservation.objects.filter(observed__lt=cutoff)
+                    .order_by("pk").values_list("pk", flat=True)[:batch_size]
+                )
+                if not ids:
+                    return deleted
+                deleted += RuckusR1ClientObservation.objects.filter(pk__in=ids).delete()[0]
+
+    prefix = f"{_table()}_p"
+    dropped = 0
+    for name in _partitions():
+        suffix = name[len(prefix):] if name.startswith(prefix) else ""
+        try:
+            month = datetime.datetime.strptime(suffix, "%Y%m").replace(tzinfo=datetime.timezone.utc)
+        except ValueError:
+            continue  # not one of ours
+        if next_month(month) > cutoff:
+            continue
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {connection.ops.quote_name(name)}")
+        with _lock:
+            _known_partitions.discard(name)
+        dropped += 1
+    return dropped
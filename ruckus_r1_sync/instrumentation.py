@@ -0,0 +1,479 @@
+"""
+Per-phase timing and memory figures for sync runs (stored in RuckusR1SyncLog.stats["phases"]).
+
+RSS is process-wide: with parallel venue workers it covers all of them, which is what matters for
+sizing the worker. `rss_max_mb` is the highest RSS sampled while the phase ran (not the process lifetime
+high-water mark, which never goes down and would blame a phase for what an earlier one allocated).
+
+Venue timings (RuckusR1SyncLog.timings) split each venue phase into API wait, JSON decode (fetch stage,
+measured per thread by the API client) and DB apply (apply stage) seconds.
+
+Query stats (RuckusR1SyncLog.stats["queries"], opt-in) count statements and DB time per phase and venue through
+a connection execute wrapper; when disabled no wrapper is installed at all.
+
+The run profiler (opt-in) captures a whole sync run with cProfile; the pstats dump is stored as a
+RuckusR1SyncProfile next to the sync log.
+
+Memory stats (RuckusR1SyncLog.stats["memory"], opt-in) use tracemalloc: net and peak allocation per phase
+and per venue (fetch and apply stage) plus the allocation sites that grew most in each phase. tracemalloc
+traces the whole process, so with parallel venue workers a venue's figures include what concurrent venues
+allocated at the same time; run with one venue worker for exact per-venue attribution.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import heapq
+import itertools
+import marshal
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import connection
+
+
+def current_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 1048576, 1)
+    except Exception:
+        return None
+
+
+# seconds between RSS samples while a phase runs
+RSS_SAMPLE_INTERVAL = 0.25
+
+
+class RssSampler:
+    """
+    Highest RSS of the process while the block runs: sampled at start and end and every `interval` seconds
+    in between by a daemon thread. Without /proc (not Linux) max_mb stays None and no thread is started.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.max_mb: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        rss = current_rss_mb()
+        if rss is not None and (self.max_mb is None or rss > self.max_mb):
+            self.max_mb = rss
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "RssSampler":
+        self._sample()
+        if self.max_mb is not None:
+            self._thread = threading.Thread(target=self._loop, name="ruckus-r1-rss", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+
+
+@contextmanager
+def phase(name: str, phases: Dict[str, Dict[str, Any]], memory: Optional["MemoryTracker"] = None) -> Iterator[None]:
+    """
+    Record duration and RSS (start/end/sampled max) of the block under phases[name]; repeated phases add up.
+    With a MemoryTracker the phase's traced allocations and top growing sites are recorded as well.
+    """
+    started = time.monotonic()
+    rss_start = current_rss_mb()
+    sampler = RssSampler()
+    try:
+        with sampler, memory.phase(name) if memory is not None else nullcontext():
+            yield
+    finally:
+        entry = phases.setdefault(name, {"seconds": 0.0, "rss_start_mb": rss_start})
+        entry["seconds"] = round(entry["seconds"] + time.monotonic() - started, 2)
+        entry["rss_end_mb"] = current_rss_mb()
+        if sampler.max_mb is not None:
+            entry["rss_max_mb"] = max(entry.get("rss_max_mb") or 0.0, sampler.max_mb)
+
+
+# Venue phases in sync order; "vlan_map" only has a fetch side (its VLANs are applied with the ports)
+TIMING_PHASES = ("venue_mapping", "aps", "switches", "vlan_map", "ports", "wifi_clients", "wired_clients", "topology")
+TIMING_KINDS = ("api", "decode", "apply")
+
+
+@contextmanager
+def timed(timings: Dict[str, Dict[str, float]], name: str, api: Any = None) -> Iterator[None]:
+    """
+    Add the block to timings[name]. With `api` (a RuckusR1Client) the block is a fetch: its API wait and
+    JSON decode time on this thread are added. Without, the whole block counts as DB apply time.
+    """
+    started = time.monotonic()
+    before = api.io_seconds() if api is not None else None
+    try:
+        yield
+    finally:
+        entry = timings.setdefault(name, dict.fromkeys(TIMING_KINDS, 0.0))
+        if before is None:
+            entry["apply"] += time.monotonic() - started
+        else:
+            wait, decode = api.io_seconds()
+            entry["api"] += wait - before[0]
+            entry["decode"] += decode - before[1]
+
+
+def _rounded(entry: Dict[str, float]) -> Dict[str, float]:
+    out = {k: round(entry.get(k, 0.0), 3) for k in TIMING_KINDS}
+    out["total"] = round(sum(out.values()), 3)
+    return out
+
+
+def timing_summary(
+    venue_timings: Iterable[Dict[str, Any]],
+    run_timings: Optional[Dict[str, Dict[str, float]]] = None,
+) -> Dict[str, Any]:
+    """
+    Build RuckusR1SyncLog.timings from per-venue {"venue_id", "name", "timings"} dicts and run-level
+    timings (e.g. the venue mapping prefetch):
+      {"phases": {phase: {api, decode, apply, total}}, "venues": {venue_id: {name, total, phases}}}
+    """
+    totals: Dict[str, Dict[str, float]] = {}
+    venues: Dict[str, Any] = {}
+
+    def _add(name: str, entry: Dict[str, float]) -> None:
+        total = totals.setdefault(name, dict.fromkeys(TIMING_KINDS, 0.0))
+        for k in TIMING_KINDS:
+            total[k] += entry.get(k, 0.0)
+
+    for name, entry in (run_timings or {}).items():
+        _add(name, entry)
+    for venue in venue_timings:
+        phases = {name: _rounded(entry) for name, entry in (venue.get("timings") or {}).items()}
+        for name, entry in (venue.get("timings") or {}).items():
+            _add(name, entry)
+        venues[venue["venue_id"]] = {
+            "name": venue.get("name") or venue["venue_id"],
+            "total": round(sum(p["total"] for p in phases.values()), 3),
+            "phases": phases,
+        }
+
+    order = {name: i for i, name in enumerate(TIMING_PHASES)}
+    return {
+        "phases": {name: _rounded(totals[name]) for name in sorted(totals, key=lambda n: order.get(n, len(order)))},
+        "venues": venues,
+    }
+
+
+# (venue_id, phase) the current thread's queries are counted under
+_query_scope: ContextVar[Tuple[str, str]] = ContextVar("ruckus_r1_query_scope", default=("", "run"))
+
+QUERY_SLOWEST_DEFAULT = 10
+_SQL_MAX = 1000
+_DISTINCT_SQL_MAX = 5000
+
+
+class QueryStats:
+    """
+    Statement count and DB time per phase and per venue for one sync run, plus the slowest statements and
+    the most repeated ones (SQL text with placeholders, so an N+1 loop shows up as one statement with a
+    high count). Thread-safe: apply workers share the instance, each installs it on its own connection.
+    """
+
+    def __init__(self, slowest: int = QUERY_SLOWEST_DEFAULT) -> None:
+        self.slowest_n = max(1, slowest)
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.venues: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._slowest: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._repeated: Dict[Tuple[str, str], List[float]] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self._record(sql, many, time.monotonic() - started)
+
+    def _record(self, sql: str, many: bool, seconds: float) -> None:
+        venue_id, phase_name = _query_scope.get()
+        with self._lock:
+            entries = [self.phases.setdefault(phase_name, {"queries": 0, "seconds": 0.0})]
+            if venue_id:
+                entries.append(self.venues.setdefault(venue_id, {}).setdefault(phase_name, {"queries": 0, "seconds": 0.0}))
+            for entry in entries:
+                entry["queries"] += 1
+                entry["seconds"] += seconds
+
+            key = (phase_name, sql)
+            repeated = self._repeated.get(key)
+            if repeated is not None:
+                repeated[0] += 1
+                repeated[1] += seconds
+            elif len(self._repeated) < _DISTINCT_SQL_MAX:
+                self._repeated[key] = [1, seconds]
+
+            if len(self._slowest) < self.slowest_n or seconds > self._slowest[0][0]:
+                item = (seconds, next(self._seq), {
+                    "sql": sql[:_SQL_MAX], "seconds": round(seconds, 4), "phase": phase_name,
+                    "venue_id": venue_id, "many": bool(many),
+                })
+                if len(self._slowest) < self.slowest_n:
+                    heapq.heappush(self._slowest, item)
+                else:
+                    heapq.heapreplace(self._slowest, item)
+
+    @contextmanager
+    def scope(self, phase_name: str, venue_id: Optional[str] = None) -> Iterator[None]:
+        """Count the block's queries under `phase_name` (and `venue_id`, default: the enclosing venue)."""
+        token = _query_scope.set((_query_scope.get()[0] if venue_id is None else venue_id, phase_name))
+        try:
+            if self in connection.execute_wrappers:
+                yield
+            else:
+                with connection.execute_wrapper(self):
+                    yield
+        finally:
+            _query_scope.reset(token)
+
+    def as_dict(self) -> Dict[str, Any]:
+        def _rounded(entry: Dict[str, float]) -> Dict[str, Any]:
+            return {"queries": int(entry["queries"]), "seconds": round(entry["seconds"], 3)}
+
+        with self._lock:
+            repeated = sorted(self._repeated.items(), key=lambda kv: kv[1][0], reverse=True)[: self.slowest_n]
+            return {
+                "total": _rounded({
+                    "queries": sum(e["queries"] for e in self.phases.values()),
+                    "seconds": sum(e["seconds"] for e in self.phases.values()),
+                }),
+                "phases": {name: _rounded(e) for name, e in self.phases.items()},
+                "venues": {
+                    venue_id: {name: _rounded(e) for name, e in phases.items()}
+                    for venue_id, phases in self.venues.items()
+                },
+                "slowest": [item for _, _, item in sorted(self._slowest, reverse=True)],
+                "repeated": [
+                    {"sql": sql[:_SQL_MAX], "phase": phase_name, "count": int(n), "seconds": round(sec, 3)}
+                    for (phase_name, sql), (n, sec) in repeated
+                ],
+            }
+
+
+def query_scope(stats: Optional[QueryStats], phase_name: str, venue_id: Optional[str] = None) -> ContextManager[None]:
+    """QueryStats.scope, or a no-op context when query stats are off."""
+    return nullcontext() if stats is None else stats.scope(phase_name, venue_id)
+
+
+class SyncProfiler:
+    """
+    cProfile capture of one sync run. Before Python 3.12 a profiler only sees the thread that enabled it, so
+    pipeline worker threads profile themselves (`thread()`) and their stats are merged into the run's; from
+    3.12 on the run's profiler already covers every thread and the per-thread profilers are skipped.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._profiles: List[cProfile.Profile] = []
+        self._main: Optional[cProfile.Profile] = None
+        self._started = 0.0
+        self.seconds = 0.0
+
+    def start(self) -> None:
+        self._main = cProfile.Profile()
+        self._started = time.monotonic()
+        self._main.enable()
+
+    def stop(self) -> None:
+        if self._main is None:
+            return
+        self._main.disable()
+        self.seconds = round(time.monotonic() - self._started, 2)
+        with self._lock:
+            self._profiles.insert(0, self._main)
+        self._main = None
+
+    @contextmanager
+    def thread(self) -> Iterator[None]:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # another profiler is active interpreter-wide (3.12+): this thread is already being captured
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+
+    def stats(self) -> Optional[pstats.Stats]:
+        with self._lock:
+            profiles = [p for p in self._profiles if p.getstats()]
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def dump(self) -> bytes:
+        """The merged stats in pstats file format (what `Stats.dump_stats` writes; loads with snakeviz, flameprof...)."""
+        stats = self.stats()
+        return marshal.dumps(stats.stats) if stats is not None else b""  # type: ignore[attr-defined]
+
+    def top(self, n: int = 30) -> List[Dict[str, Any]]:
+        """The `n` functions with the highest cumulative time."""
+        stats = self.stats()
+        if stats is None:
+            return []
+        rows = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:n]  # type: ignore[attr-defined]
+        return [
+            {
+                "function": pstats.func_std_string(func),
+                "calls": nc,
+                "tottime": round(tt, 4),
+                "cumtime": round(ct, 4),
+            }
+            for func, (_cc, nc, tt, ct, _callers) in rows
+        ]
+
+
+def profiled(profiler: Optional[SyncProfiler], fn: Callable[..., Any]) -> Callable[..., Any]:
+    """`fn` run under profiler.thread() (unchanged when the run is not profiled); for thread targets."""
+    if profiler is None:
+        return fn
+
+    @functools.wraps(fn)
+    def _wrapper(*args: Any, **kwargs: Any) -> Any:
+        with profiler.thread():
+            return fn(*args, **kwargs)
+
+    return _wrapper
+
+
+MEMORY_TOP_DEFAULT = 10
+
+
+def _mb(size: float) -> float:
+    return round(size / 1048576, 3)
+
+
+def _site(frame: tracemalloc.Frame) -> str:
+    # last path components are enough to find the line, and keep the stored stats short
+    return f"{'/'.join(frame.filename.replace(os.sep, '/').split('/')[-3:])}:{frame.lineno}"
+
+
+class MemoryTracker:
+    """
+    tracemalloc accounting for one sync run. Every block reports net (end - start) and peak (above start)
+    traced memory. tracemalloc has a single process-wide peak, so before each reset the peak is folded into
+    every open block; nested and concurrent blocks therefore all see their true high-water mark.
+    Phases additionally compare a snapshot at start and end and keep the sites that grew most.
+    """
+
+    def __init__(self, top: int = MEMORY_TOP_DEFAULT, frames: int = 1) -> None:
+        self.top = max(1, top)
+        self.frames = max(1, frames)
+        self._lock = threading.Lock()
+        self._open: List[Dict[str, int]] = []
+        self._started = False
+        self.peak = 0
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.venues: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+        tracemalloc.reset_peak()
+
+    def stop(self) -> None:
+        # leave tracing alone if somebody else started it
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def _fold(self) -> int:
+        current, peak = tracemalloc.get_traced_memory()
+        for block in self._open:
+            block["peak"] = max(block["peak"], peak)
+        self.peak = max(self.peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    @contextmanager
+    def block(self, target: Dict[str, Any]) -> Iterator[None]:
+        """Write net_mb / peak_mb (above the start) / traced_peak_mb of the block into `target`."""
+        if not tracemalloc.is_tracing():
+            yield
+            return
+        with self._lock:
+            start = self._fold()
+            block = {"peak": start}
+            self._open.append(block)
+        try:
+            yield
+        finally:
+            with self._lock:
+                end = self._fold()
+                self._open = [b for b in self._open if b is not block]  # identity: equal dicts are other blocks
+            target["net_mb"] = round(target.get("net_mb", 0.0) + _mb(end - start), 3)
+            target["peak_mb"] = max(target.get("peak_mb", 0.0), _mb(block["peak"] - start))
+            target["traced_peak_mb"] = max(target.get("traced_peak_mb", 0.0), _mb(block["peak"]))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        with self._lock:
+            target = self.phases.setdefault(name, {})
+        before = self._snapshot() if tracemalloc.is_tracing() else None
+        with self.block(target):
+            yield
+        if before is not None and tracemalloc.is_tracing():
+            growth = [d for d in self._snapshot().compare_to(before, "lineno") if d.size_diff > 0][: self.top]
+            target["top_growth"] = [
+                {"site": _site(d.traceback[0]), "size_diff_mb": _mb(d.size_diff), "count_diff": d.count_diff}
+                for d in growth
+            ]
+
+    def venue(self, venue_id: str, stage: str) -> ContextManager[None]:
+        """Block for one venue's `stage` ("fetch": R1 payload held in memory, "apply": NetBox writes)."""
+        with self._lock:
+            target = self.venues.setdefault(venue_id, {}).setdefault(stage, {})
+        return self.block(target)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            if tracemalloc.is_tracing():
+                self._fold()
+            return {
+                "frames": self.frames,
+                "traced_peak_mb": _mb(self.peak),
+                "phases": {name: dict(entry) for name, entry in self.phases.items()},
+                "venues": {venue_id: {k: dict(v) for k, v in stages.items()} for venue_id, stages in self.venues.items()},
+            }
+
+
+def memory_scope(tracker: Optional[MemoryTracker], venue_id: str, stage: str) -> ContextManager[None]:
+    """MemoryTracker.venue, or a no-op context when memory stats are off."""
+    return nullcontext() if tracker is None else tracker.venue(venue_id, stage)
@@ -5,8 +5,20 @@ So plugin-defined UI Jobs are not supported via subclassing Job here.
 
 What *does* work (as you already saw in the registry) is `JobRunner` + `@system_job(interval=<minutes>)`.
 
-This file registers ONE system job:
-- RUCKUS One Sync (all enabled)  -> runs every <interval> minutes (default 15) and syncs all enabled configs.
+This file registers three system jobs, one per sync phase (intervals in minutes, plugin settings):
+- RUCKUS One Sync (all enabled)     -> full pass, every `full_sync_job_interval` (default 1440)
+- RUCKUS One Sync (infrastructure)  -> everything but clients, every `infrastructure_sync_job_interval` (default 60)
+- RUCKUS One Sync (clients)         -> client refresh only, every `client_sync_job_interval` (default 5)
+Each phase writes its own RuckusR1SyncLog rows (`phase`), so a client refresh never waits for a topology run.
+
+A fourth job, RUCKUS One Client Purge, deletes clients unseen for `client_retention_days` (default 30)
+every `client_purge_job_interval` (default 60) in primary-key batches, and drops client history partitions
+older than `client_history_retention_days` (default 90, see retention.py).
+
+Runs of conflicting phases of one config do not overlap (PostgreSQL advisory locks, `config_run_lock`):
+"all" and "infrastructure" exclude each other, "clients" only excludes another client refresh and keeps running
+alongside them (client writes of the same venue take turns per venue transaction). A phase job that finds its
+phase busy skips the config until its next interval.
 
 It also implements 'stop after N failures' (default 3) per config:
 - counter stored in RuckusR1TenantConfig.custom_field_data['sync_failures']
@@ -25,15 +37,13 @@ from django.db import transaction
 from netbox.jobs import JobRunner, system_job
 
 from .models import RuckusR1TenantConfig
-from .sync import run_sync_for_tenantconfig
+from .plugin import plugin_cfg
+from .retention import purge_client_history, purge_stale_clients
+from .sync import config_run_lock, run_sync_for_tenantconfig
 
 FAIL_KEY = "sync_failures"
 FAIL_LIMIT_DEFAULT = 3
 
-# Adjust this to your needs (minutes). 15 is a practical default.
-DEFAULT_INTERVAL_MINUTES = 15
-
-
 def _get_failures(cfg: RuckusR1TenantConfig) -> int:
     data = cfg.custom_field_data or {}
     try:
@@ -65,37 +75,102 @@ def _record_failure(cfg: RuckusR1TenantConfig, stop_after_failures: int) -> int:
         cfg.save(update_fields=["custom_field_data", "enabled", "last_updated"])
         return failures
 
-DEFAULT_INTERVAL_MINUTES = 60
-@system_job(interval=DEFAULT_INTERVAL_MINUTES)
-class RuckusSyncAllEnabled(JobRunner):
-    """RUCKUS One Sync (all enabled) - System Job"""
 
-    class Meta:
-        name = "RUCKUS One Sync (all enabled)"
+def _job_interval(key: str, default: int) -> int:
+    try:
+        return max(1, int(plugin_cfg(key, default) or default))
+    except Exception:
+        return default
 
-    def run(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
-        self.logger.warning("RUCKUS SYSTEM JOB RUNNING")
-        stop_after_failures = int(kwargs.get("stop_after_failures", FAIL_LIMIT_DEFAULT))
 
-        ok = 0
-        fail = 0
-        skipped = 0
+DEFAULT_INTERVAL_MINUTES = 1440
+INFRASTRUCTURE_INTERVAL_MINUTES = 60
+CLIENT_INTERVAL_MINUTES = 5
+CLIENT_PURGE_INTERVAL_MINUTES = 60
 
-        for cfg in RuckusR1TenantConfig.objects.order_by("id"):
-            if not cfg.enabled:
-                skipped += 1
-                continue
 
+def _sync_enabled_configs(job: JobRunner, scope: str, **kwargs: Any) -> Dict[str, Any]:
+    """Run one sync phase for every enabled config; shared by the system jobs below."""
+    stop_after_failures = int(kwargs.get("stop_after_failures", FAIL_LIMIT_DEFAULT))
+
+    ok = 0
+    fail = 0
+    skipped = 0
+    busy = 0
+
+    for cfg in RuckusR1TenantConfig.objects.order_by("id"):
+        if not cfg.enabled:
+            skipped += 1
+            continue
+
+        # a conflicting phase still running (e.g. an hours-long "all" pass for "infrastructure") wins
+        with config_run_lock(cfg, scope) as acquired:
+            if not acquired:
+                job.logger.info("Sync (%s) skipped for TenantConfig id=%s: a conflicting sync of it is running", scope, cfg.pk)
+                busy += 1
+                continue
             try:
-                run_sync_for_tenantconfig(cfg)
+                run_sync_for_tenantconfig(cfg, scope=scope)
                 _record_success(cfg)
                 ok += 1
             except Exception as e:
                 failures = _record_failure(cfg, stop_after_failures)
-                self.logger.error(
-                    "Sync failed for TenantConfig id=%s (failures=%s/%s): %s",
-                    cfg.pk, failures, stop_after_failures, e,
+                job.logger.error(
+                    "Sync (%s) failed for TenantConfig id=%s (failures=%s/%s): %s",
+                    scope, cfg.pk, failures, stop_after_failures, e,
                 )
                 fail += 1
 
-        return {"ok": ok, "fail": fail, "skipped": skipped}
+    return {"scope": scope, "ok": ok, "fail": fail, "skipped": skipped, "busy": busy}
+
+
+@system_job(interval=_job_interval("full_sync_job_interval", DEFAULT_INTERVAL_MINUTES))
+class RuckusSyncAllEnabled(JobRunner):
+    """RUCKUS One Sync (all enabled) - System Job. Full pass (all phases); the only one that reconciles client devices."""
+
+    class Meta:
+        name = "RUCKUS One Sync (all enabled)"
+
+    def run(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        self.logger.warning("RUCKUS SYSTEM JOB RUNNING")
+        return _sync_enabled_configs(self, "all", **kwargs)
+
+
+@system_job(interval=_job_interval("infrastructure_sync_job_interval", INFRASTRUCTURE_INTERVAL_MINUTES))
+class RuckusSyncInfrastructure(JobRunner):
+    """RUCKUS One Sync (infrastructure) - WLANs, APs, switches, ports, VLANs, cabling, wireless links; no clients."""
+
+    class Meta:
+        name = "RUCKUS One Sync (infrastructure)"
+
+    def run(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        return _sync_enabled_configs(self, "infrastructure", **kwargs)
+
+
+@system_job(interval=_job_interval("client_sync_job_interval", CLIENT_INTERVAL_MINUTES))
+class RuckusSyncClients(JobRunner):
+    """RUCKUS One Sync (clients) - fast client table refresh, independent of the infrastructure run."""
+
+    class Meta:
+        name = "RUCKUS One Sync (clients)"
+
+    def run(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        return _sync_enabled_configs(self, "clients", **kwargs)
+
+
+@system_job(interval=_job_interval("client_purge_job_interval", CLIENT_PURGE_INTERVAL_MINUTES))
+class RuckusPurgeClients(JobRunner):
+    """RUCKUS One Client Purge - deletes RUCKUS R1 clients not seen for the retention window, in small batches,
+    and expired client history partitions."""
+
+    class Meta:
+        name = "RUCKUS One Client Purge"
+
+    def run(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        stats = purge_stale_clients()
+        stats["history_dropped"] = purge_client_history()
+        self.logger.info(
+            "Purged %s stale clients in %s batches, dropped %s history partitions",
+            stats["deleted"], stats["batches"], stats["history_dropped"],
+        )
+        return dict(stats)
@@ -3,7 +3,7 @@ from django.core.management.base import BaseCommand, CommandError
 from tenancy.models import Tenant
 
 from ruckus_r1_sync.models import RuckusR1TenantConfig
-from ruckus_r1_sync.sync import run_sync_for_tenantconfig
+from ruckus_r1_sync.sync import SYNC_SCOPES, config_run_lock, run_sync_for_tenantconfig
 
 
 class Command(BaseCommand):
@@ -22,10 +22,52 @@ class Command(BaseCommand):
             dest="all_configs",
             help="Run sync for all enabled tenant configs",
         )
+        parser.add_argument(
+            "--force-full",
+            action="store_true",
+            dest="force_full",
+            help="Ignore stored content hashes and re-apply every object",
+        )
+        parser.add_argument(
+            "--plan",
+            action="store_true",
+            dest="plan_only",
+            help="Dry run: fetch from R1 and report create/update/delete counts without writing to NetBox",
+        )
+        parser.add_argument(
+            "--scope",
+            choices=SYNC_SCOPES,
+            default="all",
+            help="Sync phase: all (default), infrastructure (no clients) or clients (client refresh only)",
+        )
+        parser.add_argument(
+            "--query-stats",
+            action="store_true",
+            dest="query_stats",
+            help="Count DB queries per phase and venue for this run (stored in the sync log), regardless of the config",
+        )
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            dest="profile",
+            help="Run the sync under cProfile and attach the profile to its sync log, regardless of the config",
+        )
+        parser.add_argument(
+            "--memory-stats",
+            action="store_true",
+            dest="memory_stats",
+            help="Trace allocations per phase and venue for this run (stored in the sync log), regardless of the config",
+        )
 
     def handle(self, *args, **options):
         tenant_id = options.get("tenant_id")
         all_configs = options.get("all_configs")
+        force_full = bool(options.get("force_full"))
+        plan_only = bool(options.get("plan_only"))
+        scope = options.get("scope") or "all"
+        query_stats = True if options.get("query_stats") else None
+        profile = True if options.get("profile") else None
+        memory_stats = True if options.get("memory_stats") else None
 
         try:
             if all_configs:
@@ -36,7 +78,16 @@ class Command(BaseCommand):
 
                 for cfg in configs:
                     self.stdout.write(f"Running sync for config #{cfg.pk} (tenant={cfg.tenant_id}, name={cfg.name})")
-                    run_sync_for_tenantconfig(cfg.pk)
+                    with config_run_lock(cfg, scope) as acquired:
+                        if not acquired:
+                            self.stdout.write(self.style.WARNING(f"Config #{cfg.pk} is being synced already, skipped."))
+                            continue
+                        msg = run_sync_for_tenantconfig(
+                            cfg.pk, force_full=force_full, plan_only=plan_only, scope=scope,
+                            query_stats=query_stats, profile=profile, memory_stats=memory_stats,
+                        )
+                    if plan_only:
+                        self.stdout.write(msg)
 
                 self.stdout.write(self.style.SUCCESS(f"Done. Synced {configs.count()} configs."))
                 return
@@ -57,7 +108,15 @@ class Command(BaseCommand):
                 return
 
             self.stdout.write(f"Running sync for config #{cfg.pk} (tenant={tenant_id}, name={cfg.name})")
-            run_sync_for_tenantconfig(cfg.pk)
+            with config_run_lock(cfg, scope) as acquired:
+                if not acquired:
+                    raise CommandError(f"Config #{cfg.pk} is being synced already; try again when that run has finished.")
+                msg = run_sync_for_tenantconfig(
+                    cfg.pk, force_full=force_full, plan_only=plan_only, scope=scope,
+                    query_stats=query_stats, profile=profile, memory_stats=memory_stats,
+                )
+            if plan_only:
+                self.stdout.write(msg)
             self.stdout.write(self.style.SUCCESS("Sync finished successfully."))
 
         except Exception as e:
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ruckus_r1_sync.models import RuckusR1TenantConfig, RuckusR1TopologySnapshot
+
+
+class Command(BaseCommand):
+    help = "List the cached venue topologies and whether they changed in the last sync that fetched them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tenant-id",
+            type=int,
+            dest="tenant_id",
+            help="Only show venues of the config for this NetBox tenant ID",
+        )
+        parser.add_argument(
+            "--changed",
+            action="store_true",
+            dest="changed_only",
+            help="Only show venues whose topology changed in the last run",
+        )
+
+    def handle(self, *args, **options):
+        snapshots = RuckusR1TopologySnapshot.objects.select_related("tenant_config").defer("blob", "applied_keys")
+        tenant_id = options.get("tenant_id")
+        if tenant_id:
+            cfg = RuckusR1TenantConfig.objects.filter(tenant_id=tenant_id).first()
+            if not cfg:
+                raise CommandError(f"No RuckusR1TenantConfig found for tenant id={tenant_id}")
+            snapshots = snapshots.filter(tenant_config=cfg)
+
+        rows = [s for s in snapshots if s.changed_in_last_check or not options.get("changed_only")]
+        if not rows:
+            self.stdout.write("No topology snapshots.")
+            return
+
+        for s in rows:
+            state = self.style.WARNING("changed") if s.changed_in_last_check else "unchanged"
+            self.stdout.write(
+                f"{s.tenant_config.name}  {s.venue_name or s.venue_id} ({s.venue_id}): {state}, "
+                f"{s.node_count} nodes, {s.edge_count} edges, "
+                f"last changed {s.last_changed:%Y-%m-%d %H:%M}, last checked {s.last_checked:%Y-%m-%d %H:%M}"
+            )
+        changed = sum(1 for s in rows if s.changed_in_last_check)
+        self.stdout.write(self.style.SUCCESS(f"{changed} of {len(rows)} venue topologies changed in the last run."))
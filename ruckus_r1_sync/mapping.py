@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import copy
+import threading
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Iterable, Optional, Tuple
 
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.utils.text import slugify
 
 from dcim.models import Location, Site, SiteGroup
@@ -60,103 +63,256 @@ def _resolve_parent_site(locations_parent_site, tenant: Optional[Tenant]) -> Sit
     raise ValueError(f"Parent site not found: {locations_parent_site!r}")
 
 
-@transaction.atomic
-def map_venue_to_netbox(
-    *,
-    venue_id: str,
-    venue_name: str,
-    tenant: Optional[Tenant],
-    mode: str,
-    site_group: Optional[SiteGroup] = None,
-    locations_parent_site=None,
-    child_location_name: str = "Venue",
-    slug_prefix: str = "r1",
-) -> VenueMapping:
-    """Map a RUCKUS One venue to NetBox objects.
+class VenueMappingCache:
+    """Maps RUCKUS One venues to NetBox objects for one sync run.
 
     Modes:
       - sites:        create/reuse Site per venue, no Location
       - locations:    reuse existing parent Site, create/reuse Location per venue name under it
       - both:         create/reuse Site per venue AND create/reuse child Location under that Site
+
+    `prefetch()` resolves the parent site once and loads every Site/Location the run's venues can map to
+    (by name or identity map pk) in a few queries; with `create=True` it also creates the missing Sites and
+    Locations. `map()` and `lookup()` then resolve venues from memory and only write when a venue was renamed
+    or its tenant/group changed. Shared by the venue workers of one run: the lock only guards the dicts,
+    never a save(), so one worker's slow write does not stall the others. Like _RefCache, objects written
+    inside a transaction are published only once it commits; cached instances are never changed in place,
+    so a rolled-back venue leaves the cache as it was.
     """
-    mode = (mode or "sites").strip().lower()
-    sg = _coerce_site_group(site_group)
 
-    venue_name = (venue_name or venue_id or "Venue").strip()
-    venue_id = (venue_id or "").strip()
+    def __init__(
+        self,
+        *,
+        tenant: Optional[Tenant],
+        mode: str,
+        site_group: Optional[SiteGroup] = None,
+        locations_parent_site=None,
+        child_location_name: str = "Venue",
+        slug_prefix: str = "r1",
+    ) -> None:
+        self.tenant = tenant
+        self.mode = (mode or "sites").strip().lower()
+        self.site_group = _coerce_site_group(site_group)
+        self.locations_parent_site = locations_parent_site
+        self.child_location_name = (child_location_name or "Venue").strip() or "Venue"
+        self.slug_prefix = slug_prefix
+        self.parent_site: Optional[Site] = None
+        self.parent_error: Optional[ValueError] = None
+        self.sites: Dict[int, Site] = {}
+        self.site_names: Dict[str, Site] = {}
+        self.locations: Dict[int, Location] = {}
+        self.location_names: Dict[Tuple[int, str], Location] = {}
+        self._lock = threading.Lock()
 
-    if mode == "locations":
-        parent_site = _resolve_parent_site(locations_parent_site, tenant)
+    @property
+    def tenant_id(self) -> Optional[int]:
+        return self.tenant.id if self.tenant else None
 
-        # Location name must be unique per site -> upsert by (site, name)
-        loc_name = venue_name
-        loc, created = Location.objects.get_or_create(
-            site=parent_site,
-            name=loc_name,
-            defaults={
-                "slug": _safe_slug(loc_name, f"{slug_prefix}-{venue_id or 'venue'}"),
-                "tenant": tenant,
-            },
-        )
-        # Always update core fields if changed (rename-safe / tenant moves etc.)
-        updates = {}
-        desired_slug = _safe_slug(loc_name, f"{slug_prefix}-{venue_id or 'venue'}")
-        if not (loc.slug or "").strip():
-            updates["slug"] = desired_slug
-        if loc.slug != desired_slug and desired_slug and loc.slug and loc.slug.startswith(f"{slug_prefix}-"):
-            # only auto-adjust if it looks like ours, avoid clobbering user-managed slugs
-            updates["slug"] = desired_slug
-        if getattr(loc, "tenant_id", None) != (tenant.id if tenant else None):
-            updates["tenant"] = tenant
-        if updates:
-            for k, v in updates.items():
-                setattr(loc, k, v)
-            loc.save()
-
-        return VenueMapping(device_site=parent_site, device_location=loc)
-
-    # sites or both -> create/reuse Site per venue
-    site_name = venue_name
-    site = Site.objects.filter(name=site_name).first()
-    if site is None:
+    def _add_site(self, site: Site) -> Site:
+        old = self.sites.get(site.pk)
+        if old is not None and self.site_names.get(old.name) is old:
+            del self.site_names[old.name]
+        self.sites[site.pk] = site
+        self.site_names[site.name] = site
+        return site
+
+    def _add_location(self, loc: Location) -> Location:
+        old = self.locations.get(loc.pk)
+        if old is not None and self.location_names.get((old.site_id, old.name)) is old:
+            del self.location_names[(old.site_id, old.name)]
+        self.locations[loc.pk] = loc
+        self.location_names[(loc.site_id, loc.name)] = loc
+        return loc
+
+    def _publish(self, obj):
+        """Cache a saved Site/Location once the surrounding transaction commits (right away outside one)."""
+        add = self._add_site if isinstance(obj, Site) else self._add_location
+
+        def _add() -> None:
+            with self._lock:
+                add(obj)
+
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(_add)
+        else:
+            _add()
+        return obj
+
+    def prefetch(self, venues: Iterable[Tuple[str, str]], known: Optional[Dict[str, int]] = None, *, create: bool = True):
+        """
+        Load the Sites/Locations for `venues` ((venue_id, venue_name) pairs). `known` maps venue ids to the
+        Site (sites/both) or Location (locations) pk from the identity map.
+        """
+        venues = [((vid or "").strip(), (name or vid or "Venue").strip()) for vid, name in venues]
+        known = known or {}
+        names = {name for _, name in venues}
+
+        if self.mode == "locations":
+            try:
+                self.parent_site = _resolve_parent_site(self.locations_parent_site, self.tenant)
+            except ValueError as e:
+                self.parent_error = e
+                return self
+            for loc in Location.objects.filter(Q(site=self.parent_site, name__in=names) | Q(pk__in=known.values())):
+                self._add_location(loc)
+            if create:
+                for vid, name in venues:
+                    if self._known_location(known.get(vid)) is None and (self.parent_site.pk, name) not in self.location_names:
+                        self._try_create_location(self.parent_site, name, vid)
+            return self
+
+        for site in Site.objects.filter(Q(name__in=names) | Q(pk__in=known.values())):
+            self._add_site(site)
+        if create:
+            missing: Dict[str, str] = {}
+            for vid, name in venues:
+                if not isinstance(self.sites.get(known.get(vid)), Site) and name not in self.site_names:
+                    missing.setdefault(name, vid)
+            for name, vid in missing.items():
+                self._try_create_site(name, vid)
+
+        if self.mode == "both":
+            for loc in Location.objects.filter(site_id__in=list(self.sites), name=self.child_location_name):
+                self._add_location(loc)
+            if create:
+                for site in list(self.sites.values()):
+                    if (site.pk, self.child_location_name) not in self.location_names:
+                        self._try_create_location(site, self.child_location_name, "")
+        return self
+
+    def _create_site(self, name: str, venue_id: str) -> Site:
         site = Site.objects.create(
-            name=site_name,
-            slug=_safe_slug(site_name, f"{slug_prefix}-{venue_id or 'site'}"),
-            group=sg,
-            tenant=tenant,
+            name=name,
+            slug=_safe_slug(name, f"{self.slug_prefix}-{venue_id or 'site'}"),
+            group=self.site_group,
+            tenant=self.tenant,
         )
-    else:
-        # update group/tenant/slug if needed (do not overwrite custom slug unless empty)
-        changed = False
-        if sg and getattr(site, "group_id", None) != sg.id:
-            site.group = sg
-            changed = True
-        if getattr(site, "tenant_id", None) != (tenant.id if tenant else None):
-            site.tenant = tenant
-            changed = True
-        if not (site.slug or "").strip():
-            site.slug = _safe_slug(site_name, f"{slug_prefix}-{venue_id or 'site'}")
-            changed = True
-        if changed:
-            site.save()
+        return self._publish(site)
 
-    if mode == "both":
-        cname = (child_location_name or "Venue").strip()
-        if not cname:
-            cname = "Venue"
+    def _try_create_site(self, name: str, venue_id: str) -> None:
+        # a failing Site (e.g. slug taken) is left to map(), which fails only that venue
+        try:
+            with transaction.atomic():
+                self._create_site(name, venue_id)
+        except IntegrityError:
+            pass
+
+    def _create_location(self, site: Site, name: str, venue_id: str) -> Location:
         loc, _ = Location.objects.get_or_create(
             site=site,
-            name=cname,
+            name=name,
             defaults={
-                "slug": _safe_slug(cname, f"{slug_prefix}-{venue_id or 'venue'}"),
-                "tenant": tenant,
+                "slug": _safe_slug(name, f"{self.slug_prefix}-{venue_id or 'venue'}"),
+                "tenant": self.tenant,
             },
         )
-        # keep tenant aligned
-        if getattr(loc, "tenant_id", None) != (tenant.id if tenant else None):
-            loc.tenant = tenant
-            loc.save()
-        return VenueMapping(device_site=site, device_location=loc)
-
-    # sites
-    return VenueMapping(device_site=site, device_location=None)
+        return self._publish(loc)
+
+    def _try_create_location(self, site: Site, name: str, venue_id: str) -> None:
+        # a failing Location (e.g. slug taken) is left to map(), which fails only that venue
+        try:
+            with transaction.atomic():
+                self._create_location(site, name, venue_id)
+        except IntegrityError:
+            pass
+
+    def _known_location(self, pk) -> Optional[Location]:
+        loc = self.locations.get(pk)
+        return loc if loc is not None and self.parent_site is not None and loc.site_id == self.parent_site.pk else None
+
+    def map(self, *, venue_id: str, venue_name: str, known_pk: Optional[int] = None) -> VenueMapping:
+        """
+        Site/Location of a venue, created if missing. `known_pk` is the Site (sites/both) or Location
+        (locations) pk from the identity map; that object is reused instead of matching by name, and renamed
+        if the venue was renamed.
+        """
+        venue_name = (venue_name or venue_id or "Venue").strip()
+        venue_id = (venue_id or "").strip()
+        if self.mode == "locations":
+            if self.parent_error is not None:
+                raise self.parent_error
+            with self._lock:
+                taken = self.location_names.get((self.parent_site.pk, venue_name))
+                loc = self._known_location(known_pk) or taken
+            if loc is None:
+                loc = self._create_location(self.parent_site, venue_name, venue_id)
+            updates = {}
+            if loc.name != venue_name and (taken is None or taken.pk == loc.pk):
+                updates["name"] = venue_name
+            desired_slug = _safe_slug(venue_name, f"{self.slug_prefix}-{venue_id or 'venue'}")
+            if not (loc.slug or "").strip():
+                updates["slug"] = desired_slug
+            if loc.slug != desired_slug and desired_slug and loc.slug and loc.slug.startswith(f"{self.slug_prefix}-"):
+                updates["slug"] = desired_slug
+            if getattr(loc, "tenant_id", None) != self.tenant_id:
+                updates["tenant"] = self.tenant
+            if updates:
+                loc = copy.copy(loc)
+                for k, v in updates.items():
+                    setattr(loc, k, v)
+                loc.save()
+                self._publish(loc)
+            return VenueMapping(device_site=self.parent_site, device_location=loc)
+
+        with self._lock:
+            site = self.sites.get(known_pk)
+            by_name = self.site_names.get(venue_name)
+        if site is not None and site.name != venue_name and by_name is None:
+            # venue renamed in R1 -> rename the mapped site
+            site = copy.copy(site)
+            site.name = venue_name
+            site.save()
+            self._publish(site)
+        if site is None:
+            site = by_name
+        if site is None:
+            site = self._create_site(venue_name, venue_id)
+        else:
+            site = copy.copy(site)
+            changed = False
+            if self.site_group and getattr(site, "group_id", None) != self.site_group.id:
+                site.group = self.site_group
+                changed = True
+            if getattr(site, "tenant_id", None) != self.tenant_id:
+                site.tenant = self.tenant
+                changed = True
+            if not (site.slug or "").strip():
+                site.slug = _safe_slug(venue_name, f"{self.slug_prefix}-{venue_id or 'site'}")
+                changed = True
+            if changed:
+                site.save()
+                self._publish(site)
+
+        if self.mode == "both":
+            with self._lock:
+                loc = self.location_names.get((site.pk, self.child_location_name))
+            if loc is None:
+                loc = self._create_location(site, self.child_location_name, venue_id)
+            if getattr(loc, "tenant_id", None) != self.tenant_id:
+                loc = copy.copy(loc)
+                loc.tenant = self.tenant
+                loc.save()
+                self._publish(loc)
+            return VenueMapping(device_site=site, device_location=loc)
+        return VenueMapping(device_site=site, device_location=None)
+
+    def lookup(self, *, venue_id: str, venue_name: str, known_pk: Optional[int] = None) -> Optional[VenueMapping]:
+        """
+        Read-only counterpart of map() (used for planning; prefetch with create=False): the existing
+        Site/Location the venue would be mapped to, or None if map() would have to create it.
+        """
+        venue_name = (venue_name or venue_id or "Venue").strip()
+        with self._lock:
+            if self.mode == "locations":
+                if self.parent_site is None:
+                    return None
+                loc = self._known_location(known_pk) or self.location_names.get((self.parent_site.pk, venue_name))
+                return VenueMapping(device_site=self.parent_site, device_location=loc) if loc else None
+
+            site = self.sites.get(known_pk) or self.site_names.get(venue_name)
+            if site is None:
+                return None
+            if self.mode == "both":
+                loc = self.location_names.get((site.pk, self.child_location_name))
+                return VenueMapping(device_site=site, device_location=loc) if loc else None
+            return VenueMapping(device_site=site, device_location=None)
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0006_ruckusr1objectmap"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1synclog",
+            name="venue_results",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="Per-venue outcome (list of {venue_id,name,status,error,duration}). Each venue commits on its own.",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="ruckusr1synclog",
+            name="status",
+            field=models.CharField(
+                choices=[("success", "success"), ("partial", "partial"), ("failed", "failed"), ("skipped", "skipped"), ("running", "running"), ("unknown", "unknown")],
+                default="unknown",
+                max_length=32,
+            ),
+        ),
+    ]
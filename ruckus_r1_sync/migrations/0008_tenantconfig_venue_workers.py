@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0007_synclog_venue_results"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1tenantconfig",
+            name="venue_workers",
+            field=models.PositiveSmallIntegerField(
+                default=1,
+                help_text="Number of venues synced in parallel (each worker uses its own DB connection). Capped by the plugin setting 'max_venue_workers'.",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0008_tenantconfig_venue_workers"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1synclog",
+            name="stats",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Run statistics for tuning (e.g. fetch/apply pipeline queue depth and stage idle times).",
+            ),
+        ),
+    ]
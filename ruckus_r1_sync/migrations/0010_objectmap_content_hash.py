@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0009_synclog_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1objectmap",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Hash of the R1 fields last applied; unchanged objects are skipped on the next sync",
+                max_length=64,
+            ),
+        ),
+    ]
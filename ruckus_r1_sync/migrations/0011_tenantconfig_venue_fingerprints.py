@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0010_objectmap_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1tenantconfig",
+            name="venue_fingerprints",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Per-venue fingerprint of the last applied R1 data ({venue_id: hash}). Unchanged venues are skipped.",
+            ),
+        ),
+    ]
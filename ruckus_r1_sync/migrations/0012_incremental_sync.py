@@ -0,0 +1,59 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0011_tenantconfig_venue_fingerprints"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1tenantconfig",
+            name="incremental_sync",
+            field=models.BooleanField(
+                default=False,
+                help_text="Only fetch APs, switches and clients changed since the last run (R1 change timestamps). A full reconciliation still runs every 'Full sync interval' hours.",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ruckusr1tenantconfig",
+            name="full_sync_interval_hours",
+            field=models.PositiveSmallIntegerField(
+                default=24,
+                help_text="Hours between full reconciliation runs when incremental sync is enabled.",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ruckusr1tenantconfig",
+            name="sync_watermarks",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Per-endpoint high-water marks of the last successful run ({endpoint: ISO timestamp}).",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ruckusr1tenantconfig",
+            name="last_full_sync",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="ruckusr1synclog",
+            name="sync_mode",
+            field=models.CharField(
+                choices=[("full", "full"), ("incremental", "incremental")],
+                default="full",
+                max_length=16,
+            ),
+        ),
+        migrations.AddField(
+            model_name="ruckusr1synclog",
+            name="watermarks",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Watermarks used as the change cutoff in incremental mode ({endpoint: ISO timestamp}).",
+            ),
+        ),
+    ]
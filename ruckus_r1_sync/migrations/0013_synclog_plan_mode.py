@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0012_incremental_sync"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="ruckusr1synclog",
+            name="sync_mode",
+            field=models.CharField(
+                choices=[("full", "full"), ("incremental", "incremental"), ("plan", "plan")],
+                default="full",
+                max_length=16,
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0013_synclog_plan_mode"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1objectmap",
+            name="venue_id",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                default="",
+                help_text="R1 venue the object was last synced from (empty for tenant-wide objects such as WLANs)",
+                max_length=128,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="ruckusr1objectmap",
+            name="object_type",
+            field=models.CharField(
+                choices=[
+                    ("venue", "Venue"),
+                    ("device", "Device"),
+                    ("vlan", "VLAN"),
+                    ("wlan", "WLAN"),
+                    ("interface", "Interface"),
+                    ("ip", "IP Address"),
+                    ("cable", "Cable"),
+                    ("wirelesslink", "Wireless Link"),
+                ],
+                max_length=32,
+            ),
+        ),
+    ]
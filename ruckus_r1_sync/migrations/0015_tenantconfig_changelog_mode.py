@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0014_objectmap_venue_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1tenantconfig",
+            name="changelog_mode",
+            field=models.CharField(
+                choices=[
+                    ("summary", "Summary (one change record per object per venue; no event rules or webhooks)"),
+                    ("full", "Full (NetBox change log, event rules and webhooks on every save)"),
+                ],
+                default="full",
+                help_text="Full logs every save like NetBox and fires event rules/webhooks. Summary coalesces the change log per venue "
+                          "but triggers no event rules or webhooks for synced objects.",
+                max_length=20,
+            ),
+        ),
+    ]
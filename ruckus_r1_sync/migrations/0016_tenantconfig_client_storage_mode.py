@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0015_tenantconfig_changelog_mode"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1tenantconfig",
+            name="client_storage_mode",
+            field=models.CharField(
+                choices=[
+                    ("devices", "Devices (dcim.Device with interface and IP per client)"),
+                    ("table", "Client table only (materialize selected clients on demand)"),
+                ],
+                default="devices",
+                help_text="Table only keeps clients in the RUCKUS R1 client table; clients materialized as devices are still updated.",
+                max_length=20,
+            ),
+        ),
+    ]
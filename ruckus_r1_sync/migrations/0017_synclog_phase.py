@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0016_tenantconfig_client_storage_mode"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1synclog",
+            name="phase",
+            field=models.CharField(
+                choices=[("all", "all"), ("infrastructure", "infrastructure"), ("clients", "clients")],
+                default="all",
+                max_length=16,
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0017_synclog_phase"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1tenantconfig",
+            name="client_raw_storage",
+            field=models.CharField(
+                choices=[
+                    ("full", "Full (complete R1 row as JSON)"),
+                    ("projected", "Projected (identity, addressing and attachment fields only)"),
+                    ("compressed", "Compressed (complete R1 row, zlib-compressed)"),
+                    ("minimal", "Minimal (content hash plus the projected fields not already in the client columns)"),
+                ],
+                default="full",
+                help_text="How much of each R1 client row is kept in the client table. Projected and minimal only skip rewriting "
+                          "clients whose tracked fields did not change.",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="ruckusr1client",
+            name="raw_compressed",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="ruckusr1client",
+            name="raw_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
@@ -0,0 +1,83 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+TABLE = "ruckus_r1_sync_ruckusr1clientobservation"
+
+
+def create_table(apps, schema_editor):
+    model = apps.get_model("ruckus_r1_sync", "RuckusR1ClientObservation")
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.create_model(model)
+        return
+    # partitioned by observed: the primary key has to include the partition key
+    tenant_table = apps.get_model("tenancy", "Tenant")._meta.db_table
+    schema_editor.execute(f"""
+        CREATE TABLE {TABLE} (
+            id bigserial NOT NULL,
+            tenant_id bigint NOT NULL REFERENCES {tenant_table} (id) DEFERRABLE INITIALLY DEFERRED,
+            mac varchar(32) NOT NULL,
+            observed timestamp with time zone NOT NULL,
+            venue_id varchar(128) NOT NULL,
+            network_id varchar(128) NOT NULL,
+            ruckus_id varchar(128) NOT NULL,
+            ip_address varchar(64) NOT NULL,
+            ssid varchar(128) NOT NULL,
+            vlan integer NULL,
+            PRIMARY KEY (id, observed)
+        ) PARTITION BY RANGE (observed)
+    """)
+    schema_editor.execute(f"CREATE INDEX ruckus_r1_obs_mac_time ON {TABLE} (tenant_id, mac, observed)")
+    schema_editor.execute(f"CREATE INDEX ruckus_r1_obs_device_time ON {TABLE} (tenant_id, ruckus_id, observed)")
+
+
+def drop_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model("ruckus_r1_sync", "RuckusR1ClientObservation"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tenancy", "0001_initial"),
+        ("ruckus_r1_sync", "0018_client_raw_storage"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="RuckusR1ClientObservation",
+                    fields=[
+                        ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                        ("mac", models.CharField(max_length=32)),
+                        ("observed", models.DateTimeField()),
+                        ("venue_id", models.CharField(blank=True, default="", max_length=128)),
+                        ("network_id", models.CharField(blank=True, default="", max_length=128)),
+                        ("ruckus_id", models.CharField(blank=True, default="", max_length=128)),
+                        ("ip_address", models.CharField(blank=True, default="", max_length=64)),
+                        ("ssid", models.CharField(blank=True, default="", max_length=128)),
+                        ("vlan", models.IntegerField(blank=True, null=True)),
+                        (
+                            "tenant",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="+",
+                                to="tenancy.tenant",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "verbose_name": "RUCKUS R1 Client Observation",
+                        "verbose_name_plural": "RUCKUS R1 Client Observations",
+                        "ordering": ("tenant", "mac", "observed"),
+                        "indexes": [
+                            models.Index(fields=["tenant", "mac", "observed"], name="ruckus_r1_obs_mac_time"),
+                            models.Index(fields=["tenant", "ruckus_id", "observed"], name="ruckus_r1_obs_device_time"),
+                        ],
+                    },
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_table, drop_table),
+            ],
+        ),
+    ]
@@ -0,0 +1,44 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0019_clientobservation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RuckusR1TopologySnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("venue_id", models.CharField(max_length=128)),
+                ("venue_name", models.CharField(blank=True, default="", max_length=200)),
+                ("content_hash", models.CharField(blank=True, default="", max_length=64)),
+                ("previous_hash", models.CharField(blank=True, default="", max_length=64)),
+                ("blob", models.BinaryField(blank=True, null=True)),
+                ("node_count", models.PositiveIntegerField(default=0)),
+                ("edge_count", models.PositiveIntegerField(default=0)),
+                ("applied_keys", models.JSONField(blank=True, default=dict)),
+                ("last_checked", models.DateTimeField(blank=True, help_text="Last sync that fetched this topology", null=True)),
+                ("last_changed", models.DateTimeField(blank=True, help_text="Last sync that found a different topology", null=True)),
+                (
+                    "tenant_config",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="topology_snapshots",
+                        to="ruckus_r1_sync.ruckusr1tenantconfig",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "RUCKUS R1 Topology Snapshot",
+                "verbose_name_plural": "RUCKUS R1 Topology Snapshots",
+                "ordering": ("tenant_config", "venue_name", "venue_id"),
+                "constraints": [
+                    models.UniqueConstraint(fields=("tenant_config", "venue_id"), name="ruckus_r1_topology_snapshot_venue_uniq"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0020_topologysnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1synclog",
+            name="timings",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Seconds per venue phase split into API wait, JSON decode and DB apply "
+                          "({phases: {phase: {api,decode,apply,total}}, venues: {venue_id: {name,total,phases}}}).",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ruckusr1synclog",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["timings"], name="ruckus_r1_synclog_timings"),
+        ),
+    ]
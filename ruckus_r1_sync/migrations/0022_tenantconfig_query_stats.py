@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0021_synclog_timings"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1tenantconfig",
+            name="query_stats",
+            field=models.BooleanField(
+                default=False,
+                help_text="Count DB queries per sync phase and venue and keep the slowest and most repeated statements "
+                          "in the sync log. Adds a little overhead to every query while enabled.",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0022_tenantconfig_query_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1tenantconfig",
+            name="profile_sync",
+            field=models.BooleanField(
+                default=False,
+                help_text="Run every sync under cProfile and attach the profile to its sync log (download from the log). "
+                          "Slows the sync down noticeably; enable while investigating.",
+            ),
+        ),
+        migrations.CreateModel(
+            name="RuckusR1SyncProfile",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("profiler", models.CharField(default="cprofile", max_length=32)),
+                ("seconds", models.FloatField(default=0.0, help_text="Wall time covered by the profile")),
+                ("data", models.BinaryField()),
+                ("size", models.PositiveIntegerField(default=0, help_text="Uncompressed size of the pstats dump (bytes)")),
+                ("top_functions", models.JSONField(blank=True, default=list)),
+                (
+                    "sync_log",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="profile",
+                        to="ruckus_r1_sync.ruckusr1synclog",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "RUCKUS R1 Sync Profile",
+                "verbose_name_plural": "RUCKUS R1 Sync Profiles",
+                "ordering": ("-created",),
+            },
+        ),
+    ]
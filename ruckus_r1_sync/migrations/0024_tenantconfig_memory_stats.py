@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ruckus_r1_sync", "0023_syncprofile"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ruckusr1tenantconfig",
+            name="memory_stats",
+            field=models.BooleanField(
+                default=False,
+                help_text="Trace allocations (tracemalloc) per sync phase and venue and keep the top growing allocation sites "
+                          "in the sync log. Slows the sync down and adds memory overhead; enable while investigating.",
+            ),
+        ),
+    ]
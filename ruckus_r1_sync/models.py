@@ -1,5 +1,11 @@
 from __future__ import annotations
 
+import json
+import zlib
+
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.urls import reverse
 from dcim.models import Site
@@ -20,6 +26,34 @@ class RuckusR1TenantConfig(NetBoxModel):
         (VENUE_MAPPING_BOTH, "Both (Venue → Site + child Location)"),
     )
 
+    CHANGELOG_SUMMARY = "summary"
+    CHANGELOG_FULL = "full"
+
+    CHANGELOG_CHOICES = (
+        (CHANGELOG_SUMMARY, "Summary (one change record per object per venue; no event rules or webhooks)"),
+        (CHANGELOG_FULL, "Full (NetBox change log, event rules and webhooks on every save)"),
+    )
+
+    CLIENT_STORAGE_DEVICES = "devices"
+    CLIENT_STORAGE_TABLE = "table"
+
+    CLIENT_STORAGE_CHOICES = (
+        (CLIENT_STORAGE_DEVICES, "Devices (dcim.Device with interface and IP per client)"),
+        (CLIENT_STORAGE_TABLE, "Client table only (materialize selected clients on demand)"),
+    )
+
+    CLIENT_RAW_FULL = "full"
+    CLIENT_RAW_PROJECTED = "projected"
+    CLIENT_RAW_COMPRESSED = "compressed"
+    CLIENT_RAW_MINIMAL = "minimal"
+
+    CLIENT_RAW_CHOICES = (
+        (CLIENT_RAW_FULL, "Full (complete R1 row as JSON)"),
+        (CLIENT_RAW_PROJECTED, "Projected (identity, addressing and attachment fields only)"),
+        (CLIENT_RAW_COMPRESSED, "Compressed (complete R1 row, zlib-compressed)"),
+        (CLIENT_RAW_MINIMAL, "Minimal (content hash plus the projected fields not already in the client columns)"),
+    )
+
     tenant = models.OneToOneField(
         to=Tenant,
         on_delete=models.CASCADE,
@@ -91,6 +125,63 @@ class RuckusR1TenantConfig(NetBoxModel):
         help_text="Required only when mapping mode is 'locations'. Devices will be placed in this site and the venue becomes a Location.",
     )
 
+    # --- Performance ---
+    venue_workers = models.PositiveSmallIntegerField(
+        default=1,
+        help_text="Number of venues synced in parallel (each worker uses its own DB connection). "
+                  "Capped by the plugin setting 'max_venue_workers'.",
+    )
+    incremental_sync = models.BooleanField(
+        default=False,
+        help_text="Only fetch APs, switches and clients changed since the last run (R1 change timestamps). "
+                  "A full reconciliation still runs every 'Full sync interval' hours.",
+    )
+    full_sync_interval_hours = models.PositiveSmallIntegerField(
+        default=24,
+        help_text="Hours between full reconciliation runs when incremental sync is enabled.",
+    )
+    sync_watermarks = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Per-endpoint high-water marks of the last successful run ({endpoint: ISO timestamp}).",
+    )
+    last_full_sync = models.DateTimeField(null=True, blank=True)
+    changelog_mode = models.CharField(
+        max_length=20,
+        choices=CHANGELOG_CHOICES,
+        default=CHANGELOG_FULL,
+        help_text="Full logs every save like NetBox and fires event rules/webhooks. Summary coalesces the change log per venue "
+                  "but triggers no event rules or webhooks for synced objects.",
+    )
+    client_storage_mode = models.CharField(
+        max_length=20,
+        choices=CLIENT_STORAGE_CHOICES,
+        default=CLIENT_STORAGE_DEVICES,
+        help_text="Table only keeps clients in the RUCKUS R1 client table; clients materialized as devices are still updated.",
+    )
+    client_raw_storage = models.CharField(
+        max_length=20,
+        choices=CLIENT_RAW_CHOICES,
+        default=CLIENT_RAW_FULL,
+        help_text="How much of each R1 client row is kept in the client table. Projected and minimal only skip rewriting "
+                  "clients whose tracked fields did not change.",
+    )
+    query_stats = models.BooleanField(
+        default=False,
+        help_text="Count DB queries per sync phase and venue and keep the slowest and most repeated statements "
+                  "in the sync log. Adds a little overhead to every query while enabled.",
+    )
+    profile_sync = models.BooleanField(
+        default=False,
+        help_text="Run every sync under cProfile and attach the profile to its sync log (download from the log). "
+                  "Slows the sync down noticeably; enable while investigating.",
+    )
+    memory_stats = models.BooleanField(
+        default=False,
+        help_text="Trace allocations (tracemalloc) per sync phase and venue and keep the top growing allocation sites "
+                  "in the sync log. Slows the sync down and adds memory overhead; enable while investigating.",
+    )
+
     # --- Venue Roadmap (neu) ---
     venues_cache = models.JSONField(
         default=list,
@@ -102,6 +193,11 @@ class RuckusR1TenantConfig(NetBoxModel):
         blank=True,
         help_text="Venue IDs selected for sync. Empty list means: sync ALL venues.",
     )
+    venue_fingerprints = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Per-venue fingerprint of the last applied R1 data ({venue_id: hash}). Unchanged venues are skipped.",
+    )
 
     last_sync = models.DateTimeField(null=True, blank=True)
     last_sync_status = models.CharField(max_length=32, default="never", blank=True)
@@ -124,6 +220,7 @@ class RuckusR1TenantConfig(NetBoxModel):
 class RuckusR1SyncLog(NetBoxModel):
     STATUS_CHOICES = (
         ("success", "success"),
+        ("partial", "partial"),
         ("failed", "failed"),
         ("skipped", "skipped"),
         ("running", "running"),
@@ -142,6 +239,24 @@ class RuckusR1SyncLog(NetBoxModel):
     status = models.CharField(max_length=32, choices=STATUS_CHOICES, default="unknown")
     summary = models.TextField(default="", blank=False)
 
+    SYNC_MODE_CHOICES = (
+        ("full", "full"),
+        ("incremental", "incremental"),
+        ("plan", "plan"),
+    )
+    sync_mode = models.CharField(max_length=16, choices=SYNC_MODE_CHOICES, default="full")
+    PHASE_CHOICES = (
+        ("all", "all"),
+        ("infrastructure", "infrastructure"),
+        ("clients", "clients"),
+    )
+    phase = models.CharField(max_length=16, choices=PHASE_CHOICES, default="all")
+    watermarks = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Watermarks used as the change cutoff in incremental mode ({endpoint: ISO timestamp}).",
+    )
+
     venues = models.IntegerField(default=0)
     networks = models.IntegerField(default=0)
     devices = models.IntegerField(default=0)
@@ -158,18 +273,44 @@ class RuckusR1SyncLog(NetBoxModel):
     error = models.TextField(default="", blank=False)
     message = models.TextField(default="", blank=False)
 
+    venue_results = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Per-venue outcome (list of {venue_id,name,status,error,duration}). Each venue commits on its own.",
+    )
+    stats = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Run statistics for tuning (e.g. fetch/apply pipeline queue depth and stage idle times).",
+    )
+    timings = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Seconds per venue phase split into API wait, JSON decode and DB apply "
+                  "({phases: {phase: {api,decode,apply,total}}, venues: {venue_id: {name,total,phases}}}).",
+    )
+
     custom_field_data = models.JSONField(default=dict, blank=True)
 
     class Meta:
         ordering = ("-created",)
         verbose_name = "RUCKUS R1 Sync Log"
         verbose_name_plural = "RUCKUS R1 Sync Logs"
+        indexes = [
+            GinIndex(fields=["timings"], name="ruckus_r1_synclog_timings"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.tenant} {self.status} ({self.created})"
 
     def get_absolute_url(self):
-        return reverse("plugins:ruckus_r1_sync:ruckusr1synclog_list")
+        return reverse("plugins:ruckus_r1_sync:ruckusr1synclog", args=[self.pk])
+
+    def venue_timings(self):
+        """Per-venue timings, slowest venue first (for the detail view)."""
+        venues = (self.timings or {}).get("venues") or {}
+        rows = [dict(v, venue_id=venue_id) for venue_id, v in venues.items()]
+        return sorted(rows, key=lambda v: v.get("total") or 0, reverse=True)
 
 
 class RuckusR1Client(NetBoxModel):
@@ -192,6 +333,8 @@ class RuckusR1Client(NetBoxModel):
     last_seen = models.DateTimeField(null=True, blank=True)
 
     raw = models.JSONField(default=dict, blank=True)
+    raw_compressed = models.BinaryField(null=True, blank=True)
+    raw_hash = models.CharField(max_length=64, blank=True, default="")
     custom_field_data = models.JSONField(default=dict, blank=True)
 
     class Meta:
@@ -207,3 +350,238 @@ class RuckusR1Client(NetBoxModel):
 
     def get_absolute_url(self):
         return reverse("plugins:ruckus_r1_sync:ruckusr1client_list")
+
+    def get_raw(self) -> dict:
+        """
+        The stored R1 row, expanded from whatever TenantConfig.client_raw_storage kept: decompressed blob,
+        projected fields ("parent.key" back to nested dicts), completed from the client columns.
+        """
+        if self.raw_compressed:
+            data = json.loads(zlib.decompress(bytes(self.raw_compressed)))
+        else:
+            data = {}
+            for key, value in (self.raw or {}).items():
+                parent, _, child = key.partition(".")
+                if child and isinstance(data.setdefault(parent, {}), dict):
+                    data[parent][child] = value
+                else:
+                    data[key] = value
+        for key, value in (("macAddress", self.mac), ("ipAddress", self.ip_address), ("hostname", self.hostname),
+                           ("ssid", self.ssid), ("vlan", self.vlan), ("networkId", self.network_id)):
+            if value not in (None, ""):
+                data.setdefault(key, value)
+        return data
+
+
+class RuckusR1ClientObservationQuerySet(models.QuerySet):
+    def at(self, mac: str, when):
+        """The observation in effect for `mac` at `when` (latest one not after it), or None."""
+        return self.filter(mac=mac, observed__lte=when).order_by("-observed").first()
+
+    def on_device(self, ruckus_id: str, since=None, until=None):
+        """Observations attaching clients to an AP/switch (R1 serial) within [since, until]."""
+        qs = self.filter(ruckus_id=ruckus_id)
+        if since is not None:
+            qs = qs.filter(observed__gte=since)
+        if until is not None:
+            qs = qs.filter(observed__lte=until)
+        return qs
+
+
+class RuckusR1ClientObservation(models.Model):
+    """
+    Append-only client history: one row each time a client's IP, AP/switch, SSID or VLAN changes.
+    On PostgreSQL the table is range-partitioned by `observed` (one partition per month, created on demand);
+    retention drops whole partitions (see retention.py). Written by the client upsert, never updated.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    tenant = models.ForeignKey(
+        to=Tenant,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    mac = models.CharField(max_length=32)
+    observed = models.DateTimeField()
+
+    venue_id = models.CharField(max_length=128, blank=True, default="")
+    network_id = models.CharField(max_length=128, blank=True, default="")
+    ruckus_id = models.CharField(max_length=128, blank=True, default="")
+    ip_address = models.CharField(max_length=64, blank=True, default="")
+    ssid = models.CharField(max_length=128, blank=True, default="")
+    vlan = models.IntegerField(null=True, blank=True)
+
+    objects = RuckusR1ClientObservationQuerySet.as_manager()
+
+    class Meta:
+        ordering = ("tenant", "mac", "observed")
+        verbose_name = "RUCKUS R1 Client Observation"
+        verbose_name_plural = "RUCKUS R1 Client Observations"
+        indexes = [
+            models.Index(fields=["tenant", "mac", "observed"], name="ruckus_r1_obs_mac_time"),
+            models.Index(fields=["tenant", "ruckus_id", "observed"], name="ruckus_r1_obs_device_time"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.mac} @ {self.observed:%Y-%m-%d %H:%M} ({self.ruckus_id or '-'})"
+
+
+class RuckusR1ObjectMap(NetBoxModel):
+    """
+    Identity map: stable RUCKUS One key -> NetBox object, per tenant config.
+    The sync loads it once per run and resolves venues, devices, VLANs, WLANs and interfaces through it
+    before falling back to matching by serial/name, so renames and serial-less stubs keep their object.
+    """
+
+    OBJECT_TYPE_VENUE = "venue"
+    OBJECT_TYPE_DEVICE = "device"
+    OBJECT_TYPE_VLAN = "vlan"
+    OBJECT_TYPE_WLAN = "wlan"
+    OBJECT_TYPE_INTERFACE = "interface"
+    OBJECT_TYPE_IP = "ip"
+    OBJECT_TYPE_CABLE = "cable"
+    OBJECT_TYPE_WIRELESSLINK = "wirelesslink"
+
+    OBJECT_TYPE_CHOICES = (
+        (OBJECT_TYPE_VENUE, "Venue"),
+        (OBJECT_TYPE_DEVICE, "Device"),
+        (OBJECT_TYPE_VLAN, "VLAN"),
+        (OBJECT_TYPE_WLAN, "WLAN"),
+        (OBJECT_TYPE_INTERFACE, "Interface"),
+        (OBJECT_TYPE_IP, "IP Address"),
+        (OBJECT_TYPE_CABLE, "Cable"),
+        (OBJECT_TYPE_WIRELESSLINK, "Wireless Link"),
+    )
+
+    tenant_config = models.ForeignKey(
+        to=RuckusR1TenantConfig,
+        on_delete=models.CASCADE,
+        related_name="object_maps",
+    )
+
+    object_type = models.CharField(max_length=32, choices=OBJECT_TYPE_CHOICES)
+    r1_key = models.CharField(max_length=256, help_text="Stable RUCKUS One identifier (or composite key)")
+
+    netbox_content_type = models.ForeignKey(
+        to=ContentType,
+        on_delete=models.PROTECT,
+        related_name="+",
+    )
+    netbox_object_id = models.PositiveBigIntegerField()
+    netbox_object = GenericForeignKey("netbox_content_type", "netbox_object_id")
+
+    venue_id = models.CharField(
+        max_length=128,
+        blank=True,
+        default="",
+        db_index=True,
+        help_text="R1 venue the object was last synced from (empty for tenant-wide objects such as WLANs)",
+    )
+    last_seen = models.DateTimeField(null=True, blank=True)
+    last_r1_name = models.CharField(max_length=200, blank=True, default="")
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="Hash of the R1 fields last applied; unchanged objects are skipped on the next sync",
+    )
+
+    custom_field_data = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ("tenant_config", "object_type", "r1_key")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tenant_config", "object_type", "r1_key"],
+                name="ruckus_r1_objectmap_unique_key",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.object_type}:{self.r1_key} -> {self.netbox_content_type_id}#{self.netbox_object_id}"
+
+    def get_absolute_url(self):
+        return self.tenant_config.get_absolute_url()
+
+
+class RuckusR1TopologySnapshot(models.Model):
+    """
+    Last /venues/{id}/topologies graph applied per venue (zlib-compressed JSON) and its hash.
+    The sync skips a venue's topology while the hash is unchanged; `applied_keys` holds the identity map keys
+    the graph produced, which are re-marked seen on skipped runs so reconciliation does not delete them.
+    """
+
+    tenant_config = models.ForeignKey(
+        to=RuckusR1TenantConfig,
+        on_delete=models.CASCADE,
+        related_name="topology_snapshots",
+    )
+    venue_id = models.CharField(max_length=128)
+    venue_name = models.CharField(max_length=200, blank=True, default="")
+
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+    previous_hash = models.CharField(max_length=64, blank=True, default="")
+    blob = models.BinaryField(null=True, blank=True)
+    node_count = models.PositiveIntegerField(default=0)
+    edge_count = models.PositiveIntegerField(default=0)
+    applied_keys = models.JSONField(default=dict, blank=True)
+
+    last_checked = models.DateTimeField(null=True, blank=True, help_text="Last sync that fetched this topology")
+    last_changed = models.DateTimeField(null=True, blank=True, help_text="Last sync that found a different topology")
+
+    class Meta:
+        ordering = ("tenant_config", "venue_name", "venue_id")
+        verbose_name = "RUCKUS R1 Topology Snapshot"
+        verbose_name_plural = "RUCKUS R1 Topology Snapshots"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tenant_config", "venue_id"],
+                name="ruckus_r1_topology_snapshot_venue_uniq",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.venue_name or self.venue_id} ({self.node_count} nodes, {self.edge_count} edges)"
+
+    @property
+    def changed_in_last_check(self) -> bool:
+        """True if the last sync that fetched this venue's topology found it changed (or new)."""
+        return self.last_checked is not None and self.last_changed == self.last_checked
+
+    def get_blob(self) -> dict:
+        return json.loads(zlib.decompress(bytes(self.blob))) if self.blob else {}
+
+
+class RuckusR1SyncProfile(models.Model):
+    """
+    cProfile capture of one sync run (TenantConfig.profile_sync or `ruckus_sync --profile`).
+    `data` is the zlib-compressed pstats dump; `top_functions` the functions with the highest cumulative time.
+    """
+
+    sync_log = models.OneToOneField(
+        to=RuckusR1SyncLog,
+        on_delete=models.CASCADE,
+        related_name="profile",
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    profiler = models.CharField(max_length=32, default="cprofile")
+    seconds = models.FloatField(default=0.0, help_text="Wall time covered by the profile")
+    data = models.BinaryField()
+    size = models.PositiveIntegerField(default=0, help_text="Uncompressed size of the pstats dump (bytes)")
+    top_functions = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        ordering = ("-created",)
+        verbose_name = "RUCKUS R1 Sync Profile"
+        verbose_name_plural = "RUCKUS R1 Sync Profiles"
+
+    def __str__(self) -> str:
+        return f"Profile of {self.sync_log}"
+
+    @property
+    def filename(self) -> str:
+        return f"ruckus-r1-sync-{self.sync_log_id}.prof"
+
+    def get_data(self) -> bytes:
+        """The pstats file (pstats.Stats, snakeviz, flameprof, gprof2dot ...)."""
+        return zlib.decompress(bytes(self.data)) if self.data else b""
@@ -1,3 +1,19 @@
-# Intentionally empty.
-# PluginConfig is defined in ruckus_r1_sync/__init__.py (NetBox 4.5 loader behavior).
- 
\ No newline at end of file
+# PluginConfig is defined in ruckus_r1_sync/__init__.py (NetBox 4.5 loader behavior).
+# This module only holds helpers shared by the plugin's modules.
+
+from typing import Any
+
+from django.conf import settings
+
+
+def plugin_cfg(key: str, default: Any = None) -> Any:
+    """
+    Read plugin config from configurations/plugins.py:
+      settings.PLUGINS_CONFIG["ruckus_r1_sync"][key]
+    """
+    try:
+        pcfg = getattr(settings, "PLUGINS_CONFIG", {}) or {}
+        mine = pcfg.get("ruckus_r1_sync", {}) or {}
+        return mine.get(key, default)
+    except Exception:
+        return default
@@ -0,0 +1,87 @@
+"""
+Client table retention: clients not seen in RUCKUS One for `client_retention_days` are deleted.
+
+Deletes walk the primary key range in slices of `client_purge_batch_size`, each slice in its own short
+transaction, so the purge never holds row locks on a large part of the table while the client sync writes.
+Client observation history older than `client_history_retention_days` is dropped by monthly partition.
+"""
+
+from __future__ import annotations
+
+import datetime
+from collections import Counter
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+from .history import drop_history_before
+from .models import RuckusR1Client, RuckusR1TenantConfig
+from .plugin import plugin_cfg
+
+CLIENT_RETENTION_DAYS_DEFAULT = 30
+CLIENT_PURGE_BATCH_SIZE_DEFAULT = 5000
+CLIENT_HISTORY_RETENTION_DAYS_DEFAULT = 90
+
+
+def _int_setting(key: str, default: int) -> int:
+    try:
+        return max(0, int(plugin_cfg(key, default)))
+    except Exception:
+        return default
+
+
+def client_retention_days() -> int:
+    """Days a client may go unseen before it is purged (0 disables the purge)."""
+    return _int_setting("client_retention_days", CLIENT_RETENTION_DAYS_DEFAULT)
+
+
+def purge_stale_clients(
+    cfg: Optional[RuckusR1TenantConfig] = None,
+    *,
+    retention_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Counter:
+    """
+    Delete clients (of `cfg`, or all tenants) whose last_seen is older than the retention window.
+    Rows never stamped with last_seen age by last_updated instead. Returns {"deleted": n, "batches": n}.
+    """
+    stats: Counter = Counter()
+    days = client_retention_days() if retention_days is None else retention_days
+    if days <= 0:
+        return stats
+    size = max(1, batch_size or _int_setting("client_purge_batch_size", CLIENT_PURGE_BATCH_SIZE_DEFAULT))
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+
+    stale = RuckusR1Client.objects.filter(
+        Q(last_seen__lt=cutoff) | Q(last_seen__isnull=True, last_updated__lt=cutoff)
+    )
+    if cfg is not None:
+        stale = stale.filter(tenant=cfg.tenant)
+    bounds = stale.aggregate(lo=Min("pk"), hi=Max("pk"))
+    if bounds["lo"] is None:
+        return stats
+
+    for start in range(bounds["lo"], bounds["hi"] + 1, size):
+        with transaction.atomic():
+            deleted, _ = stale.filter(pk__gte=start, pk__lt=start + size).delete()
+        stats["batches"] += 1
+        stats["deleted"] += deleted
+    return stats
+
+
+def purge_client_history(*, retention_days: Optional[int] = None) -> int:
+    """
+    Drop client observations older than `client_history_retention_days` (0 keeps them forever).
+    Partitioned tables lose whole months, so up to one extra month is kept; returns partitions (or rows) removed.
+    """
+    days = retention_days
+    if days is None:
+        days = _int_setting("client_history_retention_days", CLIENT_HISTORY_RETENTION_DAYS_DEFAULT)
+    if days <= 0:
+        return 0
+    return drop_history_before(
+        timezone.now() - datetime.timedelta(days=days),
+        batch_size=max(1, _int_setting("client_purge_batch_size", CLIENT_PURGE_BATCH_SIZE_DEFAULT)),
+    )
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import requests
 
@@ -35,6 +36,8 @@ class RuckusR1Client:
 
         self._token: Optional[str] = None
         self._token_exp: float = 0.0
+        # per-thread [api_wait, json_decode] seconds; fetch workers share one client
+        self._clock = threading.local()
 
         if not self.base_url:
             raise ValueError("base_url is empty")
@@ -81,6 +84,7 @@ class RuckusR1Client:
 
         # IMPORTANT: do NOT follow redirects; if we get redirected to /oauth2/authorization/idm
         # then credentials/endpoint/flow is wrong for client_credentials.
+        t0 = time.monotonic()
         r = requests.post(
             self._token_url(),
             headers={"Content-Type": "application/x-www-form-urlencoded"},
@@ -93,6 +97,7 @@ class RuckusR1Client:
             verify=self.verify_tls,
             allow_redirects=False,
         )
+        self._tick(wait=time.monotonic() - t0)
 
         if 300 <= r.status_code < 400:
             raise RuntimeError(
@@ -101,7 +106,7 @@ class RuckusR1Client:
             )
 
         r.raise_for_status()
-        payload = r.json()
+        payload = self._decode(r)
 
         self._token = payload.get("access_token")
         expires_in = int(payload.get("expires_in", 3600))
@@ -112,18 +117,37 @@ class RuckusR1Client:
 
         return self._token
 
+    def io_seconds(self) -> Tuple[float, float]:
+        """(API wait, JSON decode) seconds spent by the calling thread so far."""
+        totals = getattr(self._clock, "totals", None) or (0.0, 0.0)
+        return totals[0], totals[1]
+
+    def _tick(self, wait: float = 0.0, decode: float = 0.0) -> None:
+        wait0, decode0 = self.io_seconds()
+        self._clock.totals = (wait0 + wait, decode0 + decode)
+
+    def _decode(self, r: requests.Response) -> Any:
+        t0 = time.monotonic()
+        try:
+            return r.json()
+        finally:
+            self._tick(decode=time.monotonic() - t0)
+
     def _headers(self) -> Dict[str, str]:
         return {"Authorization": f"Bearer {self._get_token()}"}
 
     def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
         url = f"{self.base_url}{path}"
+        headers = self._headers()
+        t0 = time.monotonic()
         r = requests.get(
             url,
             params=params or {},
-            headers=self._headers(),
+            headers=headers,
             timeout=self.timeout,
             verify=self.verify_tls,
         )
+        self._tick(wait=time.monotonic() - t0)
         if r.status_code >= 400:
             try:
                 msg = r.json()
@@ -131,26 +155,29 @@ class RuckusR1Client:
                 msg = r.text
             raise RuntimeError(f"GET {path} failed ({r.status_code}): {msg}")
         try:
-            return r.json()
+            return self._decode(r)
         except Exception:
             return r.text
 
     def _post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
         url = f"{self.base_url}{path}"
+        headers = self._headers()
+        t0 = time.monotonic()
         r = requests.post(
             url,
             json=body or {},
-            headers=self._headers(),
+            headers=headers,
             timeout=self.timeout,
             verify=self.verify_tls,
         )
+        self._tick(wait=time.monotonic() - t0)
         if r.status_code >= 400:
             try:
                 msg = r.json()
             except Exception:
                 msg = r.text
             raise RuntimeError(f"POST {path} failed ({r.status_code}): {msg}")
-        return r.json()
+        return self._decode(r)
 
     def get_vlan_unions(self, *, venue_id: str, switch_id: str) -> Dict[str, Any]:
         """GET /venues/{venueId}/switches/{switchId}/vlanUnions"""
@@ -178,4 +205,35 @@ class RuckusR1Client:
         if isinstance(data, list):
             out.extend([x for x in data if isinstance(x, dict)])
         return out
+
+    def iter_pages(
+        self,
+        *,
+        path: str,
+        page_size: int = 100,
+        extra_body: Optional[Dict[str, Any]] = None,
+        data_key: str = "data",
+        max_rows: Optional[int] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield the pages of a query endpoint (`page` 1, 2, ... of `pageSize` rows) until a short page, the
+        reported totalCount or `max_rows` is reached. A page is only requested when the caller asks for it,
+        so a caller that stops iterating (e.g. at a cutoff in sorted results) saves the remaining requests.
+        """
+        page_size = max(1, int(page_size))
+        fetched = 0
+        page = 1
+        while max_rows is None or fetched < max_rows:
+            size = page_size if max_rows is None else min(page_size, max_rows - fetched)
+            resp = self._post(path, {**(extra_body or {}), "page": page, "pageSize": size, "limit": size})
+            data = resp.get(data_key) if isinstance(resp, dict) else None
+            data = data if isinstance(data, list) else []
+            rows = [x for x in data if isinstance(x, dict)]
+            if rows:
+                yield rows
+            fetched += len(data)
+            total = resp.get("totalCount") if isinstance(resp, dict) else None
+            if len(data) < size or (isinstance(total, int) and fetched >= total):
+                return
+            page += 1
  
\ No newline at end of file
@@ -1,22 +1,46 @@
 # ruckus_r1_sync/sync.py
 from __future__ import annotations
 
+import csv
+import dataclasses
 import datetime
-from typing import Any, Dict, List, Optional, Tuple, Union
+import hashlib
+import io
+import json
+import queue
+import threading
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 from django.apps import apps
-from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.db import transaction
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models.deletion import ProtectedError, RestrictedError
 from django.utils import timezone
 
-from dcim.models import Device, DeviceRole, DeviceType, Manufacturer, Site, SiteGroup
+from dcim.models import Device, DeviceRole, DeviceType, Location, Manufacturer, Site, SiteGroup
 from ipam.models import IPAddress, VLAN
 from wireless.models import WirelessLAN
 
-from .models import RuckusR1TenantConfig, RuckusR1SyncLog, RuckusR1Client as RuckusR1ClientModel
+from .models import (
+    RuckusR1TenantConfig, RuckusR1SyncLog, RuckusR1ObjectMap, RuckusR1Client as RuckusR1ClientModel,
+    RuckusR1ClientObservation, RuckusR1SyncProfile, RuckusR1TopologySnapshot,
+)
 from .ruckus_api import RuckusR1Client
-from .mapping import map_venue_to_netbox, VenueMapping
+from .changelog import coalesced_changes
+from .history import ensure_partitions
+from .instrumentation import (
+    MEMORY_TOP_DEFAULT, QUERY_SLOWEST_DEFAULT, MemoryTracker, QueryStats, SyncProfiler, memory_scope, phase, profiled,
+    query_scope, timed, timing_summary,
+)
+from .mapping import VenueMapping, VenueMappingCache
+from .plugin import plugin_cfg
 
 
 # -----------------
@@ -67,19 +91,6 @@ def _cfg_flag(cfg: RuckusR1TenantConfig, field: str, default: bool = True) -> bo
         return bool(default)
 
 
-def _plugin_cfg(key: str, default: Any = None) -> Any:
-    """
-    Read plugin config from configurations/plugins.py:
-      settings.PLUGINS_CONFIG["ruckus_r1_sync"][key]
-    """
-    try:
-        pcfg = getattr(settings, "PLUGINS_CONFIG", {}) or {}
-        mine = pcfg.get("ruckus_r1_sync", {}) or {}
-        return mine.get(key, default)
-    except Exception:
-        return default
-
-
 def _looks_like_mac(s: str) -> bool:
     s = (s or "").strip().lower()
     if len(s) == 17 and s.count(":") == 5 and all(c in "0123456789abcdef:" for c in s):
@@ -119,8 +130,8 @@ def _resolve_config(cfg_or_id: Union[RuckusR1TenantConfig, int]) -> RuckusR1Tena
 
 
 def _make_client(cfg: RuckusR1TenantConfig) -> RuckusR1Client:
-    verify_tls = bool(_plugin_cfg("verify_tls", True))
-    timeout = int(_plugin_cfg("request_timeout", 30))
+    verify_tls = bool(plugin_cfg("verify_tls", True))
+    timeout = int(plugin_cfg("request_timeout", 30))
     return RuckusR1Client(
         base_url=_normalize_base_url(cfg.api_base_url),
         ruckus_tenant_id=cfg.ruckus_tenant_id,
@@ -174,6 +185,270 @@ def _sync_log_finish(log: RuckusR1SyncLog, status: str, summary: str, message: s
     log.save()
 
 
+# -----------------
+# Identity map (RuckusR1ObjectMap)
+# -----------------
+
+_MapEntry = Tuple[int, int, str, str, str]  # (content_type_id, object_id, last_r1_name, content_hash, venue_id)
+
+
+class _IdentityMap:
+    """
+    (object_type, r1_key) -> _MapEntry for one tenant config.
+    Loaded once per run and shared by all venue workers. Entries written by a venue are merged
+    only after that venue's transaction commits.
+    """
+
+    def __init__(self, cfg: RuckusR1TenantConfig) -> None:
+        self.cfg = cfg
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], _MapEntry] = {}
+
+    def load(self) -> "_IdentityMap":
+        qs = RuckusR1ObjectMap.objects.filter(tenant_config=self.cfg).values_list(
+            "object_type", "r1_key", "netbox_content_type_id", "netbox_object_id", "last_r1_name", "content_hash", "venue_id"
+        )
+        entries = {(ot, key): (ct_id, obj_id, name, h, v) for ot, key, ct_id, obj_id, name, h, v in qs.iterator(chunk_size=5000)}
+        with self._lock:
+            self._entries = entries
+        return self
+
+    def get(self, object_type: str, key: str) -> Optional[_MapEntry]:
+        with self._lock:
+            return self._entries.get((object_type, key))
+
+    def merge(self, entries: Dict[Tuple[str, str], _MapEntry]) -> None:
+        with self._lock:
+            self._entries.update(entries)
+
+    def keys(self, object_type: str) -> Set[str]:
+        with self._lock:
+            return {key for ot, key in self._entries if ot == object_type}
+
+    def entries_for_venues(self, object_type: str, venue_ids: Set[str]) -> Dict[str, _MapEntry]:
+        """r1_key -> entry for all entries of object_type last synced from one of venue_ids."""
+        with self._lock:
+            return {key: e for (ot, key), e in self._entries.items() if ot == object_type and e[4] in venue_ids}
+
+    def forget(self, object_type: str, keys) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop((object_type, key), None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+@dataclass
+class _SeenKeys:
+    """Identity map keys seen during one run, per object type (shared by all venue workers)."""
+    keys: Dict[str, Set[str]] = field(default_factory=dict)
+    lock: Any = field(default_factory=threading.Lock)
+
+    def add(self, object_type: str, key: str) -> None:
+        key = _map_key(key)
+        if key:
+            with self.lock:
+                self.keys.setdefault(object_type, set()).add(key)
+
+    def get(self, object_type: str) -> Set[str]:
+        with self.lock:
+            return set(self.keys.get(object_type, ()))
+
+
+class _MapWriter:
+    """
+    Collects identity map entries of one venue (or the WLAN phase) and writes them in bulk.
+    Also answers "is this R1 object unchanged since the last sync?" from the stored content hashes
+    (always "no" when force_full is set) and counts hits/misses.
+    Every key it remembers (or skips as unchanged) is added to `seen` for authoritative reconciliation.
+    """
+
+    def __init__(
+        self,
+        idmap: _IdentityMap,
+        venue_id: str = "",
+        *,
+        force_full: bool = False,
+        seen: Optional["_SeenKeys"] = None,
+    ) -> None:
+        self.idmap = idmap
+        self.venue_id = venue_id
+        self.force_full = force_full
+        self.seen = seen
+        self.pending: Dict[Tuple[str, str], _MapEntry] = {}
+        self.hash_stats: Counter = Counter()
+
+    def lookup(self, object_type: str, key: str) -> Optional[_MapEntry]:
+        return self.pending.get((object_type, key)) or self.idmap.get(object_type, key)
+
+    def _put(self, object_type: str, key: str, entry: _MapEntry) -> None:
+        if self.idmap.get(object_type, key) == entry:
+            self.pending.pop((object_type, key), None)
+        else:
+            self.pending[(object_type, key)] = entry
+
+    def mark_seen(self, object_type: str, key: str) -> None:
+        if not key:
+            return
+        if self.seen is not None:
+            self.seen.add(object_type, key)
+        # objects seen from another venue (or mapped before venue ids were stored) move to this one
+        entry = self.lookup(object_type, key)
+        if entry and entry[4] != self.venue_id:
+            self._put(object_type, key, entry[:4] + (self.venue_id,))
+
+    def remember(self, object_type: str, key: str, obj, name: str = "") -> None:
+        if not key or obj is None or not getattr(obj, "pk", None):
+            return
+        if self.seen is not None:
+            self.seen.add(object_type, key)
+        ct_id = ContentType.objects.get_for_model(obj.__class__).id
+        prev = self.lookup(object_type, key)
+        # keep the stored hash as long as the key still points at the same object
+        content_hash = prev[3] if prev and prev[:2] == (ct_id, int(obj.pk)) else ""
+        self._put(object_type, key, (ct_id, int(obj.pk), (name or "")[:200], content_hash, self.venue_id))
+
+    def unchanged(self, object_type: str, key: str, content_hash: str) -> bool:
+        entry = None if self.force_full or not key else self.lookup(object_type, key)
+        hit = bool(entry) and entry[3] == content_hash
+        self.hash_stats["hash_hits" if hit else "hash_misses"] += 1
+        if hit:
+            self.mark_seen(object_type, key)
+        return hit
+
+    def set_hash(self, object_type: str, key: str, content_hash: str) -> None:
+        entry = self.lookup(object_type, key) if key else None
+        if entry:
+            self._put(object_type, key, entry[:3] + (content_hash,) + entry[4:])
+
+    def flush(self) -> int:
+        if not self.pending:
+            return 0
+        now = _now()
+        objs = [
+            RuckusR1ObjectMap(
+                tenant_config=self.idmap.cfg,
+                object_type=ot,
+                r1_key=key,
+                netbox_content_type_id=ct_id,
+                netbox_object_id=obj_id,
+                last_r1_name=name,
+                content_hash=content_hash,
+                venue_id=venue_id,
+                last_seen=now,
+                custom_field_data={},
+            )
+            for (ot, key), (ct_id, obj_id, name, content_hash, venue_id) in self.pending.items()
+        ]
+        RuckusR1ObjectMap.objects.bulk_create(
+            objs,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["tenant_config", "object_type", "r1_key"],
+            update_fields=[
+                "netbox_content_type", "netbox_object_id", "last_r1_name", "content_hash", "venue_id",
+                "last_seen", "last_updated",
+            ],
+        )
+        entries = self.pending
+        self.pending = {}
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self.idmap.merge(entries))
+        else:
+            self.idmap.merge(entries)
+        return len(entries)
+
+
+_map_writer: ContextVar[Optional[_MapWriter]] = ContextVar("ruckus_r1_sync_map_writer", default=None)
+
+
+def _map_key(key: str) -> str:
+    return (key or "").strip()[:256]
+
+
+def _idmap_pk(object_type: str, key: str, model) -> Optional[int]:
+    """pk of the `model` object mapped to (object_type, key), or None (no run, not mapped, other model)."""
+    writer = _map_writer.get()
+    key = _map_key(key)
+    if writer is None or not key:
+        return None
+    entry = writer.lookup(object_type, key)
+    if not entry or entry[0] != ContentType.objects.get_for_model(model).id:
+        return None
+    return entry[1]
+
+
+def _idmap_resolve(object_type: str, key: str, model):
+    """Return the NetBox object mapped to (object_type, key), or None (no run, not mapped, deleted, other model)."""
+    obj_id = _idmap_pk(object_type, key, model)
+    return model.objects.filter(pk=obj_id).first() if obj_id is not None else None
+
+
+def _idmap_remember(object_type: str, key: str, obj, name: str = "") -> None:
+    writer = _map_writer.get()
+    if writer is not None:
+        writer.remember(object_type, _map_key(key), obj, name)
+
+
+def _idmap_mapped(object_type: str, key: str) -> bool:
+    writer = _map_writer.get()
+    return writer is not None and writer.lookup(object_type, _map_key(key)) is not None
+
+
+def _idmap_seen(object_type: str, key: str) -> None:
+    """Mark a key as seen without touching its object (dependents of an unchanged object)."""
+    writer = _map_writer.get()
+    if writer is not None:
+        writer.mark_seen(object_type, _map_key(key))
+
+
+def _content_hash(*parts: Any) -> str:
+    """Stable hash of the projected R1 fields an upsert depends on."""
+    blob = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _idmap_unchanged(object_type: str, key: str, content_hash: str) -> bool:
+    """True if the mapped object was last applied from identical R1 data (skip all DB work for it)."""
+    writer = _map_writer.get()
+    return writer is not None and writer.unchanged(object_type, _map_key(key), content_hash)
+
+
+def _idmap_set_hash(object_type: str, key: str, content_hash: str) -> None:
+    """Store the hash after a successful upsert (no-op if the object was not mapped)."""
+    writer = _map_writer.get()
+    if writer is not None:
+        writer.set_hash(object_type, _map_key(key), content_hash)
+
+
+def _current_venue_id() -> str:
+    writer = _map_writer.get()
+    return writer.venue_id if writer is not None else ""
+
+
+def _device_map_key(serial: str, name: str) -> str:
+    """Serial when known; serial-less devices (stubs) are keyed by venue + name."""
+    return serial if serial else f"name:{_current_venue_id()}:{name}"
+
+
+def _interface_map_key(device: Device, name: str) -> str:
+    return f"{device.serial}:{name}" if device.serial else f"device#{device.pk}:{name}"
+
+
+def _link_map_key(a_key: str, b_key: str) -> str:
+    """Cables and wireless links are keyed by their (unordered) pair of interface keys."""
+    return "|".join(sorted((a_key, b_key)))
+
+
+def _ip_map_key(ip: str) -> str:
+    ip = (ip or "").strip()
+    if ip and "/" not in ip:
+        ip = f"{ip}/128" if ":" in ip else f"{ip}/32"
+    return ip
+
+
 # -----------------
 # NetBox object upserts
 # -----------------
@@ -190,26 +465,82 @@ def _get_or_create_site_group(cfg: RuckusR1TenantConfig) -> Optional[SiteGroup]:
     return obj
 
 
+class _RefCache:
+    """
+    Run-scoped cache of shared reference objects (roles, manufacturers, device types).
+    Shared by all venue workers of one run. Objects are published only after the transaction that
+    saw them commits, so a rolled-back venue never leaves an object in the cache that does not exist.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._objs: Dict[Tuple[str, str], Any] = {}
+
+    def get(self, key: Tuple[str, str]) -> Any:
+        with self._lock:
+            return self._objs.get(key)
+
+    def put(self, key: Tuple[str, str], obj: Any) -> None:
+        with self._lock:
+            self._objs[key] = obj
+
+    def publish(self, key: Tuple[str, str], obj: Any) -> None:
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self.put(key, obj))
+        else:
+            self.put(key, obj)
+
+
+_ref_cache: ContextVar[Optional[_RefCache]] = ContextVar("ruckus_r1_sync_ref_cache", default=None)
+
+
+def _get_or_create_ref(model, lookup: Dict[str, Any], create: Dict[str, Any], *, on_found=None):
+    """
+    Concurrency-safe get-or-create for shared reference objects.
+    If another venue worker creates the same object first, the unique constraint rejects our INSERT
+    (inside a savepoint) and we re-read the row the other worker committed.
+    `on_found(obj)` may adjust an existing object; it only runs when the object is not cached yet.
+    """
+    cache = _ref_cache.get()
+    key = (model._meta.label_lower, repr(sorted(lookup.items(), key=lambda kv: kv[0])))
+    if cache is not None:
+        obj = cache.get(key)
+        if obj is not None:
+            return obj
+
+    obj = model.objects.filter(**lookup).first()
+    if obj is None:
+        try:
+            with transaction.atomic():
+                obj = model.objects.create(**create)
+        except IntegrityError:
+            obj = model.objects.filter(**lookup).first()
+            if obj is None:
+                raise
+    elif on_found is not None:
+        on_found(obj)
+
+    if cache is not None:
+        cache.publish(key, obj)
+    return obj
+
+
 def _get_or_create_role(name: str) -> DeviceRole:
     name = (name or "Unknown").strip()
     slug = _slugify(name)
-    obj = DeviceRole.objects.filter(slug=slug).first()
-    if not obj:
-        obj = DeviceRole.objects.create(name=name[:50], slug=slug, color="9e9e9e")
-    return obj
+    return _get_or_create_ref(DeviceRole, {"slug": slug}, {"name": name[:50], "slug": slug, "color": "9e9e9e"})
 
 
 def _get_or_create_manufacturer_named(name: str) -> Manufacturer:
     name = (name or "Unknown").strip()
     slug = _slugify(name)
-    obj = Manufacturer.objects.filter(slug=slug).first()
-    if not obj:
-        obj = Manufacturer.objects.create(name=name[:50], slug=slug)
-    else:
+
+    def _rename(obj: Manufacturer) -> None:
         if obj.name != name[:50]:
             obj.name = name[:50]
             obj.save()
-    return obj
+
+    return _get_or_create_ref(Manufacturer, {"slug": slug}, {"name": name[:50], "slug": slug}, on_found=_rename)
 
 
 def _get_or_create_ruckus_manufacturer() -> Manufacturer:
@@ -219,10 +550,11 @@ def _get_or_create_ruckus_manufacturer() -> Manufacturer:
 def _get_or_create_devicetype(manu: Manufacturer, model: str) -> DeviceType:
     model = (model or "Generic").strip()
     slug = _slugify(f"{manu.slug}-{model}")[:100]
-    obj = DeviceType.objects.filter(slug=slug, manufacturer=manu).first()
-    if not obj:
-        obj = DeviceType.objects.create(manufacturer=manu, model=model[:100], slug=slug)
-    return obj
+    return _get_or_create_ref(
+        DeviceType,
+        {"slug": slug, "manufacturer_id": manu.id},
+        {"manufacturer": manu, "model": model[:100], "slug": slug},
+    )
 
 
 def _set_device_role_attr(device: Device, role: DeviceRole) -> bool:
@@ -262,8 +594,11 @@ def _get_or_create_device_infra(
 
     name = (name or serial or "device").strip()[:64]
     serial = (serial or "").strip()[:50]
+    map_key = _device_map_key(serial, name)
 
-    obj = Device.objects.filter(serial=serial).first() if serial else None
+    obj = _idmap_resolve("device", map_key, Device)
+    if not obj and serial:
+        obj = Device.objects.filter(serial=serial).first()
     if not obj:
         obj = Device.objects.filter(site=site, name=name).first()
 
@@ -281,6 +616,7 @@ def _get_or_create_device_infra(
         _set_device_location_best_effort(obj, location)
         if hasattr(obj, "location") and obj.location_id != (getattr(location, "id", None) if location else None):
             obj.save()
+        _idmap_remember("device", map_key, obj, name)
         return obj
 
     changed = False
@@ -306,28 +642,40 @@ def _get_or_create_device_infra(
 
     if changed:
         obj.save()
+    _idmap_remember("device", map_key, obj, name)
     return obj
 
 
-def _get_or_create_wlan(cfg: RuckusR1TenantConfig, ssid: str) -> Optional[WirelessLAN]:
+def _get_or_create_wlan(cfg: RuckusR1TenantConfig, ssid: str, r1_id: str = "") -> Optional[WirelessLAN]:
     ssid = (ssid or "").strip()
     if not ssid:
         return None
-    obj = WirelessLAN.objects.filter(tenant=cfg.tenant, ssid=ssid).first()
+    map_key = r1_id or f"ssid:{ssid}"
+    obj = _idmap_resolve("wlan", map_key, WirelessLAN)
+    if obj and obj.ssid != ssid[:64]:
+        # network renamed in R1 -> keep the same WirelessLAN
+        obj.ssid = ssid[:64]
+        obj.save()
+    if not obj:
+        obj = WirelessLAN.objects.filter(tenant=cfg.tenant, ssid=ssid).first()
     if not obj:
         obj = WirelessLAN.objects.create(tenant=cfg.tenant, ssid=ssid[:64], status="active", auth_type="open")
+    _idmap_remember("wlan", map_key, obj, ssid)
     return obj
 
 
 def _upsert_ip(cfg: RuckusR1TenantConfig, ip: str) -> Optional[IPAddress]:
-    ip = (ip or "").strip()
+    ip = _ip_map_key(ip)
     if not ip:
         return None
-    if "/" not in ip:
-        ip = f"{ip}/128" if ":" in ip else f"{ip}/32"
-    obj = IPAddress.objects.filter(address=ip, tenant=cfg.tenant).first()
+    obj = _idmap_resolve("ip", ip, IPAddress)
+    if obj and str(obj.address) != ip:
+        obj = None
+    if not obj:
+        obj = IPAddress.objects.filter(address=ip, tenant=cfg.tenant).first()
     if not obj:
         obj = IPAddress.objects.create(address=ip, tenant=cfg.tenant, status="active")
+    _idmap_remember("ip", ip, obj, ip)
     return obj
 
 
@@ -345,17 +693,24 @@ def _upsert_vlan(cfg: RuckusR1TenantConfig, site: Site, vid: int, name: str = ""
         return None
 
     name = (name or f"VLAN {vid}").strip()[:64]
+    venue_id = _current_venue_id()
+    map_key = f"{venue_id}:{vid}" if venue_id else ""
 
-    qs = VLAN.objects.filter(tenant=cfg.tenant, vid=vid)
-    if "site" in {f.name for f in VLAN._meta.get_fields()}:
-        qs = qs.filter(site=site)
+    obj = _idmap_resolve("vlan", map_key, VLAN)
+    if obj and obj.vid != vid:
+        obj = None
+    if not obj:
+        qs = VLAN.objects.filter(tenant=cfg.tenant, vid=vid)
+        if "site" in {f.name for f in VLAN._meta.get_fields()}:
+            qs = qs.filter(site=site)
+        obj = qs.first()
 
-    obj = qs.first()
     if not obj:
         kwargs = {"tenant": cfg.tenant, "vid": vid, "name": name}
         if "site" in {f.name for f in VLAN._meta.get_fields()}:
             kwargs["site"] = site
         obj = VLAN.objects.create(**kwargs)
+        _idmap_remember("vlan", map_key, obj, name)
         return obj
 
     changed = False
@@ -370,6 +725,7 @@ def _upsert_vlan(cfg: RuckusR1TenantConfig, site: Site, vid: int, name: str = ""
         changed = True
     if changed:
         obj.save()
+    _idmap_remember("vlan", map_key, obj, name)
     return obj
 
 
@@ -379,10 +735,18 @@ def _upsert_vlan(cfg: RuckusR1TenantConfig, site: Site, vid: int, name: str = ""
 
 def _ensure_interface(device: Device, name: str):
     Interface = _nb_model("dcim", "Interface")
-    iface = Interface.objects.filter(device=device, name=name).first()
+    map_key = _interface_map_key(device, name)
+    iface = _idmap_resolve("interface", map_key, Interface)
+    if iface and (iface.device_id != device.pk or iface.name != name):
+        iface = None
+    if not iface:
+        iface = Interface.objects.filter(device=device, name=name).first()
     if not iface:
         iface = Interface(device=device, name=name)
         iface.save()
+    # keep the device cached on the interface: cable/link keys are built from it
+    iface.device = device
+    _idmap_remember("interface", map_key, iface, name)
     return iface
 
 
@@ -414,6 +778,22 @@ def _set_primary_ip4_best_effort(device: Device, ip_obj: IPAddress) -> None:
             pass
 
 
+def _mark_client_seen(client_key: str, iface_name: str, cl: Dict[str, Any]) -> None:
+    """Unchanged client device: its interface and (IPv4) address are still in use as well."""
+    _idmap_seen("interface", f"{client_key}:{iface_name}")
+    ip = (cl.get("ipAddress") or cl.get("ip") or "").strip()
+    if ip and ":" not in ip:
+        _idmap_seen("ip", _ip_map_key(ip))
+
+
+def _wifi_client_model(cl: Dict[str, Any]) -> str:
+    return (cl.get("deviceType") or cl.get("modelName") or "Client").strip()
+
+
+def _wired_client_model(cl: Dict[str, Any]) -> str:
+    return (cl.get("deviceType") or cl.get("modelName") or cl.get("manufacturer") or "Client").strip()
+
+
 def _upsert_client_as_dcim_device(
     cfg: RuckusR1TenantConfig,
     site: Site,
@@ -428,8 +808,7 @@ def _upsert_client_as_dcim_device(
     role = _get_or_create_role("Wireless Client")
 
     manu = _get_or_create_manufacturer_named("Client")
-    model = (cl.get("deviceType") or cl.get("modelName") or "Client").strip()
-    dtype = _get_or_create_devicetype(manu, model)
+    dtype = _get_or_create_devicetype(manu, _wifi_client_model(cl))
 
     raw_hostname = (cl.get("hostname") or "").strip()
     host_part = ""
@@ -438,7 +817,7 @@ def _upsert_client_as_dcim_device(
 
     name = f"CL-{host_part + '-' if host_part else ''}{serial[:12]}"
 
-    obj = Device.objects.filter(serial=serial).first()
+    obj = _idmap_resolve("device", serial, Device) or Device.objects.filter(serial=serial).first()
 
     if not obj:
         kwargs = {
@@ -488,6 +867,7 @@ def _upsert_client_as_dcim_device(
         if changed:
             obj.save()
 
+    _idmap_remember("device", serial, obj, name)
     iface = _ensure_interface(obj, "wlan0")
     if hasattr(iface, "mac_address"):
         try:
@@ -524,8 +904,7 @@ def _upsert_wired_client_as_dcim_device(
     role = _get_or_create_role("Wired Client")
 
     manu = _get_or_create_manufacturer_named("Client")
-    model = (cl.get("deviceType") or cl.get("modelName") or cl.get("manufacturer") or "Client").strip()
-    dtype = _get_or_create_devicetype(manu, model)
+    dtype = _get_or_create_devicetype(manu, _wired_client_model(cl))
 
     raw_name = (cl.get("hostname") or cl.get("name") or "").strip()
     host_part = ""
@@ -534,7 +913,7 @@ def _upsert_wired_client_as_dcim_device(
 
     name = f"CL-W-{host_part + '-' if host_part else ''}{serial[:12]}"
 
-    obj = Device.objects.filter(serial=serial).first()
+    obj = _idmap_resolve("device", serial, Device) or Device.objects.filter(serial=serial).first()
     if not obj:
         kwargs = {
             "name": name[:64],
@@ -576,6 +955,7 @@ def _upsert_wired_client_as_dcim_device(
         if changed:
             obj.save()
 
+    _idmap_remember("device", serial, obj, name)
     iface = _ensure_interface(obj, iface_name)
     if hasattr(iface, "mac_address"):
         try:
@@ -596,6 +976,368 @@ def _upsert_wired_client_as_dcim_device(
     return (obj, ip_obj)
 
 
+def _wifi_client_row(cl: Dict[str, Any], venue_id: str) -> Dict[str, Any]:
+    """Client table row for a /venues/aps/clients/query row (MAC recovered from other fields if needed)."""
+    mac = _norm_mac(cl.get("macAddress") or cl.get("mac") or cl.get("clientMac") or "")
+    ip = (cl.get("ipAddress") or cl.get("ip") or "").strip()
+    hostname = (cl.get("hostname") or "").strip()
+
+    netinfo = cl.get("networkInformation") or {}
+    ssid = (netinfo.get("ssid") or cl.get("ssid") or "").strip()
+
+    apinfo = cl.get("apInformation") or {}
+    ap_serial = (apinfo.get("serialNumber") or cl.get("apSerial") or cl.get("connectedApSerial") or "").strip()
+
+    vinfo = cl.get("venueInformation") or {}
+    venue_id_effective = (vinfo.get("id") or venue_id or "").strip()
+
+    if _looks_like_mac(hostname) and not _looks_like_mac(mac):
+        mac = _norm_mac(hostname)
+        hostname = ""
+    if _looks_like_mac(hostname):
+        hostname = ""
+
+    if not _looks_like_mac(mac):
+        for _, v in cl.items():
+            if isinstance(v, str) and _looks_like_mac(v):
+                mac = _norm_mac(v)
+                break
+
+    if not _looks_like_mac(mac):
+        mac = "unknown"
+
+    return {
+        "mac": mac,
+        "venue_id": venue_id_effective,
+        "network_id": _safe_str(netinfo.get("id") or cl.get("networkId") or "", 128),
+        "ruckus_id": ap_serial,
+        "ip_address": ip or "",
+        "hostname": hostname or "",
+        "ssid": ssid or "",
+        "last_seen": _client_last_seen(cl),
+        "raw": cl,
+        "custom_field_data": {},
+    }
+
+
+def _wifi_client_hash(site_pk, location_pk, row: Dict[str, Any], cl: Dict[str, Any]) -> str:
+    return _content_hash(
+        site_pk, location_pk, row["mac"], row["ip_address"], row["hostname"], cl.get("hostname") or "",
+        cl.get("deviceType") or cl.get("modelName") or "",
+    )
+
+
+# -----------------
+# RuckusR1Client table (bulk upserts)
+# -----------------
+
+# Columns written for Wi-Fi clients. VLAN is not part of the Wi-Fi payload, so it is left untouched.
+_WIFI_CLIENT_FIELDS = (
+    "venue_id", "network_id", "ruckus_id", "ip_address", "hostname", "ssid", "last_seen",
+    "raw", "raw_compressed", "raw_hash", "custom_field_data",
+)
+_WIRED_CLIENT_FIELDS = _WIFI_CLIENT_FIELDS + ("vlan",)
+
+
+# R1 client fields telling when the client was last seen, in order of preference
+_CLIENT_SEEN_FIELDS = ("lastSeenTime", "lastUpdatedTime", "lastUpdated")
+
+
+def _client_last_seen(cl: Dict[str, Any]) -> datetime.datetime:
+    """R1 last-seen timestamp of a client row, or the sync time if R1 does not report one."""
+    return _r1_timestamp(cl, _CLIENT_SEEN_FIELDS) or _now()
+
+
+def _client_seen_granularity() -> datetime.timedelta:
+    """
+    A client row whose other columns are unchanged is only rewritten to refresh last_seen when the stored value
+    is older than this, so polling every few minutes does not rewrite every client every run.
+    """
+    try:
+        seconds = int(plugin_cfg("client_last_seen_granularity_seconds", 900))
+    except Exception:
+        seconds = 900
+    return datetime.timedelta(seconds=max(0, seconds))
+
+
+def _client_batch_size() -> int:
+    try:
+        return max(1, int(plugin_cfg("client_batch_size", 1000)))
+    except Exception:
+        return 1000
+
+
+def _client_chunk_size() -> int:
+    """R1 client rows per fetched page and written chunk; bounds the client memory of a venue (default: client_batch_size)."""
+    try:
+        return max(1, int(plugin_cfg("client_chunk_size", 0) or _client_batch_size()))
+    except Exception:
+        return _client_batch_size()
+
+
+def _last_per_mac(decoded: List[Tuple[Any, Dict[str, Any]]], key=lambda item: item[0]["mac"]):
+    """(row, raw) pairs with a usable MAC, one per MAC (last wins), so a chunk never upserts a client device twice."""
+    by_mac: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+    for item in decoded:
+        mac = key(item)
+        if mac != "unknown":
+            by_mac[mac] = item
+    return list(by_mac.values())
+
+
+# Projected R1 keys that the client table already stores in its own columns (dropped from raw in "minimal" mode)
+_CLIENT_COLUMN_KEYS = frozenset((
+    "macAddress", "ipAddress", "hostname", "ssid", "networkId", "vlan",
+    "networkInformation.ssid", "networkInformation.id", "venueInformation.id",
+))
+
+
+def _apply_raw_storage(cfg: RuckusR1TenantConfig, rows: List[Dict[str, Any]]) -> None:
+    """
+    Replace each row's full R1 payload ("raw") by what TenantConfig.client_raw_storage keeps.
+    raw_hash is the hash of the projected fields in every mode; volatile counters (RSSI, traffic) are not part of
+    the projection, so with "projected" and "minimal" an idle client's row is identical and not rewritten by the merge.
+    """
+    mode = getattr(cfg, "client_raw_storage", "") or RuckusR1TenantConfig.CLIENT_RAW_FULL
+    for row in rows:
+        cl = row.get("raw") or {}
+        projected = _project(cl, _CLIENT_FINGERPRINT_FIELDS, _CLIENT_NESTED_FIELDS)
+        row["raw_hash"] = _content_hash(projected)
+        row["raw_compressed"] = None
+        if mode == RuckusR1TenantConfig.CLIENT_RAW_PROJECTED:
+            row["raw"] = projected
+        elif mode == RuckusR1TenantConfig.CLIENT_RAW_COMPRESSED:
+            row["raw"] = {}
+            row["raw_compressed"] = zlib.compress(json.dumps(cl, default=str, separators=(",", ":")).encode())
+        elif mode == RuckusR1TenantConfig.CLIENT_RAW_MINIMAL:
+            row["raw"] = {k: v for k, v in projected.items() if k not in _CLIENT_COLUMN_KEYS}
+
+
+def _dedupe_client_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Collapse rows sharing the same MAC, last one wins (same outcome as sequential update_or_create).
+    ON CONFLICT DO UPDATE cannot touch the same row twice in one statement, so this is required.
+    """
+    by_mac: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        by_mac[row["mac"]] = row
+    return list(by_mac.values())
+
+
+@dataclass
+class ClientIngestStats:
+    """Counters for one or more client table writes (reported in the sync log)."""
+    staged: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    observed: int = 0  # rows appended to the client observation history
+
+    def add(self, other: "ClientIngestStats") -> None:
+        self.staged += other.staged
+        self.changed += other.changed
+        self.unchanged += other.unchanged
+        self.observed += other.observed
+
+
+# Client columns whose changes are recorded in RuckusR1ClientObservation
+_CLIENT_TRACKED_FIELDS = ("ip_address", "ruckus_id", "ssid", "vlan")
+
+
+def _client_history_enabled() -> bool:
+    return bool(plugin_cfg("client_history", True))
+
+
+def _observe_client_rows(cfg: RuckusR1TenantConfig, rows: List[Dict[str, Any]], fields: Tuple[str, ...]) -> int:
+    """
+    ORM path of the observation history: append a row for every new client and every client whose tracked
+    columns differ from the stored ones. Call before the rows are upserted. Returns the rows appended.
+    """
+    tracked = [c for c in _CLIENT_TRACKED_FIELDS if c in fields]
+    current = {
+        values[0]: dict(zip(_CLIENT_TRACKED_FIELDS, values[1:]))
+        for values in RuckusR1ClientModel.objects.filter(tenant=cfg.tenant, mac__in=[row["mac"] for row in rows])
+        .values_list("mac", *_CLIENT_TRACKED_FIELDS)
+    }
+    objs = []
+    for row in rows:
+        prev = current.get(row["mac"])
+        if prev is not None and all(prev[c] == row.get(c) for c in tracked):
+            continue
+        objs.append(RuckusR1ClientObservation(
+            tenant_id=cfg.tenant_id,
+            mac=row["mac"],
+            observed=row.get("last_seen") or _now(),
+            venue_id=row.get("venue_id") or "",
+            network_id=row.get("network_id") or "",
+            ruckus_id=row.get("ruckus_id") or "",
+            ip_address=row.get("ip_address") or "",
+            ssid=row.get("ssid") or "",
+            vlan=row.get("vlan") if "vlan" in fields else (prev or {}).get("vlan"),
+        ))
+    RuckusR1ClientObservation.objects.bulk_create(objs, batch_size=_client_batch_size())
+    return len(objs)
+
+
+def _bulk_upsert_clients(cfg: RuckusR1TenantConfig, rows: List[Dict[str, Any]], fields: Tuple[str, ...]) -> ClientIngestStats:
+    """
+    ORM path: INSERT ... ON CONFLICT (tenant, mac) DO UPDATE in chunks.
+    `rows` must already be deduplicated. The ORM cannot tell unchanged rows apart, so every row counts as changed.
+    """
+    size = _client_batch_size()
+    update_fields = list(fields) + ["last_updated"]
+    observed = _observe_client_rows(cfg, rows, fields) if _client_history_enabled() else 0
+    for i in range(0, len(rows), size):
+        objs = [RuckusR1ClientModel(tenant=cfg.tenant, **row) for row in rows[i:i + size]]
+        RuckusR1ClientModel.objects.bulk_create(
+            objs,
+            batch_size=size,
+            update_conflicts=True,
+            unique_fields=["tenant", "mac"],
+            update_fields=update_fields,
+        )
+    return ClientIngestStats(staged=len(rows), changed=len(rows), unchanged=0, observed=observed)
+
+
+_CLIENT_STAGE_TABLE = "ruckus_r1_client_stage"
+_CLIENT_STAGE_COLUMNS = (
+    ("mac", "varchar(32) NOT NULL"),
+    ("venue_id", "varchar(128) NOT NULL"),
+    ("network_id", "varchar(128) NOT NULL"),
+    ("ruckus_id", "varchar(128) NOT NULL"),
+    ("ip_address", "varchar(64) NOT NULL"),
+    ("hostname", "varchar(255) NOT NULL"),
+    ("vlan", "integer"),
+    ("ssid", "varchar(128) NOT NULL"),
+    ("last_seen", "timestamp with time zone"),
+    ("raw", "jsonb NOT NULL"),
+    ("raw_compressed", "bytea"),
+    ("raw_hash", "varchar(64) NOT NULL"),
+    ("custom_field_data", "jsonb NOT NULL"),
+)
+
+
+def _copy_ingest_enabled() -> bool:
+    return connection.vendor == "postgresql" and bool(plugin_cfg("client_copy_ingest", True))
+
+
+def _stage_value(column: str, row: Dict[str, Any]) -> Any:
+    value = row.get(column)
+    if column in ("raw", "custom_field_data"):
+        return json.dumps(value if value is not None else {}, default=str)
+    if column == "raw_compressed":
+        # bytea hex input format, accepted by both COPY paths
+        return None if value is None else "\\x" + bytes(value).hex()
+    if column == "vlan" or column == "last_seen":
+        return value
+    return "" if value is None else str(value)
+
+
+def _copy_rows_to_stage(cursor, rows: List[Dict[str, Any]]) -> None:
+    columns = [c for c, _ in _CLIENT_STAGE_COLUMNS]
+    copy_sql = f"COPY {_CLIENT_STAGE_TABLE} ({', '.join(columns)}) FROM STDIN"
+
+    if hasattr(cursor, "copy"):
+        # psycopg 3
+        with cursor.copy(copy_sql) as copy:
+            for row in rows:
+                copy.write_row([_stage_value(c, row) for c in columns])
+        return
+
+    # psycopg2: stream CSV, NULL written as \N so that empty strings stay empty strings
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        values = [_stage_value(c, row) for c in columns]
+        writer.writerow(["\\N" if v is None else v for v in values])
+    buf.seek(0)
+    cursor.copy_expert(f"{copy_sql} WITH (FORMAT csv, NULL '\\N')", buf)
+
+
+def _copy_upsert_clients(cfg: RuckusR1TenantConfig, rows: List[Dict[str, Any]], fields: Tuple[str, ...]) -> ClientIngestStats:
+    """
+    PostgreSQL path: COPY the rows into a temporary staging table, then merge them into the client table
+    with one set-based INSERT ... ON CONFLICT DO UPDATE. Rows whose values are identical are not rewritten.
+    `rows` must already be deduplicated.
+    """
+    table = connection.ops.quote_name(RuckusR1ClientModel._meta.db_table)
+    columns = [c for c, _ in _CLIENT_STAGE_COLUMNS]
+    col_list = ", ".join(columns)
+    # last_seen never moves backwards and alone only forces a rewrite once it is older than the granularity
+    set_clause = ", ".join(
+        "last_seen = GREATEST(t.last_seen, EXCLUDED.last_seen)" if c == "last_seen" else f"{c} = EXCLUDED.{c}"
+        for c in fields
+    )
+    compared = [c for c in fields if c != "last_seen"]
+    old_values = ", ".join(f"t.{c}" for c in compared)
+    new_values = ", ".join(f"EXCLUDED.{c}" for c in compared)
+    stage_ddl = ", ".join(f"{c} {t}" for c, t in _CLIENT_STAGE_COLUMNS)
+
+    merge_sql = f"""
+        WITH merged AS (
+            INSERT INTO {table} AS t (created, last_updated, tenant_id, {col_list})
+            SELECT now(), now(), %s, {col_list} FROM {_CLIENT_STAGE_TABLE}
+            ON CONFLICT (tenant_id, mac) DO UPDATE
+                SET {set_clause}, last_updated = EXCLUDED.last_updated
+                WHERE ({old_values}) IS DISTINCT FROM ({new_values})
+                   OR t.last_seen IS NULL
+                   OR t.last_seen < EXCLUDED.last_seen - %s
+            RETURNING 1
+        )
+        SELECT count(*) FROM merged
+    """
+
+    # history: stage rows that are new or whose tracked columns differ from the stored row, before the merge
+    tracked = [c for c in _CLIENT_TRACKED_FIELDS if c in fields]
+    observation_sql = f"""
+        INSERT INTO {connection.ops.quote_name(RuckusR1ClientObservation._meta.db_table)}
+            (tenant_id, mac, observed, venue_id, network_id, ruckus_id, ip_address, ssid, vlan)
+        SELECT %s, s.mac, COALESCE(s.last_seen, now()), s.venue_id, s.network_id, s.ruckus_id, s.ip_address, s.ssid,
+               {"s.vlan" if "vlan" in fields else "t.vlan"}
+        FROM {_CLIENT_STAGE_TABLE} s
+        LEFT JOIN {table} t ON t.tenant_id = %s AND t.mac = s.mac
+        WHERE t.id IS NULL
+           OR ({", ".join(f"t.{c}" for c in tracked)}) IS DISTINCT FROM ({", ".join(f"s.{c}" for c in tracked)})
+    """
+
+    observed = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"CREATE TEMPORARY TABLE IF NOT EXISTS {_CLIENT_STAGE_TABLE} ({stage_ddl}) ON COMMIT DROP")
+        cursor.execute(f"TRUNCATE {_CLIENT_STAGE_TABLE}")
+        _copy_rows_to_stage(cursor, rows)
+        if _client_history_enabled():
+            cursor.execute(observation_sql, [cfg.tenant_id, cfg.tenant_id])
+            observed = max(0, cursor.rowcount)
+        cursor.execute(merge_sql, [cfg.tenant_id, _client_seen_granularity()])
+        changed = int(cursor.fetchone()[0] or 0)
+
+    return ClientIngestStats(staged=len(rows), changed=changed, unchanged=len(rows) - changed, observed=observed)
+
+
+def _upsert_client_rows(
+    cfg: RuckusR1TenantConfig,
+    rows: List[Dict[str, Any]],
+    fields: Tuple[str, ...],
+    stats: Optional[ClientIngestStats] = None,
+) -> ClientIngestStats:
+    """
+    Write client rows (dicts of RuckusR1Client column values, without tenant).
+    Uses COPY + set-based merge on PostgreSQL, the ORM bulk path elsewhere (or with client_copy_ingest=False).
+    """
+    rows = _dedupe_client_rows(rows)
+    _apply_raw_storage(cfg, rows)
+    if rows and _client_history_enabled():
+        ensure_partitions([row.get("last_seen") for row in rows] + [_now()])
+    if not rows:
+        result = ClientIngestStats()
+    elif _copy_ingest_enabled():
+        result = _copy_upsert_clients(cfg, rows, fields)
+    else:
+        result = _bulk_upsert_clients(cfg, rows, fields)
+    if stats is not None:
+        stats.add(result)
+    return result
+
+
 # -----------------
 # API query adapter
 # -----------------
@@ -841,7 +1583,8 @@ def _cable_supports_legacy_fields(Cable) -> bool:
     )
 
 
-def _cable_exists_between(a_iface, b_iface) -> bool:
+def _cable_between(a_iface, b_iface) -> Optional[int]:
+    """ID of an existing cable connecting the two interfaces (either direction), or None."""
     Cable = _nb_model("dcim", "Cable")
     ct_iface = ContentType.objects.get_for_model(a_iface.__class__)
 
@@ -849,10 +1592,10 @@ def _cable_exists_between(a_iface, b_iface) -> bool:
         return Cable.objects.filter(
             termination_a_type=ct_iface, termination_a_id=a_iface.id,
             termination_b_type=ct_iface, termination_b_id=b_iface.id,
-        ).exists() or Cable.objects.filter(
+        ).values_list("pk", flat=True).first() or Cable.objects.filter(
             termination_a_type=ct_iface, termination_a_id=b_iface.id,
             termination_b_type=ct_iface, termination_b_id=a_iface.id,
-        ).exists()
+        ).values_list("pk", flat=True).first()
 
     CableTermination = _nb_model("dcim", "CableTermination")
     a_ids = set(
@@ -860,19 +1603,29 @@ def _cable_exists_between(a_iface, b_iface) -> bool:
         .values_list("cable_id", flat=True)
     )
     if not a_ids:
-        return False
+        return None
     b_ids = set(
         CableTermination.objects.filter(termination_type=ct_iface, termination_id=b_iface.id)
         .values_list("cable_id", flat=True)
     )
-    return bool(a_ids.intersection(b_ids))
+    return min(a_ids.intersection(b_ids), default=None)
+
+
+def _iface_link_key(a_iface, b_iface) -> str:
+    return _link_map_key(
+        _interface_map_key(a_iface.device, a_iface.name),
+        _interface_map_key(b_iface.device, b_iface.name),
+    )
 
 
 def _create_cable(a_iface, b_iface, status: str = "connected") -> bool:
     Cable = _nb_model("dcim", "Cable")
     ct_iface = ContentType.objects.get_for_model(a_iface.__class__)
+    map_key = _iface_link_key(a_iface, b_iface)
 
-    if _cable_exists_between(a_iface, b_iface):
+    cable_id = _cable_between(a_iface, b_iface)
+    if cable_id:
+        _idmap_remember("cable", map_key, Cable(pk=cable_id))
         return False
 
     if _cable_supports_legacy_fields(Cable):
@@ -884,7 +1637,7 @@ def _create_cable(a_iface, b_iface, status: str = "connected") -> bool:
         )
         if "status" in {f.name for f in Cable._meta.get_fields()}:
             kwargs["status"] = status
-        Cable.objects.create(**kwargs)
+        _idmap_remember("cable", map_key, Cable.objects.create(**kwargs))
         return True
 
     CableTermination = _nb_model("dcim", "CableTermination")
@@ -902,6 +1655,7 @@ def _create_cable(a_iface, b_iface, status: str = "connected") -> bool:
 
     CableTermination.objects.create(**a_kwargs)
     CableTermination.objects.create(**b_kwargs)
+    _idmap_remember("cable", map_key, cable)
     return True
 
 
@@ -929,10 +1683,14 @@ def _create_wireless_link_best_effort(
     if b_mac:
         _upsert_macaddress_best_effort(b_iface, b_mac)
 
+    map_key = _iface_link_key(a_iface, b_iface)
     qs = WirelessLink.objects.all()
-    if qs.filter(interface_a=a_iface, interface_b=b_iface).exists():
-        return False
-    if qs.filter(interface_a=b_iface, interface_b=a_iface).exists():
+    existing = (
+        qs.filter(interface_a=a_iface, interface_b=b_iface).values_list("pk", flat=True).first()
+        or qs.filter(interface_a=b_iface, interface_b=a_iface).values_list("pk", flat=True).first()
+    )
+    if existing:
+        _idmap_remember("wirelesslink", map_key, WirelessLink(pk=existing))
         return False
 
     obj = WirelessLink(
@@ -950,17 +1708,71 @@ def _create_wireless_link_best_effort(
 
     try:
         obj.save()
-        return True
     except Exception:
         return False
+    _idmap_remember("wirelesslink", map_key, obj)
+    return True
 
 
 # -----------------
 # Switch ports + wired clients
 # -----------------
 
-def _sync_switch_ports_for_venue(cfg: RuckusR1TenantConfig, api: RuckusR1Client, site: Site, location, venue_id: str, vlan_name_map: Optional[Dict[int, str]] = None) -> Tuple[int, int, int]:
+# Switch port fields that end up in NetBox (interface, MAC, VLANs, description); counters are ignored for change detection
+_PORT_HASH_FIELDS = (
+    "switchName", "switchModel", "portMac", "adminStatus", "portSpeedCapacity", "portSpeed", "poeEnabled",
+    "unTaggedVlan", "accessVlan", "nativeVlan", "managementTrafficVlan", "vlanIds",
+    "tags", "neighborName", "status", "portConnectorType", "opticsType",
+)
+
+
+def _port_identity(p: Dict[str, Any]) -> Tuple[str, str]:
+    """(switch serial, port name) of a switchPorts row; identity map key is '<serial>:<port>'."""
+    return ((p.get("switchUnitId") or "").strip(), (p.get("portIdentifier") or p.get("name") or "").strip())
+
+
+def _port_vids(p: Dict[str, Any]) -> List[int]:
+    """VLAN IDs referenced by a switch port (unTaggedVlan/accessVlan/nativeVlan/managementTrafficVlan/vlanIds)."""
+    vids: List[int] = []
+    for key in ("unTaggedVlan", "accessVlan", "nativeVlan", "managementTrafficVlan"):
+        v = p.get(key)
+        try:
+            if v is not None and str(v).strip() != "":
+                vids.append(int(str(v).strip()))
+        except Exception:
+            pass
+
+    vlan_ids = p.get("vlanIds")
+    if isinstance(vlan_ids, list):
+        for v in vlan_ids:
+            try:
+                vids.append(int(str(v).strip()))
+            except Exception:
+                pass
+    elif isinstance(vlan_ids, str):
+        # e.g. "1,10,20"
+        for part in vlan_ids.replace(";", ",").split(","):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                vids.append(int(part))
+            except Exception:
+                pass
+    return sorted({v for v in vids if isinstance(v, int)})
+
+
+def _port_hash(cfg: RuckusR1TenantConfig, site_pk, location_pk, p: Dict[str, Any], vids: List[int], vlan_name_map: Optional[Dict[int, str]]) -> str:
+    return _content_hash(
+        site_pk, location_pk, cfg.allow_stub_devices,
+        {k: p.get(k) for k in _PORT_HASH_FIELDS},
+        {vid: (vlan_name_map or {}).get(vid, "") for vid in vids},
+    )
+
+
+def _sync_switch_ports_for_venue(cfg: RuckusR1TenantConfig, site: Site, location, rows: List[Dict[str, Any]], vlan_name_map: Optional[Dict[int, str]] = None) -> Tuple[int, int, int]:
     """
+    Apply prefetched rows of /venues/switches/switchPorts/query.
     Returns: (touched_ifaces, touched_macs, touched_vlans)
     VLANs are inferred from switch port VLAN fields (vlanIds/unTaggedVlan/accessVlan/managementTrafficVlan).
     """
@@ -968,7 +1780,6 @@ def _sync_switch_ports_for_venue(cfg: RuckusR1TenantConfig, api: RuckusR1Client,
     touched_macs = 0
     touched_vlans = 0
 
-    rows = _query_all(api, "/venues/switches/switchPorts/query", {"venueId": venue_id, "limit": 5000})
     if not rows:
         return (0, 0, 0)
 
@@ -976,8 +1787,20 @@ def _sync_switch_ports_for_venue(cfg: RuckusR1TenantConfig, api: RuckusR1Client,
         if not isinstance(p, dict):
             continue
 
-        switch_unit_id = (p.get("switchUnitId") or "").strip()
-        if not switch_unit_id:
+        switch_unit_id, ifname = _port_identity(p)
+        if not switch_unit_id or not ifname:
+            continue
+
+        # VLAN inference
+        vids = _port_vids(p)
+
+        # Unchanged since the last sync -> skip the switch lookup and all interface/VLAN writes
+        iface_key = f"{switch_unit_id}:{ifname}"
+        port_hash = _port_hash(cfg, site.pk, getattr(location, "pk", None), p, vids, vlan_name_map)
+        if _idmap_unchanged("interface", iface_key, port_hash):
+            _idmap_seen("device", switch_unit_id)
+            for vid in vids:
+                _idmap_seen("vlan", f"{_current_venue_id()}:{vid}")
             continue
 
         sw = Device.objects.filter(tenant=cfg.tenant, site=site, serial=switch_unit_id).first()
@@ -989,10 +1812,6 @@ def _sync_switch_ports_for_venue(cfg: RuckusR1TenantConfig, api: RuckusR1Client,
         if not sw:
             continue
 
-        ifname = (p.get("portIdentifier") or p.get("name") or "").strip()
-        if not ifname:
-            continue
-
         iface = _ensure_interface(sw, ifname)
         touched_ifaces += 1
 
@@ -1006,36 +1825,8 @@ def _sync_switch_ports_for_venue(cfg: RuckusR1TenantConfig, api: RuckusR1Client,
         speed_kbps = _capacity_to_kbps(p.get("portSpeedCapacity") or "") or _parse_link_speed_to_kbps(p.get("portSpeed") or "")
         poe_enabled = p.get("poeEnabled")
 
-        # VLAN inference
-        vids: List[int] = []
-        for key in ("unTaggedVlan", "accessVlan", "nativeVlan", "managementTrafficVlan"):
-            v = p.get(key)
-            try:
-                if v is not None and str(v).strip() != "":
-                    vids.append(int(str(v).strip()))
-            except Exception:
-                pass
-
-        vlan_ids = p.get("vlanIds")
-        if isinstance(vlan_ids, list):
-            for v in vlan_ids:
-                try:
-                    vids.append(int(str(v).strip()))
-                except Exception:
-                    pass
-        elif isinstance(vlan_ids, str):
-            # e.g. "1,10,20"
-            for part in vlan_ids.replace(";", ",").split(","):
-                part = part.strip()
-                if not part:
-                    continue
-                try:
-                    vids.append(int(part))
-                except Exception:
-                    pass
-
         # Dedup + create
-        for vid in sorted({v for v in vids if isinstance(v, int)}):
+        for vid in vids:
             vname = (vlan_name_map or {}).get(vid, "")
             if _upsert_vlan(cfg, site, vid, name=vname):
                 touched_vlans += 1
@@ -1063,90 +1854,132 @@ def _sync_switch_ports_for_venue(cfg: RuckusR1TenantConfig, api: RuckusR1Client,
             poe_enabled=bool(poe_enabled) if poe_enabled is not None else None,
             description=" | ".join(desc_parts).strip(),
         )
+        if iface.device_id == sw.pk and sw.serial == switch_unit_id:
+            _idmap_set_hash("interface", iface_key, port_hash)
 
     return (touched_ifaces, touched_macs, touched_vlans)
 
 
-def _sync_switch_clients_for_venue(
-    cfg: RuckusR1TenantConfig,
-    api: RuckusR1Client,
-    site: Site,
-    location,
-    venue_id: str
-) -> Tuple[int, int, int]:
-    processed_clients = 0
-    touched_ifaces = 0
-    touched_cables = 0
-
-    rows = _query_all(api, "/venues/switches/clients/query", {"venueId": venue_id, "limit": 5000})
-    if not rows:
-        return (0, 0, 0)
+def _wired_client_row(cl: Dict[str, Any], venue_id: str) -> Tuple[Dict[str, Any], str]:
+    """Client table row for a /venues/switches/clients/query row, plus the switch port it hangs off."""
+    mac = _norm_mac(cl.get("macAddress") or cl.get("mac") or cl.get("clientMac") or cl.get("deviceMac") or "")
+    ip = (cl.get("ipAddress") or cl.get("ip") or "").strip()
+    hostname = (cl.get("hostname") or cl.get("name") or "").strip()
 
-    for cl in rows:
-        if not isinstance(cl, dict):
-            continue
+    vlan_raw = cl.get("vlan") or cl.get("vlanId") or cl.get("accessVlan") or None
+    vlan_int: Optional[int] = None
+    try:
+        if vlan_raw is not None and str(vlan_raw).strip() != "":
+            vlan_int = int(str(vlan_raw).strip())
+    except Exception:
+        vlan_int = None
 
-        mac = _norm_mac(cl.get("macAddress") or cl.get("mac") or cl.get("clientMac") or cl.get("deviceMac") or "")
-        ip = (cl.get("ipAddress") or cl.get("ip") or "").strip()
-        hostname = (cl.get("hostname") or cl.get("name") or "").strip()
+    switch_unit_id = (cl.get("switchUnitId") or cl.get("switchSerialNumber") or cl.get("switchSerial") or "").strip()
+    port_name = (cl.get("portIdentifier") or cl.get("port") or cl.get("connectedPort") or "").strip()
 
-        vlan_raw = cl.get("vlan") or cl.get("vlanId") or cl.get("accessVlan") or None
-        vlan_int: Optional[int] = None
-        try:
-            if vlan_raw is not None and str(vlan_raw).strip() != "":
-                vlan_int = int(str(vlan_raw).strip())
-        except Exception:
-            vlan_int = None
+    vinfo = cl.get("venueInformation") or {}
+    venue_id_effective = (vinfo.get("id") or venue_id or "").strip()
 
-        switch_unit_id = (cl.get("switchUnitId") or cl.get("switchSerialNumber") or cl.get("switchSerial") or "").strip()
-        port_name = (cl.get("portIdentifier") or cl.get("port") or cl.get("connectedPort") or "").strip()
+    if not _looks_like_mac(mac):
+        for _, v in cl.items():
+            if isinstance(v, str) and _looks_like_mac(v):
+                mac = _norm_mac(v)
+                break
 
-        vinfo = cl.get("venueInformation") or {}
-        venue_id_effective = (vinfo.get("id") or venue_id or "").strip()
+    if not _looks_like_mac(mac):
+        mac = "unknown"
+
+    return ({
+        "mac": mac,
+        "venue_id": venue_id_effective,
+        "network_id": _safe_str(cl.get("networkId") or "", 128),
+        "ruckus_id": (switch_unit_id or "")[:128],
+        "ip_address": ip or "",
+        "hostname": hostname or "",
+        "vlan": vlan_int,
+        "ssid": "",  # wired
+        "last_seen": _client_last_seen(cl),
+        "raw": cl,
+        "custom_field_data": {},
+    }, port_name)
+
+
+def _wired_client_hash(site_pk, location_pk, row: Dict[str, Any], port_name: str, cl: Dict[str, Any]) -> str:
+    return _content_hash(
+        site_pk, location_pk, row["mac"], row["ip_address"], row["hostname"], row["vlan"], row["ruckus_id"], port_name,
+        cl.get("deviceType") or cl.get("modelName") or cl.get("manufacturer") or "",
+    )
 
-        if not _looks_like_mac(mac):
-            for _, v in cl.items():
-                if isinstance(v, str) and _looks_like_mac(v):
-                    mac = _norm_mac(v)
-                    break
 
-        if not _looks_like_mac(mac):
-            mac = "unknown"
+def _wired_client_device(
+    cfg: RuckusR1TenantConfig,
+    site: Site,
+    location,
+    cl: Dict[str, Any],
+    switch_unit_id: str,
+    port_name: str,
+) -> Tuple[Optional[Device], int, int]:
+    """dcim.Device + eth0 for one wired client, cabled to its switch port. Returns: (device, touched_ifaces, touched_cables)"""
+    client_dev, _ = _upsert_wired_client_as_dcim_device(cfg, site, location, cl, iface_name="eth0")
+    if not client_dev:
+        return (None, 0, 0)
+    client_iface = _ensure_interface(client_dev, "eth0")
+    touched_ifaces = 1
+    touched_cables = 0
+    if switch_unit_id and port_name:
+        sw = Device.objects.filter(tenant=cfg.tenant, site=site, serial=switch_unit_id).first()
+        if sw:
+            sw_iface = _ensure_interface(sw, port_name)
+            touched_ifaces += 1
+            if _create_cable(sw_iface, client_iface, status="connected"):
+                touched_cables += 1
+    return (client_dev, touched_ifaces, touched_cables)
 
-        RuckusR1ClientModel.objects.update_or_create(
-            tenant=cfg.tenant,
-            mac=mac,
-            defaults={
-                "venue_id": venue_id_effective,
-                "network_id": _safe_str(cl.get("networkId") or "", 128),
-                "ruckus_id": (switch_unit_id or "")[:128],
-                "ip_address": ip or "",
-                "hostname": hostname or "",
-                "vlan": vlan_int,
-                "ssid": "",  # wired
-                "last_seen": None,
-                "raw": cl,
-                "custom_field_data": {},
-            },
-        )
 
-        client_dev = None
-        client_iface = None
-        if mac != "unknown":
-            client_dev, _ = _upsert_wired_client_as_dcim_device(cfg, site, location, cl, iface_name="eth0")
-            if client_dev:
-                client_iface = _ensure_interface(client_dev, "eth0")
-                touched_ifaces += 1
+def _sync_switch_clients_for_venue(
+    cfg: RuckusR1TenantConfig,
+    site: Site,
+    location,
+    venue_id: str,
+    chunks: Iterable[List[Dict[str, Any]]],
+    client_stats: Optional[ClientIngestStats] = None,
+    *,
+    devices: bool = True,
+) -> Tuple[int, int, int]:
+    """
+    Apply rows of /venues/switches/clients/query. Returns: (clients, touched_ifaces, touched_cables)
+    With devices=False (client_storage_mode="table") only clients already materialized as devices are upserted.
+    `chunks` are the pages streamed from the fetch stage; each is written and released before the next one.
+    """
+    processed_clients = 0
+    touched_ifaces = 0
+    touched_cables = 0
 
-        if client_dev and client_iface and switch_unit_id and port_name:
-            sw = Device.objects.filter(tenant=cfg.tenant, site=site, serial=switch_unit_id).first()
-            if sw:
-                sw_iface = _ensure_interface(sw, port_name)
-                touched_ifaces += 1
-                if _create_cable(sw_iface, client_iface, status="connected"):
-                    touched_cables += 1
+    for chunk in chunks:
+        decoded = [(_wired_client_row(cl, venue_id), cl) for cl in chunk if isinstance(cl, dict)]
+        del chunk
+        _upsert_client_rows(cfg, [row for (row, _), _ in decoded], _WIRED_CLIENT_FIELDS, client_stats)
+        processed_clients += len(decoded)
 
-        processed_clients += 1
+        for (row, port_name), cl in _last_per_mac(decoded, key=lambda item: item[0][0]["mac"]):
+            switch_unit_id = row["ruckus_id"]
+            client_key = _mac_to_serial(row["mac"])
+            if not (devices or _idmap_mapped("device", client_key)):
+                continue
+            client_hash = _wired_client_hash(site.pk, getattr(location, "pk", None), row, port_name, cl)
+            if _idmap_unchanged("device", client_key, client_hash):
+                _mark_client_seen(client_key, "eth0", cl)
+                if switch_unit_id and port_name:
+                    port_key = f"{switch_unit_id}:{port_name}"
+                    _idmap_seen("interface", port_key)
+                    _idmap_seen("cable", _link_map_key(port_key, f"{client_key}:eth0"))
+                continue
+
+            client_dev, it, ct = _wired_client_device(cfg, site, location, cl, switch_unit_id, port_name)
+            touched_ifaces += it
+            touched_cables += ct
+            if client_dev:
+                _idmap_set_hash("device", client_key, client_hash)
 
     return (processed_clients, touched_ifaces, touched_cables)
 
@@ -1155,365 +1988,2133 @@ def _sync_switch_clients_for_venue(
 # Topology sync (wired + wireless links)
 # -----------------
 
-def _sync_topologies_for_venue(cfg: RuckusR1TenantConfig, api: RuckusR1Client, site: Site, location, venue_id: str) -> Tuple[int, int, int, int]:
+def _fetch_topology_blob(api: RuckusR1Client, venue_id: str) -> Optional[Dict[str, Any]]:
+    """GET /venues/{venueId}/topologies -> first topology blob ({nodes, edges}) or None."""
+    topo = api._get(f"/venues/{venue_id}/topologies")
+    if isinstance(topo, dict):
+        data = topo.get("data")
+        if isinstance(data, list) and data and isinstance(data[0], dict):
+            return data[0]
+    return None
+
+
+_WIRELESS_EDGE_TYPES = {"mesh", "wireless", "wirelessmesh", "smartmesh", "apmesh", "ap-mesh", "wireless-mesh"}
+
+
+@dataclass
+class _TopologyEdge:
+    """One R1 topology edge, normalized."""
+    wired: bool
+    status: str
+    from_serial: str
+    to_serial: str
+    from_mac: str
+    to_mac: str
+    from_name: str
+    to_name: str
+    from_port: str = ""
+    to_port: str = ""
+    speed_kbps: Optional[int] = None
+    poe_enabled: Optional[bool] = None
+
+
+def _topology_graph(blob: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[_TopologyEdge]]:
+    """(nodes, edges) of a topology blob; edges of other connection types are dropped."""
+    nodes = [n for n in (blob.get("nodes") if isinstance(blob.get("nodes"), list) else []) if isinstance(n, dict)]
+    edges: List[_TopologyEdge] = []
+    for e in blob.get("edges") if isinstance(blob.get("edges"), list) else []:
+        if not isinstance(e, dict):
+            continue
+        ctype = (e.get("connectionType") or "").strip().lower()
+        wired = ctype == "wired"
+        if not wired and not (ctype in _WIRELESS_EDGE_TYPES or "mesh" in ctype or "wireless" in ctype):
+            continue
+        poe_enabled = e.get("poeEnabled")
+        edges.append(_TopologyEdge(
+            wired=wired,
+            status=(e.get("connectionStatus") or "").strip(),
+            from_serial=(e.get("fromSerial") or "").strip(),
+            to_serial=(e.get("toSerial") or "").strip(),
+            from_mac=(e.get("fromMac") or "").strip(),
+            to_mac=(e.get("toMac") or "").strip(),
+            from_name=(e.get("fromName") or "").strip(),
+            to_name=(e.get("toName") or "").strip(),
+            from_port=(e.get("connectedPort") or "uplink").strip() if wired else "mesh",
+            to_port=(e.get("correspondingPort") or "uplink").strip() if wired else "mesh",
+            speed_kbps=_parse_link_speed_to_kbps(e.get("linkSpeed") or "") if wired else None,
+            poe_enabled=bool(poe_enabled) if wired and poe_enabled is not None else None,
+        ))
+    return nodes, edges
+
+
+def _devices_by_mac(cfg: RuckusR1TenantConfig, site: Site, macs) -> Dict[str, Device]:
+    """
+    Bulk version of _find_device_by_any_mac: MAC -> Device of this tenant/site, for all `macs` in at most
+    three queries (dcim.MACAddress, then Interface.mac_address on NetBox builds that still have it).
+    """
+    wanted = {_norm_mac(m) for m in macs}
+    wanted = {m for m in wanted if _looks_like_mac(m)}
+    if not wanted:
+        return {}
+    Interface = _nb_model("dcim", "Interface")
+    device_ids: Dict[str, int] = {}
+
+    try:
+        MACAddress = _nb_model("dcim", "MACAddress")
+        rows = list(
+            MACAddress.objects.filter(
+                mac_address__in=wanted, assigned_object_type=ContentType.objects.get_for_model(Interface)
+            ).values_list("mac_address", "assigned_object_id")
+        )
+        iface_devices = dict(
+            Interface.objects.filter(pk__in=[i for _, i in rows], device__tenant=cfg.tenant, device__site=site)
+            .values_list("pk", "device_id")
+        )
+        for mac, iface_id in rows:
+            if iface_id in iface_devices:
+                device_ids.setdefault(_norm_mac(str(mac)), iface_devices[iface_id])
+    except Exception:
+        pass
+
+    missing = wanted - set(device_ids)
+    if missing:
+        try:
+            for mac, dev_id in Interface.objects.filter(
+                device__tenant=cfg.tenant, device__site=site, mac_address__in=missing,
+            ).values_list("mac_address", "device_id"):
+                device_ids.setdefault(_norm_mac(str(mac)), dev_id)
+        except Exception:
+            pass
+
+    devices = Device.objects.in_bulk(set(device_ids.values()))
+    return {mac: devices[dev_id] for mac, dev_id in device_ids.items() if dev_id in devices}
+
+
+class _TopologyIndex:
+    """
+    Endpoint resolution for one venue graph: devices by serial and by MAC, each loaded in one pass,
+    plus the stub devices created for unknown endpoints (created once per venue, not once per edge).
+    """
+
+    def __init__(self, cfg: RuckusR1TenantConfig, site: Site, location, nodes: List[Dict[str, Any]], edges: List[_TopologyEdge]):
+        self.cfg = cfg
+        self.site = site
+        self.location = location
+        serials = {(n.get("serial") or n.get("serialNumber") or "").strip()[:50] for n in nodes}
+        serials |= {s[:50] for e in edges for s in (e.from_serial, e.to_serial)}
+        serials.discard("")
+        self.by_serial: Dict[str, Device] = {d.serial: d for d in Device.objects.filter(serial__in=serials)}
+        macs = {(n.get("mac") or "").strip() for n in nodes} | {m for e in edges for m in (e.from_mac, e.to_mac)}
+        self.by_mac: Dict[str, Device] = _devices_by_mac(cfg, site, macs)
+        self.stubs: Dict[str, Device] = {}
+        self.stats: Counter = Counter()
+        # identity map keys this graph produced; stored on the topology snapshot and re-marked seen when skipped
+        self.keys: Dict[str, Set[str]] = {}
+
+    def touch(self, object_type: str, key: str) -> None:
+        key = _map_key(key)
+        if key:
+            self.keys.setdefault(object_type, set()).add(key)
+            _idmap_seen(object_type, key)
+
+    def add(self, device: Device) -> Device:
+        if device.serial:
+            self.by_serial[device.serial] = device
+        return device
+
+    def resolve(self, serial: str, mac: str, name: str) -> Optional[Device]:
+        dev = self.by_serial.get(serial[:50]) if serial else None
+        if dev is None and mac:
+            dev = self.by_mac.get(_norm_mac(mac))
+        if dev is None and self.cfg.allow_stub_devices:
+            stub_serial = serial or (_mac_to_serial(mac) if _looks_like_mac(mac) else "")
+            stub_key = stub_serial or name or "device"
+            dev = self.stubs.get(stub_key)
+            if dev is None:
+                dev = self.add(_get_or_create_device_infra(
+                    self.cfg, self.site, self.location, "Device", "Device", name or stub_serial or "device", serial=stub_serial,
+                ))
+                self.stubs[stub_key] = dev
+                self.stats["topology_stubs"] += 1
+        if dev is not None:
+            self.touch("device", _device_map_key(dev.serial, dev.name))
+        return dev
+
+
+def _topology_node_type(n: Dict[str, Any]) -> Tuple[str, str]:
+    """(role, model) of the device a topology node becomes."""
+    n_type = (n.get("type") or n.get("deviceType") or "").strip().lower()
+    model = (n.get("model") or "").strip()
+    if "switch" in n_type:
+        return "Switch", model or "Switch"
+    if "ap" in n_type:
+        return "Access Point", model or "Access Point"
+    return "Device", model or "Device"
+
+
+def _sync_topology_node(index: _TopologyIndex, n: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Create the device of a topology node only if no AP/switch phase (or earlier run) produced it.
+    Existing devices are not updated here; their management MAC and IP are only written when missing.
+    Returns (touched_ifaces, touched_macs).
+    """
+    name = (n.get("name") or "").strip()
+    mac = (n.get("mac") or "").strip()
+    serial = (n.get("serial") or n.get("serialNumber") or "").strip()
+    ip = (n.get("ipAddress") or n.get("ip") or "").strip()
+    role, model = _topology_node_type(n)
+
+    dev = index.by_serial.get(serial[:50]) if serial else None
+    if dev is None and mac:
+        dev = index.by_mac.get(_norm_mac(mac))
+    created = dev is None
+    if created:
+        dev = index.add(_get_or_create_device_infra(
+            index.cfg, index.site, index.location, role, model, name or serial or mac or "device", serial=serial,
+        ))
+        index.stats["topology_nodes_created"] += 1
+    index.touch("device", _device_map_key(dev.serial, dev.name))
+
+    if ip:
+        if not _idmap_mapped("ip", _ip_map_key(ip)):
+            _upsert_ip(index.cfg, ip)
+        index.touch("ip", _ip_map_key(ip))
+
+    if mac and (created or index.by_mac.get(_norm_mac(mac)) is None):
+        mgmt = _ensure_interface(dev, "mgmt")
+        touched_macs = int(_upsert_macaddress_best_effort(mgmt, mac))
+        if _looks_like_mac(_norm_mac(mac)):
+            index.by_mac[_norm_mac(mac)] = dev
+        index.touch("interface", _interface_map_key(dev, "mgmt"))
+        return (1, touched_macs)
+    if mac:
+        index.touch("interface", _interface_map_key(dev, "mgmt"))
+    return (0, 0)
+
+
+def _sync_topologies_for_venue(
+    cfg: RuckusR1TenantConfig,
+    site: Site,
+    location,
+    blob: Optional[Dict[str, Any]],
+    *,
+    stats: Optional[Counter] = None,
+    keys: Optional[Dict[str, Set[str]]] = None,
+) -> Tuple[int, int, int, int]:
+    """
+    Apply a venue topology graph as a diff: endpoints are resolved from a per-venue device/MAC index, and each
+    edge is compared with the content hash stored on its cable / wireless link in the identity map. Edges
+    already applied from identical data are only marked seen; only new or changed edges are written. Edges that
+    disappeared from the graph are left to authoritative reconciliation (authoritative_cabling / _wireless).
+    Returns: (touched_ifaces, touched_macs, touched_cables, touched_wlinks)
+    """
     touched_ifaces = 0
     touched_macs = 0
     touched_cables = 0
     touched_wlinks = 0
 
-    topo = api._get(f"/venues/{venue_id}/topologies")
-    blob = None
-    if isinstance(topo, dict):
-        data = topo.get("data")
-        if isinstance(data, list) and data:
-            blob = data[0]
     if not isinstance(blob, dict):
         return (0, 0, 0, 0)
 
-    nodes = blob.get("nodes") if isinstance(blob.get("nodes"), list) else []
-    edges = blob.get("edges") if isinstance(blob.get("edges"), list) else []
+    nodes, edges = _topology_graph(blob)
+    index = _TopologyIndex(cfg, site, location, nodes, edges)
 
     for n in nodes:
-        if not isinstance(n, dict):
+        it, mt = _sync_topology_node(index, n)
+        touched_ifaces += it
+        touched_macs += mt
+
+    applied: Set[str] = set()
+    for e in edges:
+        a_dev = index.resolve(e.from_serial, e.from_mac, e.from_name)
+        b_dev = index.resolve(e.to_serial, e.to_mac, e.to_name)
+        if not a_dev or not b_dev:
+            index.stats["topology_edges_unresolved"] += 1
             continue
-        n_type = (n.get("type") or n.get("deviceType") or "").strip().lower()
-        name = (n.get("name") or "").strip()
-        mac = (n.get("mac") or "").strip()
-        serial = (n.get("serial") or n.get("serialNumber") or "").strip()
-        ip = (n.get("ipAddress") or n.get("ip") or "").strip()
-        model = (n.get("model") or "").strip()
-
-        if "switch" in n_type:
-            role = "Switch"
-            model = model or "Switch"
-        elif "ap" in n_type:
-            role = "Access Point"
-            model = model or "Access Point"
-        else:
-            role = "Device"
-            model = model or "Device"
 
-        dev = _get_or_create_device_infra(cfg, site, location, role, model, name or serial or mac or "device", serial=serial)
+        object_type = "cable" if e.wired else "wirelesslink"
+        a_key = _interface_map_key(a_dev, e.from_port)
+        b_key = _interface_map_key(b_dev, e.to_port)
+        link_key = _link_map_key(a_key, b_key)
+        if link_key in applied:
+            continue  # same link listed from both ends
+        applied.add(link_key)
+
+        description = f"R1 topology: {e.status}".strip()
+        edge_hash = _content_hash(e.status, e.speed_kbps, e.poe_enabled, e.from_mac, e.to_mac)
+        index.touch("interface", a_key)
+        index.touch("interface", b_key)
+        if _idmap_unchanged(object_type, link_key, edge_hash):
+            index.keys.setdefault(object_type, set()).add(link_key)
+            index.stats["topology_edges_unchanged"] += 1
+            continue
+        index.stats["topology_edges_applied"] += 1
+
+        if e.wired:
+            a_iface = _ensure_interface(a_dev, e.from_port)
+            b_iface = _ensure_interface(b_dev, e.to_port)
+            touched_ifaces += 2
+            _set_interface_fields_best_effort(
+                a_iface,
+                speed_kbps=e.speed_kbps,
+                poe_enabled=e.poe_enabled,
+                description=description,
+            )
+            if _create_cable(a_iface, b_iface, status="connected"):
+                touched_cables += 1
+        elif _create_wireless_link_best_effort(
+            cfg,
+            a_dev,
+            b_dev,
+            e.from_mac,
+            e.to_mac,
+            ssid="",
+            status="active",
+            description=description,
+        ):
+            touched_wlinks += 1
+        _idmap_set_hash(object_type, link_key, edge_hash)
+        if _idmap_mapped(object_type, link_key):
+            index.keys.setdefault(object_type, set()).add(link_key)
+
+    if stats is not None:
+        stats.update(index.stats)
+    if keys is not None:
+        keys.update(index.keys)
+    return (touched_ifaces, touched_macs, touched_cables, touched_wlinks)
 
-        if ip:
-            _upsert_ip(cfg, ip)
 
-        if mac:
-            mgmt = _ensure_interface(dev, "mgmt")
-            touched_ifaces += 1
-            if _upsert_macaddress_best_effort(mgmt, mac):
-                touched_macs += 1
+# -----------------
+# Topology snapshots (skip unchanged venue graphs)
+# -----------------
 
-    for e in edges:
-        if not isinstance(e, dict):
-            continue
+def _topology_hash(site: Site, location, allow_stubs: bool, blob: Dict[str, Any]) -> str:
+    """Hash of the normalized graph plus the placement it is applied to; R1 fields that are not used are ignored."""
+    nodes, edges = _topology_graph(blob)
+    node_fields = ("type", "deviceType", "name", "mac", "serial", "serialNumber", "ipAddress", "ip", "model")
+    return _content_hash(
+        site.pk, getattr(location, "pk", None), bool(allow_stubs),
+        sorted(_content_hash(_project(n, node_fields)) for n in nodes),
+        sorted(_content_hash(dataclasses.asdict(e)) for e in edges),
+    )
 
-        ctype = (e.get("connectionType") or "").strip().lower()
-        status = (e.get("connectionStatus") or "").strip()
-
-        from_serial = (e.get("fromSerial") or "").strip()
-        to_serial = (e.get("toSerial") or "").strip()
-        from_mac = (e.get("fromMac") or "").strip()
-        to_mac = (e.get("toMac") or "").strip()
-        from_name = (e.get("fromName") or "").strip()
-        to_name = (e.get("toName") or "").strip()
-
-        a_dev = Device.objects.filter(serial=from_serial).first() if from_serial else None
-        b_dev = Device.objects.filter(serial=to_serial).first() if to_serial else None
-
-        if not a_dev and from_mac:
-            a_dev = _find_device_by_any_mac(cfg, site, from_mac)
-        if not b_dev and to_mac:
-            b_dev = _find_device_by_any_mac(cfg, site, to_mac)
-
-        if not a_dev and cfg.allow_stub_devices:
-            stub_serial = from_serial or (_mac_to_serial(from_mac) if _looks_like_mac(from_mac) else "")
-            a_dev = _get_or_create_device_infra(cfg, site, location, "Device", "Device", from_name or stub_serial or "device", serial=stub_serial)
-        if not b_dev and cfg.allow_stub_devices:
-            stub_serial = to_serial or (_mac_to_serial(to_mac) if _looks_like_mac(to_mac) else "")
-            b_dev = _get_or_create_device_infra(cfg, site, location, "Device", "Device", to_name or stub_serial or "device", serial=stub_serial)
 
-        if not a_dev or not b_dev:
+def _apply_topology(run: _SyncRun, site: Site, location, payload: _VenuePayload, counts: Counter) -> Tuple[int, int, int, int]:
+    """
+    Apply a venue topology unless its hash matches the venue's RuckusR1TopologySnapshot (then only the keys the
+    graph produced last time are marked seen, so reconciliation keeps them). Updates the snapshot in the venue
+    transaction.
+    """
+    blob = payload.topology
+    if not isinstance(blob, dict):
+        return (0, 0, 0, 0)
+    now = _now()
+    topo_hash = _topology_hash(site, location, run.cfg.allow_stub_devices, blob)
+    snapshot = RuckusR1TopologySnapshot.objects.filter(tenant_config=run.cfg, venue_id=payload.venue_id).first()
+
+    if snapshot is not None and snapshot.content_hash == topo_hash and not run.force_full:
+        for object_type, keys in (snapshot.applied_keys or {}).items():
+            for key in keys:
+                _idmap_seen(object_type, key)
+        RuckusR1TopologySnapshot.objects.filter(pk=snapshot.pk).update(last_checked=now, venue_name=payload.venue_name)
+        counts["topologies_unchanged"] += 1
+        return (0, 0, 0, 0)
+
+    keys: Dict[str, Set[str]] = {}
+    result = _sync_topologies_for_venue(run.cfg, site, location, blob, stats=counts, keys=keys)
+    nodes, edges = _topology_graph(blob)
+    RuckusR1TopologySnapshot.objects.update_or_create(
+        tenant_config=run.cfg,
+        venue_id=payload.venue_id,
+        defaults={
+            "venue_name": payload.venue_name[:200],
+            "previous_hash": snapshot.content_hash if snapshot else "",
+            "content_hash": topo_hash,
+            "blob": zlib.compress(json.dumps(blob, default=str, separators=(",", ":")).encode()),
+            "node_count": len(nodes),
+            "edge_count": len(edges),
+            "applied_keys": {ot: sorted(k) for ot, k in keys.items()},
+            "last_checked": now,
+            "last_changed": now if snapshot is None or snapshot.content_hash != topo_hash else snapshot.last_changed,
+        },
+    )
+    counts["topologies_applied"] += 1
+    return result
+
+
+# -----------------
+# Incremental sync (R1 change timestamps)
+# -----------------
+
+# endpoint -> (venue query path, change timestamp fields in order of preference)
+_DELTA_ENDPOINTS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "aps": ("/venues/aps/query", ("lastUpdatedTime", "lastSeenTime", "lastContacted")),
+    "switches": ("/venues/switches/query", ("lastUpdatedTime", "lastSeenTime", "lastContacted")),
+    "wifi_clients": ("/venues/aps/clients/query", ("lastUpdatedTime", "lastSeenTime", "lastUpdated")),
+    "wired_clients": ("/venues/switches/clients/query", ("lastUpdatedTime", "lastSeenTime", "lastUpdated")),
+}
+
+
+# page size of newest-first incremental queries; paging stops at the watermark
+_INCREMENTAL_PAGE_SIZE = 200
+
+
+def _incremental_overlap() -> datetime.timedelta:
+    """Safety margin subtracted from stored watermarks (R1 clock skew, rows committed late)."""
+    try:
+        seconds = int(plugin_cfg("incremental_overlap_seconds", 300))
+    except Exception:
+        seconds = 300
+    return datetime.timedelta(seconds=max(0, seconds))
+
+
+def _r1_timestamp(row: Dict[str, Any], fields: Tuple[str, ...]) -> Optional[datetime.datetime]:
+    """First parseable change timestamp of an R1 row (epoch s/ms or ISO 8601), as aware UTC datetime."""
+    for k in fields:
+        v = row.get(k)
+        if v is None or v == "":
             continue
+        if isinstance(v, (int, float)) or (isinstance(v, str) and v.strip().isdigit()):
+            n = float(v)
+            if n > 1e12:  # epoch milliseconds
+                n /= 1000.0
+            return datetime.datetime.fromtimestamp(n, tz=datetime.timezone.utc)
+        if isinstance(v, str):
+            try:
+                dt = datetime.datetime.fromisoformat(v.strip().replace("Z", "+00:00"))
+            except ValueError:
+                continue
+            return dt if dt.tzinfo else dt.replace(tzinfo=datetime.timezone.utc)
+    return None
 
-        if ctype == "wired":
-            connected_port = (e.get("connectedPort") or "uplink").strip()
-            corresponding_port = (e.get("correspondingPort") or "uplink").strip()
 
-            a_iface = _ensure_interface(a_dev, connected_port)
-            b_iface = _ensure_interface(b_dev, corresponding_port)
-            touched_ifaces += 2
+def _parse_watermark(value: Any) -> Optional[datetime.datetime]:
+    try:
+        dt = datetime.datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=datetime.timezone.utc)
 
-            speed_kbps = _parse_link_speed_to_kbps(e.get("linkSpeed") or "")
-            poe_enabled = e.get("poeEnabled")
 
-            _set_interface_fields_best_effort(
-                a_iface,
-                speed_kbps=speed_kbps,
-                poe_enabled=bool(poe_enabled) if poe_enabled is not None else None,
-                description=f"R1 topology: {status}".strip(),
+@dataclass
+class _Watermarks:
+    """Per-endpoint cutoffs used by this run, and the newest change timestamps seen while fetching."""
+    cutoffs: Dict[str, datetime.datetime] = field(default_factory=dict)
+    seen: Dict[str, datetime.datetime] = field(default_factory=dict)
+    lock: Any = field(default_factory=threading.Lock)
+
+    def observe(self, endpoint: str, ts: Optional[datetime.datetime]) -> None:
+        if ts is None:
+            return
+        with self.lock:
+            if endpoint not in self.seen or ts > self.seen[endpoint]:
+                self.seen[endpoint] = ts
+
+
+# -----------------
+# Main sync
+# -----------------
+
+@dataclass
+class _SyncRun:
+    """Per-run settings shared by all venues of one tenant config."""
+    cfg: RuckusR1TenantConfig
+    api: RuckusR1Client
+    site_group: Optional[SiteGroup]
+    mapping_mode: str
+    child_location_name: str
+    parent_site_ref: Any
+    slug_prefix: str
+    idmap: _IdentityMap
+    force_full: bool = False
+    scope: str = "all"  # SYNC_SCOPES
+    venue_fingerprints: Dict[str, str] = field(default_factory=dict)  # previous run: {_fingerprint_key(): fingerprint}
+    incremental: bool = False
+    watermarks: _Watermarks = field(default_factory=_Watermarks)
+    seen: _SeenKeys = field(default_factory=_SeenKeys)
+    summary_changelog: bool = False  # changelog_mode == "summary": coalesced change records per venue
+    client_devices: bool = True  # client_storage_mode == "devices": every client becomes a dcim.Device
+    plan_only: bool = False  # plan (dry) run: the fetch stage creates no device types
+    venue_cache: Optional[VenueMappingCache] = None  # Sites/Locations of the run's venues, prefetched once
+    query_stats: Optional[QueryStats] = None  # per-phase/venue query counting, None when off
+    profiler: Optional[SyncProfiler] = None  # cProfile capture of the run, None when off
+    memory: Optional[MemoryTracker] = None  # tracemalloc accounting, None when off
+    do_wlans: bool = True
+    do_aps: bool = True
+    do_switches: bool = True
+    do_interfaces: bool = True
+    do_wifi_clients: bool = True
+    do_wired_clients: bool = True
+    do_cabling: bool = True
+    do_wireless_links: bool = True
+    do_vlans: bool = False
+
+
+# Phases that can be scheduled independently: "infrastructure" skips clients, "clients" only refreshes them
+SYNC_SCOPES = ("all", "infrastructure", "clients")
+_SCOPE_DISABLES = {
+    "infrastructure": ("do_wifi_clients", "do_wired_clients"),
+    "clients": ("do_wlans", "do_aps", "do_switches", "do_interfaces", "do_cabling", "do_wireless_links", "do_vlans"),
+}
+
+
+def _fingerprint_key(scope: str, venue_id: str) -> str:
+    # phases fetch different data, so each keeps its own venue fingerprints
+    return venue_id if scope == "all" else f"{scope}:{venue_id}"
+
+
+def _make_sync_run(cfg: RuckusR1TenantConfig, api: RuckusR1Client, **state: Any) -> _SyncRun:
+    """
+    Build the run settings from the config (sync toggles, venue mapping); `state` fills the per-run fields.
+    The sync toggles are narrowed to the run's scope.
+    """
+    run = _SyncRun(
+        cfg=cfg,
+        api=api,
+        # Mapping config (prefer DB config, fallback to plugins.py)
+        mapping_mode=str(getattr(cfg, "venue_mapping_mode", "") or plugin_cfg("venue_mapping_mode", "sites")).strip().lower(),
+        child_location_name=str(getattr(cfg, "venue_child_location_name", "") or plugin_cfg("venue_child_location_name", "Venue")).strip(),
+        parent_site_ref=getattr(cfg, "venue_locations_parent_site", None) or plugin_cfg("venue_locations_parent_site", None),
+        # optional legacy knobs
+        slug_prefix=str(plugin_cfg("venue_slug_prefix", "r1")),
+        summary_changelog=(getattr(cfg, "changelog_mode", "") or "full") == "summary",
+        client_devices=(getattr(cfg, "client_storage_mode", "") or "devices") == "devices",
+        do_wlans=_cfg_flag(cfg, "sync_wlans", True),
+        do_aps=_cfg_flag(cfg, "sync_aps", True),
+        do_switches=_cfg_flag(cfg, "sync_switches", True),
+        do_interfaces=_cfg_flag(cfg, "sync_interfaces", True),
+        do_wifi_clients=_cfg_flag(cfg, "sync_wifi_clients", True),
+        do_wired_clients=_cfg_flag(cfg, "sync_wired_clients", True),
+        do_cabling=_cfg_flag(cfg, "sync_cabling", True),
+        do_wireless_links=_cfg_flag(cfg, "sync_wireless_links", True),
+        do_vlans=_cfg_flag(cfg, "sync_vlans", False),
+        **state,
+    )
+    if run.scope not in SYNC_SCOPES:
+        raise ValueError(f"Unknown sync scope {run.scope!r} (expected one of {', '.join(SYNC_SCOPES)})")
+    for toggle in _SCOPE_DISABLES.get(run.scope, ()):
+        setattr(run, toggle, False)
+    return run
+
+
+def _venue_ident(venue: Dict[str, Any]) -> Tuple[str, str]:
+    venue_id = _safe_str(venue.get("id") or venue.get("venueId") or "", 128)
+    venue_name = (venue.get("name") or venue.get("venueName") or venue_id or "Venue").strip()
+    return venue_id, venue_name
+
+
+# client pages of one venue that may wait between the fetch and the apply stage
+_CLIENT_STREAM_DEPTH = 2
+
+
+class _ClientStream:
+    """
+    The client rows of one venue on their way from the fetch stage to the apply stage, one R1 page
+    (client_chunk_size rows) at a time. The fetch worker keeps querying while the apply stage writes; at most
+    _CLIENT_STREAM_DEPTH pages wait in between, so a venue's client memory does not grow with its client count.
+    The fetch side also keeps the projected row hashes for the venue fingerprint.
+    """
+
+    def __init__(self, stop: Optional[threading.Event] = None) -> None:
+        self._q: "queue.Queue" = queue.Queue(maxsize=_CLIENT_STREAM_DEPTH)
+        self._stop = stop or threading.Event()
+        self._closed = threading.Event()
+        self._hashes: List[str] = []
+        self.rows = 0
+        self.waited = 0.0  # fetch side: seconds blocked on a full stream
+        self.error = ""
+
+    def _offer(self, item: Any) -> bool:
+        t0 = time.monotonic()
+        try:
+            while not (self._closed.is_set() or self._stop.is_set()):
+                try:
+                    self._q.put(item, timeout=_PIPELINE_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        finally:
+            self.waited += time.monotonic() - t0
+
+    def put(self, rows: List[Dict[str, Any]]) -> bool:
+        """Fetch side: hand over one page. False once the apply side stopped reading."""
+        self._hashes.extend(_content_hash(_project(r, _CLIENT_FINGERPRINT_FIELDS, _CLIENT_NESTED_FIELDS)) for r in rows)
+        self.rows += len(rows)
+        return self._offer(rows)
+
+    def finish(self, error: str = "") -> None:
+        """Fetch side: no more pages; a non-empty `error` fails the venue on the apply side."""
+        self.error = error
+        self._offer(_PIPELINE_DONE)
+
+    def close(self) -> None:
+        """Apply side: stop reading; a fetch worker still putting pages gives up."""
+        self._closed.set()
+
+    def __iter__(self) -> Iterator[List[Dict[str, Any]]]:
+        while True:
+            try:
+                item = self._q.get(timeout=_PIPELINE_POLL_SECONDS)
+            except queue.Empty:
+                if self._stop.is_set():
+                    raise RuntimeError("Sync stopped while waiting for client pages")
+                continue
+            if item is _PIPELINE_DONE:
+                if self.error:
+                    raise RuntimeError(self.error)
+                return
+            yield item
+
+    def digest(self) -> str:
+        """Order-independent digest of the projected rows (like _rows_digest); valid once the stream is drained."""
+        return _content_hash(sorted(self._hashes))
+
+
+@dataclass
+class _VenuePayload:
+    """
+    Everything the apply stage needs from R1 for one venue (filled by the fetch stage). The client streams
+    (None when the run skips that client type) are filled after the payload was queued (_stream_venue_clients).
+    """
+    index: int
+    venue_id: str
+    venue_name: str
+    aps: List[Dict[str, Any]] = field(default_factory=list)
+    switches: List[Dict[str, Any]] = field(default_factory=list)
+    vlan_name_map: Dict[int, str] = field(default_factory=dict)
+    ports: List[Dict[str, Any]] = field(default_factory=list)
+    wifi_clients: Optional[_ClientStream] = None
+    wired_clients: Optional[_ClientStream] = None
+    topology: Optional[Dict[str, Any]] = None
+    fingerprint: str = ""  # infrastructure data and mapping settings; clients add theirs once streamed
+    fetch_seconds: float = 0.0
+    timings: Dict[str, Dict[str, float]] = field(default_factory=dict)  # {phase: {api, decode, apply}}
+    error: str = ""
+
+    def client_streams(self) -> List[Tuple[str, _ClientStream]]:
+        streams = (("wifi_clients", self.wifi_clients), ("wired_clients", self.wired_clients))
+        return [(endpoint, stream) for endpoint, stream in streams if stream is not None]
+
+    def close(self) -> None:
+        for _, stream in self.client_streams():
+            stream.close()
+
+
+def _iter_endpoint(
+    run: _SyncRun, endpoint: str, venue_id: str, limit: int, page_size: Optional[int] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield the rows of one timestamped R1 endpoint for a venue page by page and record the newest change timestamp.
+    With a cutoff (incremental run) R1 is asked for newest-first rows and paging stops at the first row at or
+    below the cutoff, so only the changed rows (plus at most one page) are requested and decoded.
+    """
+    path, ts_fields = _DELTA_ENDPOINTS[endpoint]
+    cutoff = run.watermarks.cutoffs.get(endpoint)
+    body: Dict[str, Any] = {"venueId": venue_id}
+    if cutoff is not None:
+        body.update({"sortField": ts_fields[0], "sortOrder": "DESC"})
+        page_size = min(page_size or limit, _INCREMENTAL_PAGE_SIZE)
+
+    pages = run.api.iter_pages(path=path, page_size=page_size or limit, extra_body=body, max_rows=limit)
+    try:
+        for page in pages:
+            out: List[Dict[str, Any]] = []
+            done = False
+            for row in page:
+                ts = _r1_timestamp(row, ts_fields)
+                run.watermarks.observe(endpoint, ts)
+                if cutoff is not None and ts is not None and ts <= cutoff:
+                    done = True  # newest first: everything after this row is older
+                    break
+                out.append(row)
+            if out:
+                yield out
+            if done:
+                return
+    finally:
+        pages.close()
+
+
+def _query_endpoint(run: _SyncRun, endpoint: str, venue_id: str, limit: int) -> List[Dict[str, Any]]:
+    """All rows _iter_endpoint yields, as one list."""
+    return [row for page in _iter_endpoint(run, endpoint, venue_id, limit) for row in page]
+
+
+def _fetch_venue(
+    run: _SyncRun, index: int, venue_id: str, venue_name: str, stop: Optional[threading.Event] = None
+) -> _VenuePayload:
+    """
+    Fetch stage: the R1 infrastructure queries for one venue. Its only DB writes are missing device types
+    (_ensure_device_types; not in plan-only runs). The clients follow through the payload's client streams
+    (_stream_venue_clients) once the payload is queued.
+    Incremental runs only fetch changed APs/switches/clients; ports and topology wait for the next full run.
+    """
+    api = run.api
+    payload = _VenuePayload(
+        index=index,
+        venue_id=venue_id,
+        venue_name=venue_name,
+        wifi_clients=_ClientStream(stop) if run.do_wifi_clients else None,
+        wired_clients=_ClientStream(stop) if run.do_wired_clients else None,
+    )
+    t0 = time.monotonic()
+    timings = payload.timings
+    try:
+        if run.do_aps:
+            with timed(timings, "aps", api):
+                payload.aps = _query_endpoint(run, "aps", venue_id, 1000)
+        if run.do_switches:
+            with timed(timings, "switches", api):
+                payload.switches = _query_endpoint(run, "switches", venue_id, 1000)
+        if run.do_interfaces and not run.incremental:
+            if run.do_vlans:
+                with timed(timings, "vlan_map", api):
+                    payload.vlan_name_map = _build_vlan_name_map_for_venue(api, venue_id)
+            with timed(timings, "ports", api):
+                payload.ports = _query_all(api, "/venues/switches/switchPorts/query", {"venueId": venue_id, "limit": 5000})
+        if (run.do_cabling or run.do_wireless_links) and not run.incremental:
+            with timed(timings, "topology", api):
+                payload.topology = _fetch_topology_blob(api, venue_id)
+        # a delta is not a snapshot -> no fingerprint (the stored one stays valid only if nothing changed)
+        payload.fingerprint = "" if run.incremental else _venue_fingerprint(run, payload)
+        if not run.plan_only:
+            _ensure_device_types(_venue_device_types(run, payload))
+    except Exception as e:
+        payload.error = _safe_str(e, 2000)
+    payload.fetch_seconds = time.monotonic() - t0
+    return payload
+
+
+def _stream_venue_clients(run: _SyncRun, payload: _VenuePayload) -> None:
+    """
+    Fetch stage, after the payload was queued: query the venue's Wi-Fi and wired clients page by page
+    (client_chunk_size rows) into its client streams, blocking while the apply stage is behind. The device
+    types of a page are created before the page is handed over, like those of the infrastructure.
+    A failing query ends its stream with the error, which fails the venue in the apply stage.
+    """
+    streams = payload.client_streams()
+    if payload.error:
+        for _, stream in streams:
+            stream.finish()
+        return
+    t0 = time.monotonic()
+    for i, (endpoint, stream) in enumerate(streams):
+        model_of = _wifi_client_model if endpoint == "wifi_clients" else _wired_client_model
+        error = ""
+        try:
+            with timed(payload.timings, endpoint, run.api):
+                for page in _iter_endpoint(run, endpoint, payload.venue_id, 5000, page_size=_client_chunk_size()):
+                    if run.client_devices and not run.plan_only:
+                        _ensure_device_types(("Client", model_of(cl)) for cl in page if isinstance(cl, dict))
+                    if not stream.put(page):
+                        break  # the apply stage stopped reading (venue failed or pipeline stopped)
+        except Exception as e:
+            error = _safe_str(e, 2000)
+        if i == len(streams) - 1:
+            # before the last page is released: the apply stage reads fetch_seconds once the streams are drained
+            payload.fetch_seconds += time.monotonic() - t0 - sum(st.waited for _, st in streams)
+        stream.finish(error)
+
+
+# R1 fields that feed NetBox objects; status counters (RSSI, traffic, uptime, ...) are left out of the fingerprint
+_DEVICE_FINGERPRINT_FIELDS = (
+    "name", "apName", "switchName", "hostname", "serialNumber", "serial", "msn", "apSerial", "switchSerial",
+    "deviceSerial", "model", "apModel", "switchModel", "ip", "ipAddress", "mgmtIp",
+)
+_CLIENT_FINGERPRINT_FIELDS = (
+    "macAddress", "mac", "clientMac", "deviceMac", "ipAddress", "ip", "hostname", "name", "deviceType", "modelName",
+    "manufacturer", "ssid", "networkId", "apSerial", "connectedApSerial", "vlan", "vlanId", "accessVlan",
+    "switchUnitId", "switchSerialNumber", "switchSerial", "portIdentifier", "port", "connectedPort",
+)
+_CLIENT_NESTED_FIELDS = (
+    ("networkInformation", "ssid"), ("networkInformation", "id"),
+    ("apInformation", "serialNumber"), ("venueInformation", "id"),
+)
+
+
+def _project(row: Any, keys: Tuple[str, ...], nested: Tuple[Tuple[str, str], ...] = ()) -> Dict[str, Any]:
+    if not isinstance(row, dict):
+        return {}
+    out = {k: row.get(k) for k in keys if row.get(k) is not None}
+    for parent, key in nested:
+        sub = row.get(parent)
+        if isinstance(sub, dict) and sub.get(key) is not None:
+            out[f"{parent}.{key}"] = sub.get(key)
+    return out
+
+
+def _rows_digest(rows: List[Any], keys: Tuple[str, ...], nested: Tuple[Tuple[str, str], ...] = ()) -> str:
+    """Order-independent digest of the projected rows."""
+    return _content_hash(sorted(_content_hash(_project(r, keys, nested)) for r in rows))
+
+
+def _venue_fingerprint(run: _SyncRun, payload: _VenuePayload) -> str:
+    """
+    Aggregate fingerprint of the infrastructure the apply stage would write for this venue: AP/switch lists,
+    ports, topology, plus the run settings that change how they are mapped. The client set is only known once
+    its stream is drained (_client_fingerprint).
+    """
+    net_nested = (("networkStatus", "ipAddress"), ("networkStatus", "managementTrafficVlan"))
+    return _content_hash(
+        payload.venue_name,
+        [run.cfg.tenant_id, run.cfg.allow_stub_devices, getattr(run.site_group, "pk", None), run.mapping_mode,
+         run.child_location_name, str(run.parent_site_ref), run.slug_prefix, run.do_aps, run.do_switches,
+         run.do_interfaces, run.do_wifi_clients, run.do_wired_clients, run.do_cabling, run.do_wireless_links,
+         run.do_vlans, run.client_devices],
+        _rows_digest(payload.aps, _DEVICE_FINGERPRINT_FIELDS, net_nested),
+        _rows_digest(payload.switches, _DEVICE_FINGERPRINT_FIELDS, net_nested),
+        sorted(payload.vlan_name_map.items()),
+        _rows_digest(payload.ports, _PORT_HASH_FIELDS + ("switchUnitId", "portIdentifier", "name")),
+        payload.topology,
+    )
+
+
+def _client_fingerprint(payload: _VenuePayload) -> str:
+    """Fingerprint of the venue's client set; call after the client streams were drained."""
+    return _content_hash([(endpoint, stream.digest()) for endpoint, stream in payload.client_streams()])
+
+
+def _split_fingerprint(value: Optional[str]) -> Tuple[str, str]:
+    """Stored venue fingerprint -> (infrastructure, clients); stored as "<infrastructure>:<clients>"."""
+    infra, _, clients = (value or "").partition(":")
+    return infra, clients
+
+
+def _clients_changed(run: _SyncRun, payload: _VenuePayload) -> bool:
+    """Whether the drained client streams differ from the last apply of the venue (incremental: any row)."""
+    if run.incremental:
+        return any(stream.rows for _, stream in payload.client_streams())
+    stored = run.venue_fingerprints.get(_fingerprint_key(run.scope, payload.venue_id))
+    return _split_fingerprint(stored)[1] != _client_fingerprint(payload)
+
+
+def _ap_fields(ap: Dict[str, Any]) -> Tuple[str, str, str, str, Any]:
+    """(name, serial, model, mgmt_ip, mgmt_vlan) of an /venues/aps/query row."""
+    name = (ap.get("name") or ap.get("apName") or ap.get("hostname") or ap.get("serial") or ap.get("serialNumber") or "").strip()
+    serial = (ap.get("serialNumber") or ap.get("serial") or ap.get("msn") or ap.get("serialNumber") or ap.get("apSerial") or ap.get("deviceSerial") or "").strip()
+    model = (ap.get("model") or ap.get("apModel") or "Access Point").strip()
+
+    # R1: mgmt IP typically lives under networkStatus.ipAddress
+    ns = ap.get("networkStatus") or {}
+    mgmt_ip = (ns.get("ipAddress") or ap.get("ip") or ap.get("ipAddress") or ap.get("mgmtIp") or "").strip()
+    return (name, serial, model, mgmt_ip, ns.get("managementTrafficVlan"))
+
+
+def _switch_fields(sw: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    """(name, serial, model, mgmt_ip) of an /venues/switches/query row."""
+    name = (sw.get("name") or sw.get("switchName") or sw.get("hostname") or sw.get("serial") or sw.get("serialNumber") or "").strip()
+    serial = (sw.get("serialNumber") or sw.get("serial") or sw.get("msn") or sw.get("switchSerial") or sw.get("deviceSerial") or "").strip()
+    model = (sw.get("model") or sw.get("switchModel") or "Switch").strip()
+
+    ns = sw.get("networkStatus") or {}
+    mgmt_ip = (ns.get("ipAddress") or sw.get("ip") or sw.get("ipAddress") or sw.get("mgmtIp") or "").strip()
+    return (name, serial, model, mgmt_ip)
+
+
+def _device_hash(site_pk, location_pk, role: str, model: str, name: str, serial: str, mgmt_ip: str, *extra: Any) -> str:
+    return _content_hash(site_pk, location_pk, role, model, name, serial, mgmt_ip, *extra)
+
+
+def _sync_venue(run: _SyncRun, payload: _VenuePayload, *, infra: bool = True) -> Tuple[Counter, bool]:
+    """
+    Apply stage: write one venue's prefetched R1 data to NetBox.
+    Runs inside its own transaction (see _apply_venue). Returns the venue's counters and whether the
+    infrastructure phases (APs, switches, ports, topology) ran.
+    With infra=False (infrastructure unchanged since the last apply) only the streamed clients are written; if
+    they differ from the last apply, the infrastructure phases follow anyway, so every object of the venue is
+    marked seen and the venue can be reconciled.
+    """
+    cfg = run.cfg
+    venue_id = payload.venue_id
+    venue_name = payload.venue_name
+    counts: Counter = Counter()
+    timings = payload.timings
+
+    venue_model = Location if run.mapping_mode == "locations" else Site
+    with timed(timings, "venue_mapping"), query_scope(run.query_stats, "venue_mapping"):
+        if run.venue_cache is None:
+            run.venue_cache = _venue_mapping_cache(run, [(venue_id, venue_name)], create=False)
+        mapping: VenueMapping = run.venue_cache.map(
+            venue_id=venue_id,
+            venue_name=venue_name,
+            known_pk=_idmap_pk("venue", venue_id, venue_model),
+        )
+
+        # Site/Location for all objects in this venue context
+        site = mapping.device_site
+        location = mapping.device_location
+        _idmap_remember("venue", venue_id, location if run.mapping_mode == "locations" else site, venue_name)
+
+    if infra:
+        _sync_venue_devices(run, payload, site, location, counts)
+
+    client_stats = ClientIngestStats()
+
+    # Wi-Fi Clients (page by page from the fetch stage: decode, dedupe, write, release)
+    if payload.wifi_clients is not None:
+        with timed(timings, "wifi_clients"), query_scope(run.query_stats, "wifi_clients"):
+            for chunk in payload.wifi_clients:
+                decoded = [(_wifi_client_row(cl, venue_id), cl) for cl in chunk if isinstance(cl, dict)]
+                del chunk
+                _upsert_client_rows(cfg, [row for row, _ in decoded], _WIFI_CLIENT_FIELDS, client_stats)
+                counts["clients"] += len(decoded)
+
+                for row, cl in _last_per_mac(decoded):
+                    client_key = _mac_to_serial(row["mac"])
+                    if not (run.client_devices or _idmap_mapped("device", client_key)):
+                        continue
+                    client_hash = _wifi_client_hash(site.pk, getattr(location, "pk", None), row, cl)
+                    if _idmap_unchanged("device", client_key, client_hash):
+                        _mark_client_seen(client_key, "wlan0", cl)
+                    elif _upsert_client_as_dcim_device(cfg, site, location, cl)[0]:
+                        _idmap_set_hash("device", client_key, client_hash)
+                counts["client_chunks"] += 1
+
+    # Switch Clients (wired)
+    if payload.wired_clients is not None:
+        with timed(timings, "wired_clients"), query_scope(run.query_stats, "wired_clients"):
+            sc, it_sc, ct_sc = _sync_switch_clients_for_venue(
+                cfg, site, location, venue_id, payload.wired_clients, client_stats, devices=run.client_devices
             )
+            counts["clients"] += sc
+            counts["interfaces"] += it_sc
+            if run.do_cabling:
+                counts["cables"] += ct_sc
+
+    if not infra and _clients_changed(run, payload):
+        infra = True
+        _sync_venue_devices(run, payload, site, location, counts)
+
+    # Venue topologies (cables + wireless links)
+    if infra and (run.do_cabling or run.do_wireless_links):
+        with timed(timings, "topology"), query_scope(run.query_stats, "topology"):
+            it, mt, ct, wt = _apply_topology(run, site, location, payload, counts)
+            counts["interfaces"] += it
+            counts["macs"] += mt
+            if run.do_cabling:
+                counts["cables"] += ct
+            if run.do_wireless_links:
+                counts["wlinks"] += wt
+
+    counts["clients_staged"] += client_stats.staged
+    counts["clients_changed"] += client_stats.changed
+    counts["clients_unchanged"] += client_stats.unchanged
+    counts["client_observations"] += client_stats.observed
+    return counts, infra
+
+
+def _sync_venue_devices(run: _SyncRun, payload: _VenuePayload, site: Site, location, counts: Counter) -> None:
+    """APs, switches and switch ports of one venue (apply stage)."""
+    cfg = run.cfg
+    venue_id = payload.venue_id
+    timings = payload.timings
+
+    # APs
+    if run.do_aps:
+        with timed(timings, "aps"), query_scope(run.query_stats, "aps"):
+            for ap in payload.aps:
+                name, serial, model, mgmt_ip, mv = _ap_fields(ap)
+                device_key = _device_map_key(serial[:50], (name or serial or "AP")[:64])
+                device_hash = _device_hash(
+                    site.pk, getattr(location, "pk", None), "Access Point", model, name, serial, mgmt_ip,
+                    mv if run.do_vlans else None,
+                )
+                counts["devices"] += 1
+                if _idmap_unchanged("device", device_key, device_hash):
+                    _idmap_seen("ip", _ip_map_key(mgmt_ip))
+                    if run.do_vlans and mv is not None and str(mv).strip().isdigit():
+                        _idmap_seen("vlan", f"{venue_id}:{int(str(mv).strip())}")
+                    continue
+
+                _get_or_create_device_infra(cfg, site, location, "Access Point", model, name or serial or "AP", serial=serial)
+
+                if mgmt_ip and _upsert_ip(cfg, mgmt_ip):
+                    counts["ips"] += 1
+
+                # also create mgmt VLAN if present
+                if run.do_vlans:
+                    try:
+                        if mv is not None and str(mv).strip() != "":
+                            if _upsert_vlan(cfg, site, int(str(mv).strip()), name=f"MGMT VLAN {mv}"):
+                                counts["vlans"] += 1
+                    except Exception:
+                        pass
+
+                _idmap_set_hash("device", device_key, device_hash)
+
+    # Switches
+    if run.do_switches:
+        with timed(timings, "switches"), query_scope(run.query_stats, "switches"):
+            for sw in payload.switches:
+                name, serial, model, mgmt_ip = _switch_fields(sw)
+                device_key = _device_map_key(serial[:50], (name or serial or "Switch")[:64])
+                device_hash = _device_hash(site.pk, getattr(location, "pk", None), "Switch", model, name, serial, mgmt_ip)
+                counts["devices"] += 1
+                if _idmap_unchanged("device", device_key, device_hash):
+                    _idmap_seen("ip", _ip_map_key(mgmt_ip))
+                    continue
+
+                _get_or_create_device_infra(cfg, site, location, "Switch", model, name or serial or "Switch", serial=serial)
+                if mgmt_ip and _upsert_ip(cfg, mgmt_ip):
+                    counts["ips"] += 1
+                _idmap_set_hash("device", device_key, device_hash)
+
+    # Switch Ports -> dcim.Interface (+ MACs) + VLAN inference
+    if run.do_interfaces:
+        with timed(timings, "ports"), query_scope(run.query_stats, "ports"):
+            it_ports, mt_ports, vt_ports = _sync_switch_ports_for_venue(cfg, site, location, payload.ports, vlan_name_map=payload.vlan_name_map)
+            counts["interfaces"] += it_ports
+            counts["macs"] += mt_ports
+            if run.do_vlans:
+                counts["vlans"] += vt_ports
+
+
+def _venue_workers(cfg: RuckusR1TenantConfig) -> int:
+    """Venue-level concurrency for this config, capped by the plugin setting max_venue_workers."""
+    try:
+        wanted = int(getattr(cfg, "venue_workers", 1) or 1)
+    except Exception:
+        wanted = 1
+    try:
+        cap = int(plugin_cfg("max_venue_workers", 8))
+    except Exception:
+        cap = 8
+    return max(1, min(wanted, max(1, cap)))
+
+
+def _apply_venue(run: _SyncRun, payload: _VenuePayload) -> Tuple[Dict[str, Any], Counter]:
+    """Apply one venue in its own transaction and return (venue_result, counters)."""
+    venue_started = time.monotonic()
+    error = payload.error
+    counts: Counter = Counter()
+    if run.incremental:
+        infra_unchanged = not (payload.aps or payload.switches)
+    else:
+        stored = run.venue_fingerprints.get(_fingerprint_key(run.scope, payload.venue_id))
+        infra_unchanged = (
+            not run.force_full
+            and bool(payload.fingerprint)
+            and _split_fingerprint(stored)[0] == payload.fingerprint
+        )
+    unchanged = False
+    if not error:
+        writer = _MapWriter(run.idmap, payload.venue_id, force_full=run.force_full, seen=run.seen)
+        writer_token = _map_writer.set(writer)
+        try:
+            # queries outside the venue phases (identity map flush, change log) count as "venue_commit"
+            queries = query_scope(run.query_stats, "venue_commit", payload.venue_id)
+            with queries, coalesced_changes(run.summary_changelog) as changes, transaction.atomic():
+                if run.do_wifi_clients or run.do_wired_clients:
+                    _lock_venue_clients(run.cfg, payload.venue_id)
+                counts, applied = _sync_venue(run, payload, infra=not infra_unchanged)
+                # same R1 infrastructure and clients as the last successful apply: nothing but client last_seen written
+                unchanged = not applied
+                if unchanged:
+                    counts["venues_unchanged"] += 1
+                counts.update(writer.hash_stats)
+                counts["object_maps_written"] += writer.flush()
+                if changes is not None:
+                    counts.update(changes.flush())
+        except Exception as e:
+            error = _safe_str(e, 2000)
+            counts = Counter()
+            unchanged = False
+        finally:
+            _map_writer.reset(writer_token)
+
+    fingerprint = ""
+    if not error and not run.incremental and payload.fingerprint:
+        fingerprint = f"{payload.fingerprint}:{_client_fingerprint(payload)}"
+    return ({
+        "venue_id": payload.venue_id,
+        "name": payload.venue_name,
+        "status": "failed" if error else ("unchanged" if unchanged else "success"),
+        "error": error,
+        "fingerprint": fingerprint,
+        "fetch_seconds": round(payload.fetch_seconds, 2),
+        "duration": round(payload.fetch_seconds + time.monotonic() - venue_started, 2),
+        "timings": payload.timings,
+    }, counts)
+
+
+# pg advisory lock namespace ("R1"); keys are (namespace + lock group, config pk)
+_RUN_LOCK_NAMESPACE = 0x5231
+# Phases that write the same objects exclude each other. A client refresh shares only client devices, their
+# identity map rows and the client table with the others; those are serialized per venue (_lock_venue_clients).
+_RUN_LOCK_GROUPS = {"infrastructure": 0, "clients": 1}
+_SCOPE_LOCK_GROUPS = {"all": ("infrastructure",), "infrastructure": ("infrastructure",), "clients": ("clients",)}
+_VENUE_CLIENTS_LOCK_GROUP = 2
+
+
+@contextmanager
+def config_run_lock(cfg: RuckusR1TenantConfig, scope: str = "all") -> Iterator[bool]:
+    """
+    Hold the session advisory locks of the run's phase for the config while the block runs; yields False
+    (without waiting) if another run of a conflicting phase holds one. "all" and "infrastructure" exclude each
+    other and themselves; "clients" only excludes another client refresh, so it keeps running during long
+    infrastructure and full runs. Other databases have no advisory locks and always yield True.
+    """
+    if connection.vendor != "postgresql":
+        yield True
+        return
+    groups = _SCOPE_LOCK_GROUPS.get(scope, _SCOPE_LOCK_GROUPS["all"])
+    held: List[int] = []
+    try:
+        with connection.cursor() as cursor:
+            for group in groups:
+                namespace = _RUN_LOCK_NAMESPACE + _RUN_LOCK_GROUPS[group]
+                cursor.execute("SELECT pg_try_advisory_lock(%s, %s)", [namespace, cfg.pk])
+                if not cursor.fetchone()[0]:
+                    break
+                held.append(namespace)
+        yield len(held) == len(groups)
+    finally:
+        if held:
+            with connection.cursor() as cursor:
+                for namespace in held:
+                    cursor.execute("SELECT pg_advisory_unlock(%s, %s)", [namespace, cfg.pk])
+
+
+def _lock_venue_clients(cfg: RuckusR1TenantConfig, venue_id: str) -> None:
+    """
+    Wait for the transaction-level lock on one venue's client writes (client table rows, client devices and their
+    identity map rows), held until the venue transaction ends. A full run and a client refresh writing the same
+    venue take turns instead of deadlocking; different venues (and parallel workers) do not wait for each other.
+    Take it before the venue writes anything else, so it is always acquired before any row lock.
+    """
+    if connection.vendor != "postgresql":
+        return
+    key = ((_RUN_LOCK_NAMESPACE + _VENUE_CLIENTS_LOCK_GROUP) << 32) | zlib.crc32(f"{cfg.pk}:{venue_id}".encode())
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [key])
+
+
+_RUN_STATUS_FIELDS = ("last_sync", "last_sync_status", "last_sync_message")
+
+
+def _save_run_state(
+    cfg: RuckusR1TenantConfig,
+    fields: Iterable[str],
+    *,
+    fingerprints: Optional[Dict[str, Optional[str]]] = None,
+    watermarks: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Write what this run owns to the config row. Phase jobs run concurrently and the failure counter, `enabled`
+    and UI edits are saved elsewhere, so the row is re-read FOR UPDATE and only `fields` (copied from `cfg`),
+    this run's fingerprint keys (None drops a key) and its watermarks (newest wins) are merged into it.
+    """
+    with transaction.atomic():
+        fresh = RuckusR1TenantConfig.objects.select_for_update().get(pk=cfg.pk)
+        update_fields = list(fields)
+        for name in update_fields:
+            setattr(fresh, name, getattr(cfg, name))
+        if fingerprints:
+            merged = dict(fresh.venue_fingerprints or {})
+            for key, value in fingerprints.items():
+                if value:
+                    merged[key] = value
+                else:
+                    merged.pop(key, None)
+            fresh.venue_fingerprints = merged
+            update_fields.append("venue_fingerprints")
+        if watermarks:
+            merged = dict(fresh.sync_watermarks or {})
+            for endpoint, value in watermarks.items():
+                current, new = _parse_watermark(merged.get(endpoint)), _parse_watermark(value)
+                if new is not None and (current is None or current < new):
+                    merged[endpoint] = value
+            fresh.sync_watermarks = merged
+            update_fields.append("sync_watermarks")
+        fresh.save(update_fields=update_fields + ["last_updated"])
+    cfg.venue_fingerprints = fresh.venue_fingerprints
+    cfg.sync_watermarks = fresh.sync_watermarks
+
+
+def _query_stats(cfg: RuckusR1TenantConfig, enabled: Optional[bool]) -> Optional[QueryStats]:
+    """QueryStats for a run when enabled by the caller (command flag) or TenantConfig.query_stats, else None."""
+    if enabled is None:
+        enabled = bool(getattr(cfg, "query_stats", False))
+    if not enabled:
+        return None
+    try:
+        slowest = int(plugin_cfg("query_stats_slowest", QUERY_SLOWEST_DEFAULT))
+    except Exception:
+        slowest = QUERY_SLOWEST_DEFAULT
+    return QueryStats(slowest=slowest)
+
+
+def _memory_tracker(cfg: RuckusR1TenantConfig, enabled: Optional[bool]) -> Optional[MemoryTracker]:
+    """MemoryTracker for a run when enabled by the caller (command flag) or TenantConfig.memory_stats, else None."""
+    if enabled is None:
+        enabled = bool(getattr(cfg, "memory_stats", False))
+    if not enabled:
+        return None
+    try:
+        top = int(plugin_cfg("memory_stats_top", MEMORY_TOP_DEFAULT))
+        frames = int(plugin_cfg("memory_stats_frames", 1))
+    except Exception:
+        top, frames = MEMORY_TOP_DEFAULT, 1
+    return MemoryTracker(top=top, frames=frames)
 
-            if _create_cable(a_iface, b_iface, status="connected"):
-                touched_cables += 1
 
+def _query_stats_message(stats: Dict[str, Any]) -> str:
+    total = (stats.get("queries") or {}).get("total")
+    return f"queries={total['queries']} db={total['seconds']}s " if total else ""
+
+
+def _store_profile(log: RuckusR1SyncLog, profiler: SyncProfiler) -> None:
+    """Stop the run's profiler and attach its compressed pstats dump to the log; never fails the sync."""
+    try:
+        profiler.stop()
+        data = profiler.dump()
+        RuckusR1SyncProfile.objects.update_or_create(
+            sync_log=log,
+            defaults={
+                "seconds": profiler.seconds,
+                "data": zlib.compress(data, 6),
+                "size": len(data),
+                "top_functions": profiler.top(),
+            },
+        )
+    except Exception as e:
+        log.stats = {**(log.stats or {}), "profile_error": _safe_str(e, 2000)}
+        log.save(update_fields=["stats"])
+
+
+def _pop_venue_timings(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Move the raw phase timings out of a venue result (they go to SyncLog.timings, not venue_results)."""
+    return {"venue_id": result["venue_id"], "name": result["name"], "timings": result.pop("timings", None) or {}}
+
+
+def _pipeline_queue_depth(workers: int) -> int:
+    try:
+        depth = int(plugin_cfg("pipeline_queue_depth", 0) or 0)
+    except Exception:
+        depth = 0
+    return depth if depth > 0 else 2 * workers
+
+
+_PIPELINE_DONE = object()
+_PIPELINE_POLL_SECONDS = 0.5
+
+
+def _run_venue_pipeline(
+    run: _SyncRun,
+    venues: List[Dict[str, Any]],
+    workers: int,
+    apply_fn: Optional[Callable[[_SyncRun, _VenuePayload], Tuple[Dict[str, Any], Counter]]] = None,
+) -> Tuple[List[Tuple[Dict[str, Any], Counter]], Dict[str, Any]]:
+    """
+    Two-stage pipeline connected by a bounded queue:
+      - fetch stage (`workers` threads): R1 queries for upcoming venues (_fetch_venue), then the venue's
+        clients page by page into its client streams (_stream_venue_clients); no DB writes but device types
+      - apply stage (`workers` threads, or the calling thread when workers == 1): NetBox writes
+        (`apply_fn`, default _apply_venue; plan-only runs pass _plan_venue)
+    Fetching venue N+1 overlaps with writing venue N; the queue bound limits how far fetching runs ahead
+    (and therefore how many venue payloads are held in memory), the stream bound how many client pages wait.
+    If an apply stage fails, the other stages are stopped and drained before the error propagates.
+    Returns outcomes in venue order plus pipeline stats (queue depth, stage busy/idle seconds).
+    """
+    apply_fn = apply_fn or _apply_venue
+    depth = _pipeline_queue_depth(workers)
+    q: "queue.Queue" = queue.Queue(maxsize=depth)
+    todo = iter(list(enumerate(venues)))
+    todo_lock = threading.Lock()
+    stats_lock = threading.Lock()
+    stats: Dict[str, Any] = {
+        "workers": workers,
+        "queue_depth": depth,
+        "queue_max": 0,
+        "queue_samples": 0,
+        "queue_sum": 0,
+        "fetch_busy_seconds": 0.0,
+        "fetch_idle_seconds": 0.0,
+        "apply_busy_seconds": 0.0,
+        "apply_idle_seconds": 0.0,
+    }
+    outcomes: Dict[int, Tuple[Dict[str, Any], Counter]] = {}
+    stop = threading.Event()
+
+    def _put(item: Any) -> bool:
+        # bounded wait so a stopped pipeline never leaves a thread blocked on a full queue
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=_PIPELINE_POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _get() -> Any:
+        while not stop.is_set():
+            try:
+                return q.get(timeout=_PIPELINE_POLL_SECONDS)
+            except queue.Empty:
+                pass
+        return _PIPELINE_DONE
+
+    def _sample_queue() -> None:
+        n = q.qsize()
+        stats["queue_max"] = max(stats["queue_max"], n)
+        stats["queue_samples"] += 1
+        stats["queue_sum"] += n
+
+    def _producer() -> None:
+        try:
+            while not stop.is_set():
+                with todo_lock:
+                    item = next(todo, None)
+                if item is None:
+                    return
+                index, venue = item
+                venue_id, venue_name = _venue_ident(venue)
+                with memory_scope(run.memory, venue_id, "fetch"):
+                    payload = _fetch_venue(run, index, venue_id, venue_name, stop)
+                t0 = time.monotonic()
+                if not _put(payload):
+                    return
+                waited = time.monotonic() - t0
+                with stats_lock:
+                    _sample_queue()
+                # the clients follow the queued payload page by page, as fast as its apply stage writes them
+                with memory_scope(run.memory, venue_id, "fetch"):
+                    _stream_venue_clients(run, payload)
+                with stats_lock:
+                    stats["fetch_busy_seconds"] += payload.fetch_seconds
+                    stats["fetch_idle_seconds"] += waited + sum(stream.waited for _, stream in payload.client_streams())
+        finally:
+            connections.close_all()  # device types were created on this thread's connection
+
+    def _consumer(worker: bool) -> None:
+        try:
+            while True:
+                t0 = time.monotonic()
+                payload = _get()
+                waited = time.monotonic() - t0
+                with stats_lock:
+                    stats["apply_idle_seconds"] += waited
+                    _sample_queue()
+                if payload is _PIPELINE_DONE or stop.is_set():
+                    return
+                t1 = time.monotonic()
+                try:
+                    with memory_scope(run.memory, payload.venue_id, "apply"):
+                        outcome = apply_fn(run, payload)
+                finally:
+                    payload.close()  # releases its fetch worker if the venue stopped reading its clients
+                with stats_lock:
+                    stats["apply_busy_seconds"] += time.monotonic() - t1
+                    outcomes[payload.index] = outcome
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            if worker:
+                connections.close_all()
+
+    # fetch workers run in a copy of the current context as well: they fill the run cache with device types
+    producers = [
+        threading.Thread(
+            target=copy_context().run, args=(profiled(run.profiler, _producer),), name=f"ruckus-r1-fetch-{i}", daemon=True
+        )
+        for i in range(workers)
+    ]
+    for t in producers:
+        t.start()
+
+    def _finish_producers() -> None:
+        for t in producers:
+            t.join()
+        for _ in range(workers):
+            _put(_PIPELINE_DONE)
+
+    closer = threading.Thread(target=_finish_producers, name="ruckus-r1-fetch-join", daemon=True)
+    closer.start()
+
+    try:
+        if workers == 1:
+            _consumer(worker=False)
         else:
-            wireless_types = {"mesh", "wireless", "wirelessmesh", "smartmesh", "apmesh", "ap-mesh", "wireless-mesh"}
-            if ctype in wireless_types or "mesh" in ctype or "wireless" in ctype:
-                if _create_wireless_link_best_effort(
-                    cfg,
-                    a_dev,
-                    b_dev,
-                    from_mac,
-                    to_mac,
-                    ssid="",
-                    status="active",
-                    description=f"R1 topology: {status}".strip(),
-                ):
-                    touched_wlinks += 1
+            # Each apply worker runs in a copy of the current context (run cache, request for change logging).
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ruckus-r1-apply") as pool:
+                futures = [pool.submit(copy_context().run, profiled(run.profiler, _consumer), True) for _ in range(workers)]
+                for f in futures:
+                    f.result()
+    finally:
+        # a no-op after a clean run; after a failure it releases producers waiting on the queue
+        stop.set()
+        while True:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                break
+        closer.join()
+
+    samples = stats.pop("queue_samples")
+    queue_sum = stats.pop("queue_sum")
+    stats["queue_avg"] = round(queue_sum / samples, 2) if samples else 0.0
+    for k in ("fetch_busy_seconds", "fetch_idle_seconds", "apply_busy_seconds", "apply_idle_seconds"):
+        stats[k] = round(stats[k], 2)
+    return [outcomes[i] for i in sorted(outcomes)], stats
+
+
+def _selected_ids(cfg: RuckusR1TenantConfig) -> Set[str]:
+    selected_ids = getattr(cfg, "venues_selected", None) or []
+    return {str(x).strip() for x in selected_ids if str(x).strip()}
+
+
+def _venue_mapping_cache(run: _SyncRun, venues: List[Tuple[str, str]], *, create: bool) -> VenueMappingCache:
+    """Prefetch the Sites/Locations for (venue_id, venue_name) pairs; with `create` the missing ones are created."""
+    venue_model = Location if run.mapping_mode == "locations" else Site
+    known = {}
+    for venue_id, _ in venues:
+        obj_id = _plan_mapped_pk(run, "venue", venue_id, venue_model)
+        if obj_id is not None:
+            known[venue_id] = obj_id
+    return VenueMappingCache(
+        tenant=run.cfg.tenant,
+        mode=run.mapping_mode,
+        site_group=run.site_group,
+        locations_parent_site=run.parent_site_ref,
+        child_location_name=run.child_location_name,
+        slug_prefix=run.slug_prefix,
+    ).prefetch(venues, known, create=create)
+
+
+def _selected_venues(cfg: RuckusR1TenantConfig, api: RuckusR1Client) -> List[Dict[str, Any]]:
+    venues = _query_all(api, "/venues/query", {"limit": 500})
+    # Venue Roadmap: Filter by selected venues (empty => all)
+    selected_ids = _selected_ids(cfg)
+    if selected_ids:
+        venues = [v for v in venues if str((v.get("id") or v.get("venueId") or "")).strip() in selected_ids]
+    return venues
+
+
+def _prewarm_refs(cfg: RuckusR1TenantConfig) -> None:
+    """
+    Create the reference objects every venue needs before venues fan out to workers,
+    so workers mostly read them from the run cache instead of racing to create them.
+    """
+    for role in ("Access Point", "Switch", "Device", "Wireless Client", "Wired Client", cfg.default_device_role or "Device"):
+        _get_or_create_role(role)
+    _get_or_create_ruckus_manufacturer()
+    _get_or_create_manufacturer_named("Client")
 
-    return (touched_ifaces, touched_macs, touched_cables, touched_wlinks)
+
+def _venue_device_types(run: _SyncRun, payload: _VenuePayload) -> Set[Tuple[str, str]]:
+    """
+    (manufacturer, model) of every DeviceType the infrastructure phases of this venue may look up or create.
+    Client device types are created per streamed page (_stream_venue_clients).
+    """
+    types: Set[Tuple[str, str]] = set()
+    if run.do_aps:
+        types.update(("RUCKUS Networks", _ap_fields(ap)[2] or "Generic") for ap in payload.aps)
+    if run.do_switches:
+        types.update(("RUCKUS Networks", _switch_fields(sw)[2] or "Generic") for sw in payload.switches)
+    if run.do_interfaces and run.cfg.allow_stub_devices:
+        types.update(
+            ("RUCKUS Networks", (p.get("switchModel") or "Switch").strip() or "Generic")
+            for p in payload.ports if isinstance(p, dict)
+        )
+    if (run.do_cabling or run.do_wireless_links) and isinstance(payload.topology, dict):
+        types.update(("RUCKUS Networks", _topology_node_type(n)[1]) for n in _topology_graph(payload.topology)[0])
+        if run.cfg.allow_stub_devices:
+            types.add(("RUCKUS Networks", "Device"))
+    return types
+
+
+def _ensure_device_types(types: Iterable[Tuple[str, str]]) -> None:
+    """
+    Create missing DeviceTypes before a venue transaction starts. Called in autocommit mode, each one commits
+    (and lands in the run cache) right away, so venue workers never wait on each other's uncommitted INSERT of
+    the same type and the venue transactions only read them. Manufacturers come from _prewarm_refs.
+    """
+    for manufacturer, model in sorted(types):
+        _get_or_create_devicetype(_get_or_create_manufacturer_named(manufacturer), model)
 
 
 # -----------------
-# Main sync
+# Authoritative reconciliation (deletes)
+# -----------------
+
+# Dependents first, so deleting a device never has to cascade through cables/IPs still queued for deletion
+_RECONCILE_ORDER = (
+    ("cable", "authoritative_cabling"),
+    ("wirelesslink", "authoritative_wireless"),
+    ("ip", "authoritative_ips"),
+    ("interface", "authoritative_interfaces"),
+    ("device", "authoritative_devices"),
+    ("vlan", "authoritative_vlans"),
+    ("wlan", "authoritative_wireless"),
+)
+
+
+def _reconcile_batch_size() -> int:
+    try:
+        return max(1, int(plugin_cfg("reconcile_batch_size", 500) or 500))
+    except Exception:
+        return 500
+
+
+def _run_covers(run: _SyncRun, object_type: str) -> bool:
+    """Only object types fetched completely by this run can have stale (to be deleted) entries."""
+    topology = run.do_cabling or run.do_wireless_links
+    return {
+        "venue": True,
+        "device": run.do_aps and run.do_switches and run.do_wifi_clients and run.do_wired_clients and topology,
+        "interface": run.do_interfaces and run.do_wifi_clients and run.do_wired_clients and topology,
+        "vlan": run.do_interfaces and run.do_vlans,
+        "wlan": run.do_wlans,
+        "ip": run.do_aps and run.do_switches and run.do_wifi_clients and run.do_wired_clients,
+        "cable": run.do_cabling and run.do_wired_clients,
+        "wirelesslink": run.do_wireless_links,
+    }.get(object_type, False)
+
+
+def _stale_entries(run: _SyncRun, object_type: str, venue_ids: Set[str]) -> Dict[str, _MapEntry]:
+    """Mapped to this tenant config from one of venue_ids, but not seen by this run."""
+    seen = run.seen.get(object_type)
+    return {key: e for key, e in run.idmap.entries_for_venues(object_type, venue_ids).items() if key not in seen}
+
+
+def _delete_batch(model, ids: List[int]) -> Tuple[int, int]:
+    """Delete one batch in one statement set; fall back to per-object deletes if something protects it."""
+    try:
+        with transaction.atomic():
+            _, per_model = model.objects.filter(pk__in=ids).delete()
+        return per_model.get(model._meta.label, 0), 0
+    except (ProtectedError, RestrictedError):
+        pass
+    deleted = protected = 0
+    for obj in model.objects.filter(pk__in=ids):
+        try:
+            with transaction.atomic():
+                obj.delete()
+            deleted += 1
+        except (ProtectedError, RestrictedError):
+            protected += 1
+    return deleted, protected
+
+
+def _reconcile_authoritative(run: _SyncRun, venue_ids: Set[str], *, wlans: bool) -> Counter:
+    """
+    Delete NetBox objects this tenant config created/adopted that R1 no longer reports, for every object
+    type whose authoritative_* flag is set. Stale = identity map entries of the reconciled venues
+    (WLANs: tenant-wide) minus the keys seen during this run. Only venues applied completely in this
+    run are reconciled (not failed, not skipped as unchanged), and never in incremental runs.
+    Objects are deleted in batches, per type in dependency order; protected objects are kept.
+    """
+    deleted: Counter = Counter()
+    if run.incremental:
+        return deleted
+    batch_size = _reconcile_batch_size()
+    for object_type, flag in _RECONCILE_ORDER:
+        if not getattr(run.cfg, flag, False) or not _run_covers(run, object_type):
+            continue
+        scope = ({""} if wlans else set()) if object_type == "wlan" else venue_ids
+        stale = _stale_entries(run, object_type, scope) if scope else {}
+        if not stale:
+            continue
+
+        by_model: Dict[int, List[int]] = {}
+        for ct_id, obj_id, *_ in stale.values():
+            by_model.setdefault(ct_id, []).append(obj_id)
+        for ct_id, ids in by_model.items():
+            model = ContentType.objects.get_for_id(ct_id).model_class()
+            if model is None:
+                continue
+            for i in range(0, len(ids), batch_size):
+                n, protected = _delete_batch(model, ids[i:i + batch_size])
+                deleted[object_type] += n
+                deleted["protected"] += protected
+
+        # Map rows go as well (also for objects somebody already deleted in NetBox)
+        keys = list(stale)
+        for i in range(0, len(keys), batch_size):
+            RuckusR1ObjectMap.objects.filter(
+                tenant_config=run.cfg, object_type=object_type, r1_key__in=keys[i:i + batch_size]
+            ).delete()
+        run.idmap.forget(object_type, keys)
+    return deleted
+
+
+# -----------------
+# Plan-only mode (dry run)
 # -----------------
 
-def run_sync_for_tenantconfig(cfg_or_id: Union[RuckusR1TenantConfig, int]) -> str:
+_PLAN_TYPES = ("venue", "device", "interface", "vlan", "wlan")
+
+
+def _plan_action(run: _SyncRun, object_type: str, key: str, *, content_hash: Optional[str] = None, name: Optional[str] = None) -> str:
+    """
+    Classify one R1 object against the identity map:
+      create    - not mapped yet (new object, or an existing NetBox object the first sync will adopt)
+      update    - mapped, but the content hash (or R1 name) differs from the last applied one
+      unchanged - mapped and identical
+    """
+    run.seen.add(object_type, key)
+    entry = run.idmap.get(object_type, _map_key(key))
+    if entry is None:
+        return "create"
+    if content_hash is not None:
+        return "unchanged" if entry[3] == content_hash else "update"
+    if name is not None:
+        return "unchanged" if entry[2] == (name or "")[:200] else "update"
+    return "unchanged"
+
+
+def _plan_mapped_pk(run: _SyncRun, object_type: str, key: str, model) -> Optional[int]:
+    entry = run.idmap.get(object_type, _map_key(key))
+    if not entry or entry[0] != ContentType.objects.get_for_model(model).id:
+        return None
+    return entry[1]
+
+
+def _plan_venue_objects(run: _SyncRun, payload: _VenuePayload, counts: Counter) -> None:
+    cfg = run.cfg
+    venue_id = payload.venue_id
+
+    def note(object_type: str, action: str) -> None:
+        counts[f"{object_type}:{action}"] += 1
+
+    venue_model = Location if run.mapping_mode == "locations" else Site
+    if run.venue_cache is None:
+        run.venue_cache = _venue_mapping_cache(run, [(venue_id, payload.venue_name)], create=False)
+    mapping = run.venue_cache.lookup(
+        venue_id=venue_id,
+        venue_name=payload.venue_name,
+        known_pk=_plan_mapped_pk(run, "venue", venue_id, venue_model),
+    )
+    note("venue", _plan_action(run, "venue", venue_id, name=payload.venue_name) if mapping else "create")
+    site_pk = mapping.device_site.pk if mapping else None
+    location_pk = getattr(mapping.device_location, "pk", None) if mapping else None
+
+    vlans: Dict[int, str] = {}
+
+    if run.do_aps:
+        for ap in payload.aps:
+            name, serial, model, mgmt_ip, mv = _ap_fields(ap)
+            key = _device_map_key(serial[:50], (name or serial or "AP")[:64])
+            h = _device_hash(site_pk, location_pk, "Access Point", model, name, serial, mgmt_ip, mv if run.do_vlans else None)
+            note("device", _plan_action(run, "device", key, content_hash=h))
+            if run.do_vlans and mv is not None and str(mv).strip().isdigit():
+                vlans[int(str(mv).strip())] = f"MGMT VLAN {mv}"
+
+    if run.do_switches:
+        for sw in payload.switches:
+            name, serial, model, mgmt_ip = _switch_fields(sw)
+            key = _device_map_key(serial[:50], (name or serial or "Switch")[:64])
+            h = _device_hash(site_pk, location_pk, "Switch", model, name, serial, mgmt_ip)
+            note("device", _plan_action(run, "device", key, content_hash=h))
+
+    if run.do_interfaces:
+        for p in payload.ports:
+            if not isinstance(p, dict):
+                continue
+            switch_unit_id, ifname = _port_identity(p)
+            if not switch_unit_id or not ifname:
+                continue
+            vids = _port_vids(p)
+            h = _port_hash(cfg, site_pk, location_pk, p, vids, payload.vlan_name_map)
+            note("interface", _plan_action(run, "interface", f"{switch_unit_id}:{ifname}", content_hash=h))
+            for vid in vids:
+                vlans[vid] = payload.vlan_name_map.get(vid, "")
+
+    for vid, vname in vlans.items():
+        note("vlan", _plan_action(run, "vlan", f"{venue_id}:{vid}", name=(vname or f"VLAN {vid}").strip()[:64]))
+
+    if payload.wifi_clients is not None:
+        for cl in (cl for page in payload.wifi_clients for cl in page):
+            if not isinstance(cl, dict):
+                continue
+            row = _wifi_client_row(cl, venue_id)
+            counts["client_rows"] += 1
+            key = _mac_to_serial(row["mac"]) if row["mac"] != "unknown" else ""
+            if key and (run.client_devices or run.idmap.get("device", key)):
+                note("device", _plan_action(run, "device", key, content_hash=_wifi_client_hash(site_pk, location_pk, row, cl)))
+                run.seen.add("interface", f"{key}:wlan0")
+
+    if payload.wired_clients is not None:
+        for cl in (cl for page in payload.wired_clients for cl in page):
+            if not isinstance(cl, dict):
+                continue
+            row, port_name = _wired_client_row(cl, venue_id)
+            counts["client_rows"] += 1
+            key = _mac_to_serial(row["mac"]) if row["mac"] != "unknown" else ""
+            if key and (run.client_devices or run.idmap.get("device", key)):
+                h = _wired_client_hash(site_pk, location_pk, row, port_name, cl)
+                note("device", _plan_action(run, "device", key, content_hash=h))
+                run.seen.add("interface", f"{key}:eth0")
+                if row["ruckus_id"] and port_name:
+                    run.seen.add("interface", f"{row['ruckus_id']}:{port_name}")
+
+    # Topology: cables/links are diffed at apply time; only count the graph and mark its objects as seen
+    topo = payload.topology if isinstance(payload.topology, dict) else {}
+    nodes = [n for n in (topo.get("nodes") or []) if isinstance(n, dict)]
+    edges = [e for e in (topo.get("edges") or []) if isinstance(e, dict)]
+    counts["topology_nodes"] += len(nodes)
+    counts["topology_edges"] += len(edges)
+    for n in nodes:
+        serial = (n.get("serial") or n.get("serialNumber") or "").strip()
+        name = (n.get("name") or "").strip()
+        run.seen.add("device", _device_map_key(serial[:50], (name or serial or (n.get("mac") or "").strip() or "device")[:64]))
+        if serial and n.get("mac"):
+            run.seen.add("interface", f"{serial}:mgmt")
+    for e in edges:
+        if (e.get("connectionType") or "").strip().lower() != "wired":
+            continue
+        for serial_key, port_key in (("fromSerial", "connectedPort"), ("toSerial", "correspondingPort")):
+            serial = (e.get(serial_key) or "").strip()
+            if serial:
+                run.seen.add("interface", f"{serial}:{(e.get(port_key) or 'uplink').strip()}")
+
+
+def _plan_venue(run: _SyncRun, payload: _VenuePayload) -> Tuple[Dict[str, Any], Counter]:
+    """Plan stage for one venue: diff the prefetched R1 data against the identity map. Read-only."""
+    venue_started = time.monotonic()
+    error = payload.error
+    counts: Counter = Counter()
+    if not error:
+        # a writer that is never flushed: only provides the venue context for key building
+        writer_token = _map_writer.set(_MapWriter(run.idmap, payload.venue_id))
+        try:
+            with query_scope(run.query_stats, "plan", payload.venue_id):
+                _plan_venue_objects(run, payload, counts)
+        except Exception as e:
+            error = _safe_str(e, 2000)
+            counts = Counter()
+        finally:
+            _map_writer.reset(writer_token)
+
+    return ({
+        "venue_id": payload.venue_id,
+        "name": payload.venue_name,
+        "status": "failed" if error else "planned",
+        "error": error,
+        "fetch_seconds": round(payload.fetch_seconds, 2),
+        "duration": round(payload.fetch_seconds + time.monotonic() - venue_started, 2),
+        "timings": payload.timings,
+    }, counts)
+
+
+def plan_sync_for_tenantconfig(
+    cfg_or_id: Union[RuckusR1TenantConfig, int],
+    *,
+    scope: str = "all",
+    query_stats: Optional[bool] = None,
+    memory_stats: Optional[bool] = None,
+) -> str:
+    """
+    Plan-only run: fetch everything from R1 and compute create/update/unchanged/delete counts per
+    object type from the identity map and content hashes. No NetBox object is written; the plan is
+    stored as a SyncLog (sync_mode="plan", stats["plan"]) and the summary line is returned.
+    Deletes are the stale identity map entries of the venues planned without error (WLANs: tenant-wide);
+    venue deletes are only computed when every venue is in scope.
+    """
     cfg = _resolve_config(cfg_or_id)
     if not cfg.enabled:
         return "Config disabled, skipping."
 
-    do_wlans = _cfg_flag(cfg, "sync_wlans", True)
-    do_aps = _cfg_flag(cfg, "sync_aps", True)
-    do_switches = _cfg_flag(cfg, "sync_switches", True)
-    do_interfaces = _cfg_flag(cfg, "sync_interfaces", True)
-    do_wifi_clients = _cfg_flag(cfg, "sync_wifi_clients", True)
-    do_wired_clients = _cfg_flag(cfg, "sync_wired_clients", True)
-    do_cabling = _cfg_flag(cfg, "sync_cabling", True)
-    do_wireless_links = _cfg_flag(cfg, "sync_wireless_links", True)
-    do_vlans = _cfg_flag(cfg, "sync_vlans", False)
+    api = _make_client(cfg)
+    log = _sync_log_start(cfg)
+    log.sync_mode = "plan"
+    log.phase = scope
+    started = _now()
+    qstats = _query_stats(cfg, query_stats)
+    memory = _memory_tracker(cfg, memory_stats)
+    if memory is not None:
+        memory.start()
 
-    # Mapping config (prefer DB config, fallback to plugins.py)
-    mapping_mode = str(getattr(cfg, "venue_mapping_mode", "") or _plugin_cfg("venue_mapping_mode", "sites")).strip().lower()
-    child_location_name = str(getattr(cfg, "venue_child_location_name", "") or _plugin_cfg("venue_child_location_name", "Venue")).strip()
-    parent_site_ref = getattr(cfg, "venue_locations_parent_site", None) or _plugin_cfg("venue_locations_parent_site", None)
+    try:
+        with query_scope(qstats, "prepare"):
+            idmap = _IdentityMap(cfg).load()
+            run = _make_sync_run(
+                cfg, api, site_group=None, idmap=idmap, scope=scope, query_stats=qstats, memory=memory, plan_only=True
+            )
 
-    # optional legacy knobs
-    slug_prefix = str(_plugin_cfg("venue_slug_prefix", "r1"))
+            venues = _selected_venues(cfg, api)
+            log.venues = len(venues)
+            run.venue_cache = _venue_mapping_cache(run, [_venue_ident(v) for v in venues], create=False)
+
+        totals: Counter = Counter()
+        if run.do_wlans:
+            wifi_networks = _query_all(api, "/wifiNetworks/query", {"limit": 500})
+            for wn in wifi_networks:
+                ssid = (wn.get("ssid") or wn.get("name") or "").strip()
+                if ssid:
+                    r1_id = _safe_str(wn.get("id") or "", 200)
+                    totals[f"wlan:{_plan_action(run, 'wlan', r1_id or f'ssid:{ssid}', name=ssid)}"] += 1
+            log.wlans = len(wifi_networks)
+
+        phases: Dict[str, Dict[str, Any]] = {}
+        with phase("venues", phases, memory):
+            outcomes, pipeline_stats = _run_venue_pipeline(run, venues, _venue_workers(cfg), apply_fn=_plan_venue)
+
+        venue_results: List[Dict[str, Any]] = []
+        venue_timings: List[Dict[str, Any]] = []
+        for result, counts in outcomes:
+            venue_timings.append(_pop_venue_timings(result))
+            venue_results.append(result)
+            totals.update(counts)
+        failed = [r for r in venue_results if r["status"] == "failed"]
+        full_scope = not _selected_ids(cfg) and not failed
+        planned = {r["venue_id"] for r in venue_results if r["status"] == "planned"}
+
+        plan: Dict[str, Any] = {}
+        for ot in _PLAN_TYPES:
+            entry: Dict[str, Any] = {a: totals[f"{ot}:{a}"] for a in ("create", "update", "unchanged")}
+            if not _run_covers(run, ot):
+                entry["delete"] = None
+            elif ot == "venue":
+                entry["delete"] = len(idmap.keys(ot) - run.seen.get(ot)) if full_scope else None
+            else:
+                entry["delete"] = len(_stale_entries(run, ot, {""} if ot == "wlan" else planned))
+            plan[ot] = entry
+        plan["client_rows"] = totals["client_rows"]
+        plan["topology"] = {"nodes": totals["topology_nodes"], "edges": totals["topology_edges"]}
+
+        log.venue_results = venue_results
+        log.timings = timing_summary(venue_timings)
+        log.stats = {"pipeline": pipeline_stats, "plan": plan, "phases": phases}
+        if qstats is not None:
+            log.stats["queries"] = qstats.as_dict()
+        if memory is not None:
+            log.stats["memory"] = memory.as_dict()
+        log.save()
+
+        summary = "Plan: " + " ".join(
+            f"{ot}=+{plan[ot]['create']}/~{plan[ot]['update']}/={plan[ot]['unchanged']}"
+            f"/-{plan[ot]['delete'] if plan[ot]['delete'] is not None else '?'}"
+            for ot in _PLAN_TYPES
+        ) + (
+            f" client_rows={plan['client_rows']} venues={log.venues} venues_failed={len(failed)} "
+            f"fetch={pipeline_stats['fetch_busy_seconds']}s diff={pipeline_stats['apply_busy_seconds']}s "
+            f"{_query_stats_message(log.stats)}"
+            f"duration={(_now() - started).total_seconds():.2f}s"
+        )
+        _sync_log_finish(log, "partial" if failed else "success", summary, message=summary)
+        return summary
+
+    except Exception as e:
+        _sync_log_finish(log, "failed", "Plan failed", message=_safe_str(e, 4000), error=_safe_str(e, 20000))
+        raise
+    finally:
+        if memory is not None:
+            memory.stop()
+
+
+def run_sync_for_tenantconfig(
+    cfg_or_id: Union[RuckusR1TenantConfig, int],
+    *,
+    force_full: bool = False,
+    plan_only: bool = False,
+    scope: str = "all",
+    query_stats: Optional[bool] = None,
+    profile: Optional[bool] = None,
+    memory_stats: Optional[bool] = None,
+) -> str:
+    """
+    Sync one tenant config. `scope` selects the phase (SYNC_SCOPES): "all" (default), "infrastructure"
+    (WLANs, APs, switches, ports, VLANs, cabling, wireless links) or "clients" (client table and client
+    devices). Each phase writes its own SyncLog (`phase`), venue fingerprints and watermarks; authoritative
+    deletes only cover object types the phase fetched completely.
+    `query_stats` overrides TenantConfig.query_stats (statement counts per phase/venue in SyncLog.stats["queries"]),
+    `profile` overrides TenantConfig.profile_sync (cProfile of the run stored as the log's RuckusR1SyncProfile),
+    `memory_stats` overrides TenantConfig.memory_stats (tracemalloc figures in SyncLog.stats["memory"]).
+    """
+    if plan_only:
+        return plan_sync_for_tenantconfig(cfg_or_id, scope=scope, query_stats=query_stats, memory_stats=memory_stats)
+
+    cfg = _resolve_config(cfg_or_id)
+    if not cfg.enabled:
+        return "Config disabled, skipping."
 
     api = _make_client(cfg)
     log = _sync_log_start(cfg)
+    log.phase = scope
     started = _now()
-
+    phases: Dict[str, Dict[str, Any]] = {}
+    run_timings: Dict[str, Dict[str, float]] = {}
+    qstats = _query_stats(cfg, query_stats)
+    profiler = SyncProfiler() if (getattr(cfg, "profile_sync", False) if profile is None else profile) else None
+    memory = _memory_tracker(cfg, memory_stats)
+    # this run's venue fingerprint changes ({key: fingerprint, or None to drop}) and advanced watermarks
+    fingerprints: Dict[str, Optional[str]] = {}
+    marks: Dict[str, str] = {}
+
+    # No tenant-wide transaction: every venue commits (or rolls back) on its own, so a long
+    # sync does not hold row locks for the whole run and one bad venue only loses its own work.
+    ref_cache_token = _ref_cache.set(_RefCache())
+    if profiler is not None:
+        profiler.start()
+    if memory is not None:
+        memory.start()
     try:
-        with transaction.atomic():
+        with phase("prepare", phases, memory), query_scope(qstats, "prepare"):
             site_group = _get_or_create_site_group(cfg)
+            _prewarm_refs(cfg)
+            # R1 id -> NetBox object, loaded once; replaces name/serial matching queries per object
+            idmap = _IdentityMap(cfg).load()
 
-            venues = _query_all(api, "/venues/query", {"limit": 500})
-            # Venue Roadmap: Filter by selected venues (empty => all)
-            selected_ids = getattr(cfg, "venues_selected", None) or []
-            selected_ids = {str(x).strip() for x in selected_ids if str(x).strip()}
-            if selected_ids:
-                venues = [v for v in venues if str((v.get("id") or v.get("venueId") or "")).strip() in selected_ids]
-
+            venues = _selected_venues(cfg, api)
             log.venues = len(venues)
 
-            if do_wlans:
+        # Incremental only between full reconciliations, and only with watermarks from a clean run
+        stored_marks = {k: _parse_watermark(v) for k, v in (getattr(cfg, "sync_watermarks", None) or {}).items()}
+        stored_marks = {k: v for k, v in stored_marks.items() if k in _DELTA_ENDPOINTS and v is not None}
+        full_interval = datetime.timedelta(hours=max(1, int(getattr(cfg, "full_sync_interval_hours", 24) or 24)))
+        last_full = getattr(cfg, "last_full_sync", None)
+        incremental = bool(
+            getattr(cfg, "incremental_sync", False)
+            and not force_full
+            and stored_marks
+            and last_full
+            and started - last_full < full_interval
+        )
+        overlap = _incremental_overlap()
+        watermarks = _Watermarks(cutoffs={k: v - overlap for k, v in stored_marks.items()} if incremental else {})
+        log.sync_mode = "incremental" if incremental else "full"
+        log.watermarks = {k: v.isoformat() for k, v in watermarks.cutoffs.items()}
+
+        run = _make_sync_run(
+            cfg,
+            api,
+            site_group=site_group,
+            idmap=idmap,
+            force_full=force_full,
+            venue_fingerprints=dict(getattr(cfg, "venue_fingerprints", None) or {}),
+            scope=scope,
+            incremental=incremental,
+            watermarks=watermarks,
+            query_stats=qstats,
+            profiler=profiler,
+            memory=memory,
+        )
+        with phase("venue_mapping", phases, memory), timed(run_timings, "venue_mapping"), query_scope(qstats, "venue_mapping"):
+            # one prefetch (and creation of new venue Sites) instead of lookups per venue
+            run.venue_cache = _venue_mapping_cache(run, [_venue_ident(v) for v in venues], create=True)
+
+        if run.do_wlans:
+            with phase("wlans", phases, memory), query_scope(qstats, "wlans"):
                 wifi_networks = _query_all(api, "/wifiNetworks/query", {"limit": 500})
-                for wn in wifi_networks:
-                    ssid = (wn.get("ssid") or wn.get("name") or "").strip()
-                    _get_or_create_wlan(cfg, ssid)
+                writer_token = _map_writer.set(_MapWriter(idmap, seen=run.seen))
+                try:
+                    with coalesced_changes(run.summary_changelog) as changes, transaction.atomic():
+                        for wn in wifi_networks:
+                            ssid = (wn.get("ssid") or wn.get("name") or "").strip()
+                            _get_or_create_wlan(cfg, ssid, r1_id=_safe_str(wn.get("id") or "", 200))
+                        _map_writer.get().flush()
+                        if changes is not None:
+                            changes.flush()
+                finally:
+                    _map_writer.reset(writer_token)
                 log.wlans = len(wifi_networks)
-            else:
-                log.wlans = 0
-
-            processed_devices = 0
-            processed_ips = 0
-            processed_clients = 0
-            processed_ifaces = 0
-            processed_macs = 0
-            processed_cables = 0
-            processed_wlinks = 0
-            processed_vlans = 0
-
-            for venue in venues:
-                venue_id = _safe_str(venue.get("id") or venue.get("venueId") or "", 128)
-                venue_name = (venue.get("name") or venue.get("venueName") or venue_id or "Venue").strip()
-
-                mapping: VenueMapping = map_venue_to_netbox(
-                    venue_id=venue_id,
-                    venue_name=venue_name,
-                    tenant=cfg.tenant,
-                    mode=mapping_mode,
-                    site_group=site_group,
-                    locations_parent_site=parent_site_ref,
-                    child_location_name=child_location_name,
-                    slug_prefix=slug_prefix,
-                )
+        else:
+            log.wlans = 0
+
+        totals: Counter = Counter()
+        venue_results: List[Dict[str, Any]] = []
+        workers = _venue_workers(cfg)
+
+        with phase("venues", phases, memory):
+            outcomes, pipeline_stats = _run_venue_pipeline(run, venues, workers)
+
+        venue_timings: List[Dict[str, Any]] = []
+        for result, counts in outcomes:
+            venue_timings.append(_pop_venue_timings(result))
+            venue_results.append(result)
+            totals.update(counts)
 
-                # Site/Location for all objects in this venue context
-                site = mapping.device_site
-                location = mapping.device_location
-
-                # APs
-                if do_aps:
-                    aps = _query_all(api, "/venues/aps/query", {"venueId": venue_id, "limit": 1000})
-                    for ap in aps:
-                        name = (ap.get("name") or ap.get("apName") or ap.get("hostname") or ap.get("serial") or ap.get("serialNumber") or "").strip()
-                        serial = (ap.get("serialNumber") or ap.get("serial") or ap.get("msn") or ap.get("serialNumber") or ap.get("apSerial") or ap.get("deviceSerial") or "").strip()
-                        model = (ap.get("model") or ap.get("apModel") or "Access Point").strip()
-
-                        # R1: mgmt IP typically lives under networkStatus.ipAddress
-                        ns = ap.get("networkStatus") or {}
-                        mgmt_ip = (ns.get("ipAddress") or ap.get("ip") or ap.get("ipAddress") or ap.get("mgmtIp") or "").strip()
-
-                        _get_or_create_device_infra(cfg, site, location, "Access Point", model, name or serial or "AP", serial=serial)
-                        processed_devices += 1
-
-                        if mgmt_ip and _upsert_ip(cfg, mgmt_ip):
-                            processed_ips += 1
-
-                        # also create mgmt VLAN if present
-                        if do_vlans:
-                            try:
-                                mv = ns.get("managementTrafficVlan")
-                                if mv is not None and str(mv).strip() != "":
-                                    if _upsert_vlan(cfg, site, int(str(mv).strip()), name=f"MGMT VLAN {mv}"):
-                                        processed_vlans += 1
-                            except Exception:
-                                pass
-
-                # Switches
-                if do_switches:
-                    switches = _query_all(api, "/venues/switches/query", {"venueId": venue_id, "limit": 1000})
-                    for sw in switches:
-                        name = (sw.get("name") or sw.get("switchName") or sw.get("hostname") or sw.get("serial") or sw.get("serialNumber") or "").strip()
-                        serial = (sw.get("serialNumber") or sw.get("serial") or sw.get("msn") or sw.get("switchSerial") or sw.get("deviceSerial") or "").strip()
-                        model = (sw.get("model") or sw.get("switchModel") or "Switch").strip()
-
-                        ns = sw.get("networkStatus") or {}
-                        mgmt_ip = (ns.get("ipAddress") or sw.get("ip") or sw.get("ipAddress") or sw.get("mgmtIp") or "").strip()
-
-                        _get_or_create_device_infra(cfg, site, location, "Switch", model, name or serial or "Switch", serial=serial)
-                        processed_devices += 1
-                        if mgmt_ip and _upsert_ip(cfg, mgmt_ip):
-                            processed_ips += 1
-
-                # Switch Ports -> dcim.Interface (+ MACs) + VLAN inference
-                if do_interfaces:
-                    vlan_name_map = _build_vlan_name_map_for_venue(api, venue_id) if do_vlans else {}
-                    it_ports, mt_ports, vt_ports = _sync_switch_ports_for_venue(cfg, api, site, location, venue_id, vlan_name_map=vlan_name_map)
-                    processed_ifaces += it_ports
-                    processed_macs += mt_ports
-                    if do_vlans:
-                        processed_vlans += vt_ports
-
-                # Wi-Fi Clients
-                if do_wifi_clients:
-                    clients = _query_all(api, "/venues/aps/clients/query", {"venueId": venue_id, "limit": 5000})
-                    for cl in clients:
-                        if not isinstance(cl, dict):
-                            continue
-
-                        mac = _norm_mac(cl.get("macAddress") or cl.get("mac") or cl.get("clientMac") or "")
-                        ip = (cl.get("ipAddress") or cl.get("ip") or "").strip()
-                        hostname = (cl.get("hostname") or "").strip()
-
-                        netinfo = cl.get("networkInformation") or {}
-                        ssid = (netinfo.get("ssid") or cl.get("ssid") or "").strip()
-
-                        apinfo = cl.get("apInformation") or {}
-                        ap_serial = (apinfo.get("serialNumber") or cl.get("apSerial") or cl.get("connectedApSerial") or "").strip()
-
-                        vinfo = cl.get("venueInformation") or {}
-                        venue_id_effective = (vinfo.get("id") or venue_id or "").strip()
-
-                        if _looks_like_mac(hostname) and not _looks_like_mac(mac):
-                            mac = _norm_mac(hostname)
-                            hostname = ""
-                        if _looks_like_mac(hostname):
-                            hostname = ""
-
-                        if not _looks_like_mac(mac):
-                            for _, v in cl.items():
-                                if isinstance(v, str) and _looks_like_mac(v):
-                                    mac = _norm_mac(v)
-                                    break
-
-                        if not _looks_like_mac(mac):
-                            mac = "unknown"
-
-                        RuckusR1ClientModel.objects.update_or_create(
-                            tenant=cfg.tenant,
-                            mac=mac,
-                            defaults={
-                                "venue_id": venue_id_effective,
-                                "network_id": _safe_str(netinfo.get("id") or cl.get("networkId") or "", 128),
-                                "ruckus_id": ap_serial,
-                                "ip_address": ip or "",
-                                "hostname": hostname or "",
-                                "ssid": ssid or "",
-                                "last_seen": None,
-                                "raw": cl,
-                                "custom_field_data": {},
-                            },
-                        )
-
-                        if mac != "unknown":
-                            _upsert_client_as_dcim_device(cfg, site, location, cl)
-
-                        processed_clients += 1
-
-                # Switch Clients (wired)
-                if do_wired_clients:
-                    sc, it_sc, ct_sc = _sync_switch_clients_for_venue(cfg, api, site, location, venue_id)
-                    processed_clients += sc
-                    processed_ifaces += it_sc
-                    if do_cabling:
-                        processed_cables += ct_sc
-
-                # Venue topologies (cables + wireless links)
-                if do_cabling or do_wireless_links:
-                    it, mt, ct, wt = _sync_topologies_for_venue(cfg, api, site, location, venue_id)
-                    processed_ifaces += it
-                    processed_macs += mt
-                    if do_cabling:
-                        processed_cables += ct
-                    if do_wireless_links:
-                        processed_wlinks += wt
-
-            log.devices = processed_devices
-            log.ips = processed_ips
-            log.clients = processed_clients
-            log.interfaces = processed_ifaces
-            log.macs = processed_macs
-            log.cables = processed_cables
-            log.vlans = processed_vlans
-            log.save()
-
-            cfg.last_sync = _now()
-            cfg.last_sync_status = "ok"
-            cfg.last_sync_message = (
-                f"Sync OK. venues={log.venues} wlans={log.wlans} processed_devices={log.devices} "
-                f"processed_interfaces={log.interfaces} processed_macs={log.macs} processed_cables={log.cables} "
-                f"processed_wlinks={processed_wlinks} processed_vlans={log.vlans} processed_ips={log.ips} "
-                f"processed_clients={log.clients} duration={(_now() - started).total_seconds():.2f}s "
-                f"(toggles: wlans={do_wlans} aps={do_aps} switches={do_switches} interfaces={do_interfaces} "
-                f"wifi_clients={do_wifi_clients} wired_clients={do_wired_clients} cabling={do_cabling} "
-                f"wireless_links={do_wireless_links} vlans={do_vlans}) "
-                f"(mapping: mode={mapping_mode} parent_site={parent_site_ref} child_location={child_location_name})"
+        failed = [r for r in venue_results if r["status"] == "failed"]
+
+        # Authoritative deletes: only for venues fully applied in this run
+        with phase("reconcile", phases, memory), query_scope(qstats, "reconcile"), coalesced_changes(run.summary_changelog) as changes:
+            deleted = _reconcile_authoritative(
+                run, {r["venue_id"] for r in venue_results if r["status"] == "success"}, wlans=run.do_wlans
+            )
+            if changes is not None:
+                totals.update(changes.flush())
+
+        # Remember fingerprints of applied venues; failed venues lose theirs so they are re-applied next run
+        for r in venue_results:
+            fp_key = _fingerprint_key(scope, r["venue_id"])
+            if r["fingerprint"]:
+                fingerprints[fp_key] = r["fingerprint"]
+            elif not (incremental and r["status"] == "unchanged"):
+                fingerprints[fp_key] = None
+
+        # Advance watermarks only after a clean run, so no change is ever skipped
+        state_fields = list(_RUN_STATUS_FIELDS)
+        if not failed:
+            marks.update({k: v.isoformat() for k, v in watermarks.seen.items()})
+            if not incremental and scope == "all":
+                cfg.last_full_sync = started
+                state_fields.append("last_full_sync")
+        log.venue_results = venue_results
+        log.timings = timing_summary(venue_timings, run_timings)
+        log.stats = {
+            "pipeline": pipeline_stats,
+            "change_detection": {
+                "force_full": force_full,
+                "hits": totals["hash_hits"],
+                "misses": totals["hash_misses"],
+                "venues_unchanged": totals["venues_unchanged"],
+            },
+            "reconcile": dict(deleted),
+            "topology": {
+                k: totals[k] for k in (
+                    "topology_edges_applied", "topology_edges_unchanged", "topology_edges_unresolved",
+                    "topology_nodes_created", "topology_stubs", "topologies_applied", "topologies_unchanged",
+                )
+            },
+            "phases": phases,
+            "changelog": {
+                "mode": "summary" if run.summary_changelog else "full",
+                "entries": totals["changelog_entries"],
+                "search_reindexed": totals["search_reindexed"],
+                "search_reindex_failed": totals["search_reindex_failed"],
+            },
+        }
+        if qstats is not None:
+            log.stats["queries"] = qstats.as_dict()
+        if memory is not None:
+            log.stats["memory"] = memory.as_dict()
+        log.devices = totals["devices"]
+        log.ips = totals["ips"]
+        log.clients = totals["clients"]
+        log.interfaces = totals["interfaces"]
+        log.macs = totals["macs"]
+        log.cables = totals["cables"]
+        log.vlans = totals["vlans"]
+        log.save()
+
+        if venues and len(failed) == len(venues):
+            raise RuntimeError(
+                f"All {len(venues)} venues failed. First error ({failed[0]['name']}): {failed[0]['error']}"
             )
-            cfg.save()
 
-            _sync_log_finish(log, "success", cfg.last_sync_message, message=cfg.last_sync_message)
-            return cfg.last_sync_message
+        status = "partial" if failed else "success"
+
+        cfg.last_sync = _now()
+        cfg.last_sync_status = "partial" if failed else "ok"
+        cfg.last_sync_message = (
+            f"Sync {'PARTIAL' if failed else 'OK'}. mode={log.sync_mode} phase={scope} venues={log.venues} venues_failed={len(failed)} "
+            f"venues_unchanged={totals['venues_unchanged']} workers={workers} "
+            f"wlans={log.wlans} "
+            f"processed_devices={log.devices} "
+            f"processed_interfaces={log.interfaces} processed_macs={log.macs} processed_cables={log.cables} "
+            f"processed_wlinks={totals['wlinks']} processed_vlans={log.vlans} processed_ips={log.ips} "
+            f"processed_clients={log.clients} clients_staged={totals['clients_staged']} "
+            f"clients_changed={totals['clients_changed']} clients_unchanged={totals['clients_unchanged']} "
+            f"object_maps={len(idmap)} object_maps_written={totals['object_maps_written']} "
+            f"hash_hits={totals['hash_hits']} hash_misses={totals['hash_misses']} force_full={force_full} "
+            f"deleted={sum(n for ot, n in deleted.items() if ot != 'protected')} deleted_protected={deleted['protected']} "
+            f"changelog={'summary' if run.summary_changelog else 'full'} changelog_entries={totals['changelog_entries']} "
+            f"duration={(_now() - started).total_seconds():.2f}s max_rss={phases['venues'].get('rss_max_mb')}MB "
+            f"{_query_stats_message(log.stats)}"
+            f"client_chunks={totals['client_chunks']} "
+            f"(pipeline: queue_max={pipeline_stats['queue_max']}/{pipeline_stats['queue_depth']} "
+            f"fetch_idle={pipeline_stats['fetch_idle_seconds']}s apply_idle={pipeline_stats['apply_idle_seconds']}s) "
+            f"(toggles: wlans={run.do_wlans} aps={run.do_aps} switches={run.do_switches} interfaces={run.do_interfaces} "
+            f"wifi_clients={run.do_wifi_clients} wired_clients={run.do_wired_clients} cabling={run.do_cabling} "
+            f"wireless_links={run.do_wireless_links} vlans={run.do_vlans}) "
+            f"(mapping: mode={run.mapping_mode} parent_site={run.parent_site_ref} child_location={run.child_location_name})"
+        )
+        if failed:
+            cfg.last_sync_message += " failed_venues=" + ", ".join(r["name"] for r in failed)
+        _save_run_state(cfg, state_fields, fingerprints=fingerprints, watermarks=marks)
+
+        _sync_log_finish(log, status, cfg.last_sync_message, message=cfg.last_sync_message)
+        return cfg.last_sync_message
 
     except Exception as e:
         cfg.last_sync = _now()
         cfg.last_sync_status = "failed"
         cfg.last_sync_message = _safe_str(e, 2000)
-        cfg.save()
+        _save_run_state(cfg, _RUN_STATUS_FIELDS, fingerprints=fingerprints)
 
         _sync_log_finish(log, "failed", "Sync failed", message=_safe_str(e, 4000), error=_safe_str(e, 20000))
-        raise
\ No newline at end of file
+        raise
+    finally:
+        if memory is not None:
+            memory.stop()
+        if profiler is not None:
+            _store_profile(log, profiler)
+        _ref_cache.reset(ref_cache_token)
+
+
+# -----------------
+# On-demand client materialization (client_storage_mode="table")
+# -----------------
+
+def _client_is_wired(client: RuckusR1ClientModel) -> bool:
+    raw = client.get_raw()
+    return not client.ssid and bool(raw.get("switchUnitId") or raw.get("switchSerialNumber") or raw.get("switchSerial"))
+
+
+def _venue_site_location(cfg: RuckusR1TenantConfig, venue_id: str) -> Optional[Tuple[Site, Optional[Location]]]:
+    """Site/Location a venue was synced to (identity map), or None if the venue was never synced."""
+    entry = RuckusR1ObjectMap.objects.filter(tenant_config=cfg, object_type="venue", r1_key=_map_key(venue_id)).first()
+    obj = entry.netbox_object if entry else None
+    if isinstance(obj, Location):
+        return (obj.site, obj)
+    if isinstance(obj, Site):
+        child = str(getattr(cfg, "venue_child_location_name", "") or "").strip()
+        location = Location.objects.filter(site=obj, name=child).first() if cfg.venue_mapping_mode == "both" and child else None
+        return (obj, location)
+    return None
+
+
+def materialize_clients(clients) -> Counter:
+    """
+    Create/update dcim.Device objects (with interface, IP and, for wired clients, the cable to the switch
+    port) for selected RuckusR1Client rows. Intended for client_storage_mode="table", where a sync only
+    keeps the client table. Materialized devices are stored in the identity map, so later syncs keep them
+    up to date and authoritative reconciliation removes them once R1 stops reporting the client.
+    Returns counters: materialized, skipped (no config, venue never synced, no usable MAC).
+    """
+    stats: Counter = Counter()
+    groups: Dict[Tuple[int, str], List[RuckusR1ClientModel]] = {}
+    for client in clients:
+        groups.setdefault((client.tenant_id, client.venue_id), []).append(client)
+
+    configs: Dict[int, Optional[RuckusR1TenantConfig]] = {}
+    idmaps: Dict[int, _IdentityMap] = {}
+    ref_cache_token = _ref_cache.set(_RefCache())
+    try:
+        for (tenant_id, venue_id), rows in groups.items():
+            if tenant_id not in configs:
+                configs[tenant_id] = RuckusR1TenantConfig.objects.filter(tenant_id=tenant_id).first()
+            cfg = configs[tenant_id]
+            target = _venue_site_location(cfg, venue_id) if cfg else None
+            if target is None:
+                stats["skipped"] += len(rows)
+                continue
+            site, location = target
+            if cfg.pk not in idmaps:
+                idmaps[cfg.pk] = _IdentityMap(cfg).load()
+
+            _ensure_device_types(
+                ("Client", (_wired_client_model if _client_is_wired(client) else _wifi_client_model)(client.get_raw()))
+                for client in rows
+            )
+            writer = _MapWriter(idmaps[cfg.pk], venue_id)
+            writer_token = _map_writer.set(writer)
+            try:
+                with transaction.atomic():
+                    for client in rows:
+                        cl = client.get_raw()
+                        if _client_is_wired(client):
+                            _, port_name = _wired_client_row(cl, venue_id)
+                            device = _wired_client_device(cfg, site, location, cl, client.ruckus_id, port_name)[0]
+                        else:
+                            device = _upsert_client_as_dcim_device(cfg, site, location, cl)[0]
+                        stats["materialized" if device else "skipped"] += 1
+                    writer.flush()
+            finally:
+                _map_writer.reset(writer_token)
+    finally:
+        _ref_cache.reset(ref_cache_token)
+    return stats
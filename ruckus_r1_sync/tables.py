@@ -52,17 +52,23 @@ class RuckusR1TenantConfigTable(NetBoxTable):
 
 class RuckusR1SyncLogTable(NetBoxTable):
     tenant = tables.Column(linkify=True)
+    started = tables.DateTimeColumn(linkify=True)
 
     class Meta(NetBoxTable.Meta):
         model = RuckusR1SyncLog
-        fields = ("pk", "tenant", "started", "finished", "status")
-        default_columns = ("tenant", "started", "finished", "status")
+        fields = ("pk", "tenant", "started", "finished", "status", "sync_mode", "phase")
+        default_columns = ("tenant", "started", "finished", "status", "sync_mode", "phase")
 
 
 class RuckusR1ClientTable(NetBoxTable):
     tenant = tables.Column(linkify=True)
+    raw = tables.TemplateColumn(
+        template_code='<a href="{% url "plugins:ruckus_r1_sync:ruckusr1client_raw" pk=record.pk %}">R1 data</a>',
+        verbose_name="Raw",
+        orderable=False,
+    )
 
     class Meta(NetBoxTable.Meta):
         model = RuckusR1Client
-        fields = ("pk", "tenant", "venue", "mac", "ip", "connection_type", "last_seen")
+        fields = ("pk", "tenant", "venue", "mac", "ip", "connection_type", "last_seen", "raw")
         default_columns = ("tenant", "venue", "mac", "ip", "connection_type", "last_seen")
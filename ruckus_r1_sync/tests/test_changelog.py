@@ -0,0 +1,56 @@
+from django.test import TestCase
+
+from dcim.models import Site
+from extras.models import CachedValue
+
+from ruckus_r1_sync.changelog import SYNC_USER_NAME, ChangeCollector, _collector, _object_change_model, coalesced_changes
+
+
+class ChangeCollectorTest(TestCase):
+    def test_create_then_update_is_one_create(self):
+        collector = ChangeCollector()
+        site = Site(pk=1001, name="Site 1", slug="site-1")
+        collector.record_save(site, True)
+        collector.record_save(site, False)
+        self.assertEqual([action for action, _ in collector.changes.values()], ["create"])
+
+    def test_create_then_delete_is_not_reported(self):
+        collector = ChangeCollector()
+        site = Site(pk=1001, name="Site 1", slug="site-1")
+        collector.record_save(site, True)
+        collector.record_delete(site)
+        self.assertEqual(collector.changes, {})
+        self.assertEqual(collector.deletes, [])
+
+    def test_job_context_writes_coalesced_changes(self):
+        with coalesced_changes(True) as changes:
+            site = Site.objects.create(name="Site 1", slug="site-1")
+            site.description = "renamed"
+            site.save()
+            stats = changes.flush()
+
+        self.assertEqual(stats["changelog_entries"], 1)
+        entries = _object_change_model().objects.filter(changed_object_id=site.pk)
+        self.assertEqual(entries.count(), 1)
+        self.assertEqual(entries[0].action, "create")
+        self.assertEqual(entries[0].user_name, SYNC_USER_NAME)
+        self.assertEqual(entries[0].postchange_data["description"], "renamed")
+
+    def test_search_cache_is_refreshed_on_flush(self):
+        with coalesced_changes(True) as changes:
+            if not changes.defer_search:
+                self.skipTest("NetBox's search cache receiver was not found")
+            site = Site.objects.create(name="Deferred Site", slug="deferred-site")
+            self.assertIn((Site, site.pk), changes.reindex)
+            self.assertFalse(CachedValue.objects.filter(object_id=site.pk, value="Deferred Site").exists())
+            stats = changes.flush()
+
+        self.assertEqual(stats["search_reindexed"], 1)
+        self.assertTrue(CachedValue.objects.filter(object_id=site.pk, value="Deferred Site").exists())
+        self.assertIsNone(_collector.get())
+
+    def test_saves_outside_a_collector_are_indexed_right_away(self):
+        with coalesced_changes(True):
+            pass  # installs the stand-in receiver
+        site = Site.objects.create(name="Plain Site", slug="plain-site")
+        self.assertTrue(CachedValue.objects.filter(object_id=site.pk, value="Plain Site").exists())
@@ -0,0 +1,87 @@
+import datetime
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tenancy.models import Tenant
+
+from ruckus_r1_sync.models import RuckusR1Client, RuckusR1TenantConfig
+from ruckus_r1_sync.sync import _WIFI_CLIENT_FIELDS, _bulk_upsert_clients, _copy_upsert_clients
+
+SEEN = timezone.now().replace(microsecond=0) - datetime.timedelta(minutes=5)
+
+
+def _row(mac, **values):
+    row = {
+        "mac": mac,
+        "venue_id": "venue-1",
+        "network_id": "net-1",
+        "ruckus_id": "",
+        "ip_address": "10.0.0.10",
+        "hostname": f"host-{mac[-2:]}",
+        "ssid": "corp",
+        "last_seen": SEEN,
+        "raw": {"macAddress": mac},
+        "raw_compressed": None,
+        "raw_hash": "",
+        "custom_field_data": {},
+    }
+    row.update(values)
+    return row
+
+
+@override_settings(PLUGINS_CONFIG={"ruckus_r1_sync": {"client_history": False}})
+class ClientUpsertTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tenant = Tenant.objects.create(name="Tenant 1", slug="tenant-1")
+        cls.cfg = RuckusR1TenantConfig.objects.create(
+            tenant=tenant, name="R1", ruckus_tenant_id="r1-tenant", client_id="id", client_secret="secret",
+        )
+
+    def _rows(self, **values):
+        return [_row("aa:bb:cc:00:00:01", **values), _row("aa:bb:cc:00:00:02")]
+
+    def _stored(self):
+        return {
+            c.mac: (c.ip_address, c.hostname, c.last_seen)
+            for c in RuckusR1Client.objects.filter(tenant=self.cfg.tenant)
+        }
+
+    def _assert_idempotent(self, upsert):
+        upsert(self.cfg, self._rows(), _WIFI_CLIENT_FIELDS)
+        first = self._stored()
+        self.assertEqual(len(first), 2)
+
+        stats = upsert(self.cfg, self._rows(), _WIFI_CLIENT_FIELDS)
+        self.assertEqual(self._stored(), first)
+        self.assertEqual(stats.staged, 2)
+
+        stats = upsert(self.cfg, self._rows(ip_address="10.0.0.99"), _WIFI_CLIENT_FIELDS)
+        stored = self._stored()
+        self.assertEqual(len(stored), 2)
+        self.assertEqual(stored["aa:bb:cc:00:00:01"][0], "10.0.0.99")
+        self.assertEqual(stored["aa:bb:cc:00:00:02"], first["aa:bb:cc:00:00:02"])
+        return stats
+
+    def test_bulk_upsert_is_idempotent(self):
+        self._assert_idempotent(_bulk_upsert_clients)
+
+    def test_copy_upsert_is_idempotent(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("COPY ingest needs PostgreSQL")
+        _copy_upsert_clients(self.cfg, self._rows(), _WIFI_CLIENT_FIELDS)
+        stats = _copy_upsert_clients(self.cfg, self._rows(), _WIFI_CLIENT_FIELDS)
+        self.assertEqual((stats.changed, stats.unchanged), (0, 2))
+
+        stats = self._assert_idempotent(_copy_upsert_clients)
+        self.assertEqual((stats.changed, stats.unchanged), (1, 1))
+
+    def test_copy_upsert_keeps_newest_last_seen(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("COPY ingest needs PostgreSQL")
+        _copy_upsert_clients(self.cfg, self._rows(), _WIFI_CLIENT_FIELDS)
+        older = SEEN - datetime.timedelta(days=1)
+        _copy_upsert_clients(self.cfg, self._rows(last_seen=older, ip_address="10.0.0.99"), _WIFI_CLIENT_FIELDS)
+        self.assertEqual(self._stored()["aa:bb:cc:00:00:01"], ("10.0.0.99", "host-01", SEEN))
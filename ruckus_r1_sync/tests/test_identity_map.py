@@ -0,0 +1,86 @@
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+
+from dcim.models import Site
+from tenancy.models import Tenant
+
+from ruckus_r1_sync.models import RuckusR1ObjectMap, RuckusR1TenantConfig
+from ruckus_r1_sync.sync import _IdentityMap, _MapWriter, _SeenKeys
+
+
+class MapWriterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tenant = Tenant.objects.create(name="Tenant 1", slug="tenant-1")
+        cls.cfg = RuckusR1TenantConfig.objects.create(
+            tenant=tenant, name="R1", ruckus_tenant_id="r1-tenant", client_id="id", client_secret="secret",
+        )
+        cls.site = Site.objects.create(name="HQ", slug="hq")
+        cls.site_ct = ContentType.objects.get_for_model(Site).id
+
+    def _writer(self, venue_id="venue-1", **kwargs):
+        return _MapWriter(_IdentityMap(self.cfg).load(), venue_id, **kwargs)
+
+    def _rows(self):
+        return {
+            m.r1_key: (m.netbox_content_type_id, m.netbox_object_id, m.last_r1_name, m.content_hash, m.venue_id)
+            for m in RuckusR1ObjectMap.objects.filter(tenant_config=self.cfg)
+        }
+
+    def test_flush_writes_and_reloads_entries(self):
+        writer = self._writer()
+        writer.remember("venue", "venue-1", self.site, "HQ")
+        writer.set_hash("venue", "venue-1", "h1")
+        # the in-memory map only takes the entries once the venue transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(writer.flush(), 1)
+            self.assertIsNone(writer.idmap.get("venue", "venue-1"))
+
+        self.assertEqual(self._rows(), {"venue-1": (self.site_ct, self.site.pk, "HQ", "h1", "venue-1")})
+        self.assertEqual(writer.idmap.get("venue", "venue-1"), (self.site_ct, self.site.pk, "HQ", "h1", "venue-1"))
+        self.assertEqual(_IdentityMap(self.cfg).load().get("venue", "venue-1"), writer.idmap.get("venue", "venue-1"))
+
+    def test_unchanged_entries_are_not_rewritten(self):
+        writer = self._writer()
+        writer.remember("venue", "venue-1", self.site, "HQ")
+        writer.set_hash("venue", "venue-1", "h1")
+        writer.flush()
+
+        writer = self._writer()
+        writer.remember("venue", "venue-1", self.site, "HQ")
+        self.assertTrue(writer.unchanged("venue", "venue-1", "h1"))
+        self.assertEqual(writer.flush(), 0)
+        self.assertFalse(writer.unchanged("venue", "venue-1", "h2"))
+        self.assertEqual(writer.hash_stats, {"hash_hits": 1, "hash_misses": 1})
+
+    def test_rename_updates_the_row(self):
+        writer = self._writer()
+        writer.remember("venue", "venue-1", self.site, "HQ")
+        writer.set_hash("venue", "venue-1", "h1")
+        writer.flush()
+
+        writer = self._writer()
+        writer.remember("venue", "venue-1", self.site, "Headquarters")
+        self.assertEqual(writer.flush(), 1)
+        # same object: the stored hash is kept
+        self.assertEqual(self._rows()["venue-1"], (self.site_ct, self.site.pk, "Headquarters", "h1", "venue-1"))
+        self.assertEqual(RuckusR1ObjectMap.objects.filter(tenant_config=self.cfg).count(), 1)
+
+    def test_force_full_never_reports_unchanged(self):
+        writer = self._writer()
+        writer.remember("venue", "venue-1", self.site, "HQ")
+        writer.set_hash("venue", "venue-1", "h1")
+        writer.flush()
+        self.assertFalse(self._writer(force_full=True).unchanged("venue", "venue-1", "h1"))
+
+    def test_seen_from_another_venue_moves_the_entry(self):
+        writer = self._writer()
+        writer.remember("device", "ap-1", self.site, "AP")
+        writer.flush()
+
+        seen = _SeenKeys()
+        writer = self._writer("venue-2", seen=seen)
+        writer.mark_seen("device", "ap-1")
+        writer.flush()
+        self.assertEqual(self._rows()["ap-1"][4], "venue-2")
+        self.assertEqual(seen.get("device"), {"ap-1"})
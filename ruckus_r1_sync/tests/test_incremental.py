@@ -0,0 +1,66 @@
+import datetime
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from ruckus_r1_sync.ruckus_api import RuckusR1Client
+from ruckus_r1_sync.sync import _INCREMENTAL_PAGE_SIZE, _Watermarks, _query_endpoint
+
+NOW = datetime.datetime(2024, 5, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+class _PagedClient(RuckusR1Client):
+    """Serves `rows` as R1 query pages and records every request body."""
+
+    def __init__(self, rows):
+        super().__init__("https://api.eu.ruckus.cloud", "tenant", "client", "secret")
+        self.rows = rows
+        self.requests = []
+
+    def _post(self, path, body):
+        self.requests.append(dict(body))
+        start = (body["page"] - 1) * body["pageSize"]
+        return {"data": self.rows[start:start + body["pageSize"]], "totalCount": len(self.rows)}
+
+
+def _ap(minutes_ago):
+    ts = NOW - datetime.timedelta(minutes=minutes_ago)
+    return {"serialNumber": f"ap-{minutes_ago}", "lastUpdatedTime": ts.isoformat()}
+
+
+class QueryEndpointTest(SimpleTestCase):
+    def _run(self, client, cutoff=None):
+        return SimpleNamespace(api=client, watermarks=_Watermarks(cutoffs={"aps": cutoff} if cutoff else {}))
+
+    def test_incremental_query_stops_paging_at_cutoff(self):
+        # newest first, as requested; 3 pages worth of rows, only the first 5 are newer than the cutoff
+        client = _PagedClient([_ap(m) for m in range(3 * _INCREMENTAL_PAGE_SIZE)])
+        run = self._run(client, cutoff=NOW - datetime.timedelta(minutes=4, seconds=30))
+
+        rows = _query_endpoint(run, "aps", "venue-1", 5000)
+
+        self.assertEqual([r["serialNumber"] for r in rows], [f"ap-{m}" for m in range(5)])
+        self.assertEqual(len(client.requests), 1)
+        self.assertEqual(client.requests[0]["sortOrder"], "DESC")
+        self.assertEqual(client.requests[0]["pageSize"], _INCREMENTAL_PAGE_SIZE)
+        self.assertEqual(run.watermarks.seen["aps"], NOW)
+
+    def test_incremental_query_pages_until_cutoff(self):
+        client = _PagedClient([_ap(m) for m in range(3 * _INCREMENTAL_PAGE_SIZE)])
+        cutoff = NOW - datetime.timedelta(minutes=_INCREMENTAL_PAGE_SIZE + 10, seconds=30)
+
+        rows = _query_endpoint(self._run(client, cutoff=cutoff), "aps", "venue-1", 5000)
+
+        self.assertEqual(len(rows), _INCREMENTAL_PAGE_SIZE + 11)
+        self.assertEqual([b["page"] for b in client.requests], [1, 2])
+
+    def test_full_query_is_one_request(self):
+        client = _PagedClient([_ap(m) for m in range(50)])
+        run = self._run(client)
+
+        rows = _query_endpoint(run, "aps", "venue-1", 1000)
+
+        self.assertEqual(len(rows), 50)
+        self.assertEqual(len(client.requests), 1)
+        self.assertNotIn("sortOrder", client.requests[0])
+        self.assertEqual(client.requests[0]["limit"], 1000)
@@ -0,0 +1,147 @@
+import time
+import tracemalloc
+
+from django.test import SimpleTestCase
+
+from ruckus_r1_sync.instrumentation import (
+    MemoryTracker,
+    QueryStats,
+    RssSampler,
+    _query_scope,
+    current_rss_mb,
+    phase,
+    timing_summary,
+)
+
+
+def _execute(sql, params, many, context):
+    return "result"
+
+
+class TimingSummaryTest(SimpleTestCase):
+    def test_phases_add_up_in_sync_order(self):
+        summary = timing_summary(
+            [
+                {"venue_id": "v1", "name": "HQ", "timings": {
+                    "switches": {"api": 1.0, "decode": 0.5, "apply": 2.0},
+                    "aps": {"api": 0.25, "decode": 0.0, "apply": 1.0},
+                }},
+                {"venue_id": "v2", "name": "", "timings": {"aps": {"api": 0.75, "decode": 0.25, "apply": 0.0}}},
+            ],
+            {"venue_mapping": {"api": 0.0, "decode": 0.0, "apply": 0.5}},
+        )
+        self.assertEqual(list(summary["phases"]), ["venue_mapping", "aps", "switches"])
+        self.assertEqual(summary["phases"]["aps"], {"api": 1.0, "decode": 0.25, "apply": 1.0, "total": 2.25})
+        self.assertEqual(summary["phases"]["venue_mapping"]["total"], 0.5)
+        self.assertEqual(summary["venues"]["v1"]["total"], 4.75)
+        self.assertEqual(summary["venues"]["v2"]["name"], "v2")
+
+    def test_unknown_phases_sort_last(self):
+        summary = timing_summary([{"venue_id": "v1", "timings": {"custom": {"apply": 1.0}, "topology": {"apply": 1.0}}}])
+        self.assertEqual(list(summary["phases"]), ["topology", "custom"])
+
+    def test_empty(self):
+        self.assertEqual(timing_summary([]), {"phases": {}, "venues": {}})
+
+
+class QueryStatsTest(SimpleTestCase):
+    def _run(self, stats, venue_id, phase_name, statements):
+        token = _query_scope.set((venue_id, phase_name))
+        try:
+            for sql in statements:
+                self.assertEqual(stats(_execute, sql, (), False, {}), "result")
+        finally:
+            _query_scope.reset(token)
+
+    def test_counts_per_phase_and_venue(self):
+        stats = QueryStats()
+        self._run(stats, "v1", "aps", ["SELECT 1", "SELECT 1", "SELECT 2"])
+        self._run(stats, "", "reconcile", ["DELETE 1"])
+        data = stats.as_dict()
+        self.assertEqual(data["total"]["queries"], 4)
+        self.assertEqual(data["phases"]["aps"]["queries"], 3)
+        self.assertEqual(data["phases"]["reconcile"]["queries"], 1)
+        self.assertEqual(set(data["venues"]), {"v1"})
+        self.assertEqual(data["venues"]["v1"]["aps"]["queries"], 3)
+
+    def test_repeated_and_slowest(self):
+        stats = QueryStats(slowest=2)
+        self._run(stats, "v1", "aps", ["SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3"])
+        data = stats.as_dict()
+        self.assertEqual(data["repeated"][0]["sql"], "SELECT 1")
+        self.assertEqual(data["repeated"][0]["count"], 2)
+        self.assertEqual(len(data["repeated"]), 2)
+        self.assertEqual(len(data["slowest"]), 2)
+        self.assertEqual(data["slowest"][0]["venue_id"], "v1")
+
+    def test_failing_statement_is_counted(self):
+        def _fail(sql, params, many, context):
+            raise RuntimeError("boom")
+
+        stats = QueryStats()
+        with self.assertRaises(RuntimeError):
+            stats(_fail, "SELECT 1", (), False, {})
+        self.assertEqual(stats.as_dict()["phases"]["run"]["queries"], 1)
+
+
+class MemoryTrackerTest(SimpleTestCase):
+    def setUp(self):
+        if tracemalloc.is_tracing():
+            self.skipTest("tracemalloc is already tracing")
+        self.tracker = MemoryTracker(top=3)
+        self.tracker.start()
+        self.addCleanup(self.tracker.stop)
+
+    def test_phase_records_growth(self):
+        with self.tracker.phase("aps"):
+            kept = [bytearray(1024) for _ in range(2048)]
+        data = self.tracker.as_dict()["phases"]["aps"]
+        self.assertGreaterEqual(data["net_mb"], 1.5)
+        self.assertGreaterEqual(data["peak_mb"], data["net_mb"])
+        self.assertTrue(data["top_growth"])
+        self.assertLessEqual(len(data["top_growth"]), 3)
+        del kept
+
+    def test_nested_blocks_see_inner_peak(self):
+        with self.tracker.venue("v1", "fetch"):
+            with self.tracker.venue("v2", "fetch"):
+                temp = bytearray(4 * 1048576)
+                del temp
+        venues = self.tracker.as_dict()["venues"]
+        for venue_id in ("v1", "v2"):
+            self.assertGreaterEqual(venues[venue_id]["fetch"]["peak_mb"], 3.9)
+            self.assertLess(venues[venue_id]["fetch"]["net_mb"], 1)
+
+    def test_stop_leaves_foreign_tracing_alone(self):
+        self.tracker.stop()
+        self.assertFalse(tracemalloc.is_tracing())
+        tracemalloc.start()
+        try:
+            tracker = MemoryTracker()
+            tracker.start()
+            tracker.stop()
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+
+
+class RssSamplerTest(SimpleTestCase):
+    def setUp(self):
+        if current_rss_mb() is None:
+            self.skipTest("RSS is read from /proc")
+
+    def test_sees_memory_freed_before_the_end(self):
+        with RssSampler(interval=0.05) as sampler:
+            start = current_rss_mb()
+            blob = b"x" * (64 * 1048576)
+            time.sleep(0.3)
+            del blob
+        self.assertGreaterEqual(sampler.max_mb, start + 48)
+
+    def test_phase_records_sampled_max(self):
+        phases = {}
+        with phase("prepare", phases):
+            pass
+        entry = phases["prepare"]
+        self.assertNotIn("peak_rss_mb", entry)
+        self.assertGreaterEqual(entry["rss_max_mb"], min(entry["rss_start_mb"], entry["rss_end_mb"]))
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from ruckus_r1_sync.sync import _CLIENT_STREAM_DEPTH, _ClientStream, _VenuePayload, _run_venue_pipeline
+
+VENUES = [{"id": f"venue-{i}", "name": f"Venue {i}"} for i in range(8)]
+
+
+@override_settings(PLUGINS_CONFIG={"ruckus_r1_sync": {"pipeline_queue_depth": 1}})
+class VenuePipelineTest(SimpleTestCase):
+    def setUp(self):
+        self.run = SimpleNamespace(memory=None, profiler=None)
+        self.fetched = []
+        self.stop_events = []
+        self.closed = []
+        self.lock = threading.Lock()
+
+    def _fetch(self, run, index, venue_id, venue_name, stop=None):
+        with self.lock:
+            self.fetched.append(venue_id)
+            self.stop_events.append(stop)
+        payload = _VenuePayload(index=index, venue_id=venue_id, venue_name=venue_name)
+        payload.wifi_clients = _ClientStream(stop)
+        close = payload.close
+
+        def _close():
+            with self.lock:
+                self.closed.append(venue_id)
+            close()
+
+        payload.close = _close
+        return payload
+
+    def _stream(self, run, payload):
+        # more pages than the stream holds: only a reading (or closed) venue lets this return
+        for i in range(_CLIENT_STREAM_DEPTH + 3):
+            if not payload.wifi_clients.put([{"macAddress": f"aa:bb:cc:00:00:{i:02x}"}]):
+                break
+        payload.wifi_clients.finish()
+
+    def _pipeline(self, apply_fn, workers):
+        with mock.patch("ruckus_r1_sync.sync._fetch_venue", self._fetch), \
+                mock.patch("ruckus_r1_sync.sync._stream_venue_clients", self._stream):
+            return _run_venue_pipeline(self.run, VENUES, workers, apply_fn)
+
+    def _assert_stopped(self):
+        self.assertFalse([t.name for t in threading.enumerate() if t.name.startswith("ruckus-r1-fetch")])
+
+    def test_outcomes_in_venue_order(self):
+        def _apply(run, payload):
+            rows = sum(len(page) for page in payload.wifi_clients)
+            time.sleep(0.01 * (payload.index % 3))
+            return {"venue_id": payload.venue_id, "rows": rows}, Counter(venues=1)
+
+        outcomes, stats = self._pipeline(_apply, workers=3)
+        self.assertEqual([result["venue_id"] for result, _ in outcomes], [v["id"] for v in VENUES])
+        self.assertEqual({result["rows"] for result, _ in outcomes}, {_CLIENT_STREAM_DEPTH + 3})
+        self.assertEqual(stats["queue_depth"], 1)
+        self.assertLessEqual(stats["queue_max"], 1)
+        self.assertEqual(sorted(self.closed), sorted(v["id"] for v in VENUES))
+        self._assert_stopped()
+
+    def test_apply_failure_stops_and_drains_the_fetch_stage(self):
+        def _apply(run, payload):
+            if payload.index == 2:
+                raise RuntimeError("apply failed")
+            list(payload.wifi_clients)
+            return {"venue_id": payload.venue_id}, Counter()
+
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                self.fetched, self.stop_events, self.closed = [], [], []
+                with self.assertRaisesMessage(RuntimeError, "apply failed"):
+                    self._pipeline(_apply, workers)
+                self._assert_stopped()
+                self.assertLess(len(self.fetched), len(VENUES))
+                self.assertTrue(all(stop.is_set() for stop in self.stop_events))
+                self.assertIn("venue-2", self.closed)
+
+    def test_unread_clients_do_not_block_the_fetch_worker(self):
+        def _apply(run, payload):
+            return {"venue_id": payload.venue_id}, Counter()  # never reads its clients
+
+        outcomes, _ = self._pipeline(_apply, workers=1)
+        self.assertEqual(len(outcomes), len(VENUES))
+        self._assert_stopped()
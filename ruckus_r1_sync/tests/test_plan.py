@@ -0,0 +1,79 @@
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+
+from dcim.models import Device, Site
+from tenancy.models import Tenant
+
+from ruckus_r1_sync.models import RuckusR1ObjectMap, RuckusR1TenantConfig
+from ruckus_r1_sync.sync import (
+    _IdentityMap,
+    _VenuePayload,
+    _device_hash,
+    _make_sync_run,
+    _plan_venue,
+    _stale_entries,
+)
+
+
+def _ap(name, serial):
+    return {"name": name, "serialNumber": serial, "model": "R750", "networkStatus": {"ipAddress": "10.0.0.1"}}
+
+
+class PlanVenueTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tenant = Tenant.objects.create(name="Tenant 1", slug="tenant-1")
+        cls.cfg = RuckusR1TenantConfig.objects.create(
+            tenant=tenant, name="R1", ruckus_tenant_id="r1-tenant", client_id="id", client_secret="secret",
+        )
+        cls.site = Site.objects.create(name="HQ", slug="hq", tenant=tenant)
+        cls._map("venue", "venue-1", Site, cls.site.pk, "", name="HQ")
+        unchanged = _device_hash(cls.site.pk, None, "Access Point", "R750", "ap-1", "S1", "10.0.0.1", None)
+        cls._map("device", "S1", Device, 1, "venue-1", content_hash=unchanged)
+        cls._map("device", "S2", Device, 2, "venue-1", content_hash="outdated")
+        cls._map("device", "S4", Device, 4, "venue-1", content_hash="outdated")
+
+    @classmethod
+    def _map(cls, object_type, key, model, pk, venue_id, *, name="", content_hash=""):
+        RuckusR1ObjectMap.objects.create(
+            tenant_config=cls.cfg,
+            object_type=object_type,
+            r1_key=key,
+            netbox_content_type=ContentType.objects.get_for_model(model),
+            netbox_object_id=pk,
+            venue_id=venue_id,
+            last_r1_name=name,
+            content_hash=content_hash,
+        )
+
+    def _run(self):
+        return _make_sync_run(self.cfg, None, site_group=None, idmap=_IdentityMap(self.cfg).load(), plan_only=True)
+
+    def _plan(self, run, venue_id="venue-1", venue_name="HQ", **data):
+        return _plan_venue(run, _VenuePayload(index=0, venue_id=venue_id, venue_name=venue_name, **data))
+
+    def test_counts_against_the_identity_map(self):
+        run = self._run()
+        result, counts = self._plan(run, aps=[_ap("ap-1", "S1"), _ap("ap-2", "S2"), _ap("ap-3", "S3")])
+
+        self.assertEqual(result["status"], "planned")
+        self.assertEqual(counts, {
+            "venue:unchanged": 1, "device:unchanged": 1, "device:update": 1, "device:create": 1,
+            "topology_nodes": 0, "topology_edges": 0,
+        })
+        self.assertEqual(set(_stale_entries(run, "device", {"venue-1"})), {"S4"})
+
+    def test_writes_nothing(self):
+        maps = RuckusR1ObjectMap.objects.count()
+        _, counts = self._plan(self._run(), venue_id="venue-2", venue_name="Branch", aps=[_ap("ap-9", "S9")])
+
+        self.assertEqual(counts["venue:create"], 1)
+        self.assertEqual(counts["device:create"], 1)
+        self.assertEqual(list(Site.objects.values_list("name", flat=True)), ["HQ"])
+        self.assertFalse(Device.objects.exists())
+        self.assertEqual(RuckusR1ObjectMap.objects.count(), maps)
+
+    def test_failed_venue_has_no_counts(self):
+        result, counts = self._plan(self._run(), aps=[_ap("ap-1", "S1")], error="R1 timeout")
+        self.assertEqual((result["status"], result["error"]), ("failed", "R1 timeout"))
+        self.assertEqual(counts, {})
@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase, override_settings
+
+from dcim.models import Device, DeviceRole, DeviceType, Interface, Manufacturer, Site
+from tenancy.models import Tenant
+
+from ruckus_r1_sync.models import RuckusR1ObjectMap, RuckusR1TenantConfig
+from ruckus_r1_sync.sync import _IdentityMap, _SeenKeys, _reconcile_authoritative
+
+
+class ReconcileAuthoritativeTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tenant = Tenant.objects.create(name="Tenant 1", slug="tenant-1")
+        cls.cfg = RuckusR1TenantConfig.objects.create(
+            tenant=tenant, name="R1", ruckus_tenant_id="r1-tenant", client_id="id", client_secret="secret",
+            authoritative_devices=True, authoritative_interfaces=True,
+        )
+        site = Site.objects.create(name="HQ", slug="hq")
+        manufacturer = Manufacturer.objects.create(name="RUCKUS Networks", slug="ruckus-networks")
+        device_type = DeviceType.objects.create(manufacturer=manufacturer, model="R750", slug="r750")
+        role = DeviceRole.objects.create(name="Access Point", slug="access-point")
+
+        cls.devices = {}
+        for key, venue_id in (("ap-1", "venue-1"), ("ap-2", "venue-1"), ("ap-3", "venue-1"), ("ap-4", "venue-2")):
+            device = Device.objects.create(name=key, device_type=device_type, role=role, site=site)
+            cls.devices[key] = device
+            cls._map("device", key, Device, device.pk, venue_id)
+        interface = Interface.objects.create(device=cls.devices["ap-2"], name="eth0", type="1000base-t")
+        cls._map("interface", "ap-2:eth0", Interface, interface.pk, "venue-1")
+        # mapped object that was already deleted in NetBox
+        cls._map("device", "ap-gone", Device, 999999, "venue-1")
+
+    @classmethod
+    def _map(cls, object_type, key, model, pk, venue_id):
+        RuckusR1ObjectMap.objects.create(
+            tenant_config=cls.cfg,
+            object_type=object_type,
+            r1_key=key,
+            netbox_content_type=ContentType.objects.get_for_model(model),
+            netbox_object_id=pk,
+            venue_id=venue_id,
+        )
+
+    def _run(self, **values):
+        run = SimpleNamespace(
+            cfg=self.cfg, incremental=False, seen=_SeenKeys(), idmap=_IdentityMap(self.cfg).load(),
+            do_aps=True, do_switches=True, do_wifi_clients=True, do_wired_clients=True, do_cabling=True,
+            do_wireless_links=True, do_interfaces=True, do_vlans=True, do_wlans=True,
+        )
+        for k, v in values.items():
+            setattr(run, k, v)
+        run.seen.add("device", "ap-1")
+        return run
+
+    def _remaining(self):
+        return set(Device.objects.filter(pk__in=[d.pk for d in self.devices.values()]).values_list("name", flat=True))
+
+    def _mapped(self, object_type):
+        return set(RuckusR1ObjectMap.objects.filter(tenant_config=self.cfg, object_type=object_type).values_list("r1_key", flat=True))
+
+    def test_unseen_objects_of_reconciled_venues_are_deleted(self):
+        run = self._run()
+        deleted = _reconcile_authoritative(run, {"venue-1"}, wlans=False)
+
+        self.assertEqual(self._remaining(), {"ap-1", "ap-4"})
+        self.assertEqual(deleted["device"], 2)
+        self.assertEqual(deleted["interface"], 1)
+        self.assertFalse(Interface.objects.filter(name="eth0").exists())
+        self.assertEqual(self._mapped("device"), {"ap-1", "ap-4"})
+        self.assertEqual(self._mapped("interface"), set())
+        self.assertEqual(run.idmap.keys("device"), {"ap-1", "ap-4"})
+
+    @override_settings(PLUGINS_CONFIG={"ruckus_r1_sync": {"reconcile_batch_size": 1}})
+    def test_batches_delete_everything(self):
+        deleted = _reconcile_authoritative(self._run(), {"venue-1", "venue-2"}, wlans=False)
+        self.assertEqual(self._remaining(), {"ap-1"})
+        self.assertEqual(deleted["device"], 3)
+        self.assertEqual(self._mapped("device"), {"ap-1"})
+
+    def test_flag_off_keeps_objects(self):
+        self.cfg.authoritative_devices = False
+        self.cfg.authoritative_interfaces = False
+        self.assertEqual(_reconcile_authoritative(self._run(), {"venue-1"}, wlans=False), {})
+        self.assertEqual(len(self._remaining()), 4)
+        self.assertEqual(len(self._mapped("device")), 5)
+
+    def test_incremental_run_deletes_nothing(self):
+        self.assertEqual(_reconcile_authoritative(self._run(incremental=True), {"venue-1"}, wlans=False), {})
+        self.assertEqual(len(self._remaining()), 4)
+
+    def test_types_not_fetched_completely_are_kept(self):
+        # without wired clients the run cannot tell which client devices/interfaces are gone
+        deleted = _reconcile_authoritative(self._run(do_wired_clients=False), {"venue-1"}, wlans=False)
+        self.assertEqual(deleted, {})
+        self.assertEqual(len(self._remaining()), 4)
@@ -0,0 +1,49 @@
+from django.test import TestCase
+
+from tenancy.models import Tenant
+
+from ruckus_r1_sync.models import RuckusR1TenantConfig
+from ruckus_r1_sync.sync import _RUN_STATUS_FIELDS, _save_run_state
+
+OLD = "2024-05-01T10:00:00+00:00"
+NEW = "2024-05-01T11:00:00+00:00"
+
+
+class SaveRunStateTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tenant = Tenant.objects.create(name="Tenant 1", slug="tenant-1")
+        cls.cfg = RuckusR1TenantConfig.objects.create(
+            tenant=tenant, name="R1", ruckus_tenant_id="r1-tenant", client_id="id", client_secret="secret",
+            venue_fingerprints={"infrastructure:venue-1": "infra", "clients:venue-1": "clients"},
+            sync_watermarks={"aps": NEW, "wifi_clients": OLD},
+        )
+
+    def _stored(self):
+        return RuckusR1TenantConfig.objects.get(pk=self.cfg.pk)
+
+    def test_newest_watermark_wins(self):
+        _save_run_state(self.cfg, (), watermarks={"aps": OLD, "wifi_clients": NEW, "switches": OLD})
+        self.assertEqual(self._stored().sync_watermarks, {"aps": NEW, "wifi_clients": NEW, "switches": OLD})
+        self.assertEqual(self.cfg.sync_watermarks, self._stored().sync_watermarks)
+
+    def test_only_own_fingerprint_keys_change(self):
+        _save_run_state(self.cfg, (), fingerprints={"clients:venue-1": "clients-2", "clients:venue-2": None})
+        self.assertEqual(
+            self._stored().venue_fingerprints, {"infrastructure:venue-1": "infra", "clients:venue-1": "clients-2"}
+        )
+        _save_run_state(self.cfg, (), fingerprints={"clients:venue-1": None})
+        self.assertEqual(self._stored().venue_fingerprints, {"infrastructure:venue-1": "infra"})
+
+    def test_concurrent_edits_are_kept(self):
+        # the UI disables the config and another phase stores its fingerprint while this run is going
+        RuckusR1TenantConfig.objects.filter(pk=self.cfg.pk).update(
+            enabled=False, venue_fingerprints={"infrastructure:venue-1": "infra-2", "clients:venue-1": "clients"},
+        )
+        self.cfg.last_sync_status = "success"
+        _save_run_state(self.cfg, _RUN_STATUS_FIELDS, fingerprints={"clients:venue-1": "clients-2"})
+
+        stored = self._stored()
+        self.assertFalse(stored.enabled)
+        self.assertEqual(stored.last_sync_status, "success")
+        self.assertEqual(stored.venue_fingerprints, {"infrastructure:venue-1": "infra-2", "clients:venue-1": "clients-2"})
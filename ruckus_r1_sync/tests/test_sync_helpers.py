@@ -0,0 +1,173 @@
+import datetime
+import threading
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from ruckus_r1_sync.sync import (
+    _CLIENT_FINGERPRINT_FIELDS,
+    _CLIENT_NESTED_FIELDS,
+    _CLIENT_STREAM_DEPTH,
+    _ClientStream,
+    _IdentityMap,
+    _SeenKeys,
+    _VenuePayload,
+    _fingerprint_key,
+    _last_per_mac,
+    _parse_watermark,
+    _rows_digest,
+    _stale_entries,
+    _venue_device_types,
+)
+
+
+class LastPerMacTest(SimpleTestCase):
+    def test_last_row_per_mac_wins(self):
+        decoded = [
+            ({"mac": "aa:aa"}, {"n": 1}),
+            ({"mac": "bb:bb"}, {"n": 2}),
+            ({"mac": "aa:aa"}, {"n": 3}),
+        ]
+        self.assertEqual(_last_per_mac(decoded), [({"mac": "aa:aa"}, {"n": 3}), ({"mac": "bb:bb"}, {"n": 2})])
+
+    def test_unknown_mac_is_dropped(self):
+        decoded = [({"mac": "unknown"}, {}), ({"mac": "aa:aa"}, {})]
+        self.assertEqual(_last_per_mac(decoded), [({"mac": "aa:aa"}, {})])
+
+    def test_custom_key(self):
+        decoded = [("aa:aa", 1), ("aa:aa", 2), ("unknown", 3)]
+        self.assertEqual(_last_per_mac(decoded, key=lambda item: item[0]), [("aa:aa", 2)])
+
+
+class StaleEntriesTest(SimpleTestCase):
+    def setUp(self):
+        self.idmap = _IdentityMap(cfg=None)
+        self.idmap.merge({
+            ("device", "ap-1"): (1, 10, "ap-1", "h1", "venue-1"),
+            ("device", "ap-2"): (1, 11, "ap-2", "h2", "venue-1"),
+            ("device", "ap-3"): (1, 12, "ap-3", "h3", "venue-2"),
+            ("vlan", "10"): (2, 20, "10", "h4", "venue-1"),
+        })
+        self.run = SimpleNamespace(idmap=self.idmap, seen=_SeenKeys())
+
+    def test_unseen_entries_of_reconciled_venues(self):
+        self.run.seen.add("device", "ap-1")
+        stale = _stale_entries(self.run, "device", {"venue-1"})
+        self.assertEqual(stale, {"ap-2": (1, 11, "ap-2", "h2", "venue-1")})
+
+    def test_other_venues_and_types_are_kept(self):
+        stale = _stale_entries(self.run, "device", {"venue-2"})
+        self.assertEqual(set(stale), {"ap-3"})
+        self.assertEqual(_stale_entries(self.run, "interface", {"venue-1"}), {})
+
+    def test_nothing_stale_when_all_seen(self):
+        for key in ("ap-1", "ap-2"):
+            self.run.seen.add("device", key)
+        self.assertEqual(_stale_entries(self.run, "device", {"venue-1"}), {})
+
+
+class FingerprintKeyTest(SimpleTestCase):
+    def test_full_scope_uses_venue_id(self):
+        self.assertEqual(_fingerprint_key("all", "venue-1"), "venue-1")
+
+    def test_phase_scopes_are_prefixed(self):
+        self.assertEqual(_fingerprint_key("clients", "venue-1"), "clients:venue-1")
+        self.assertNotEqual(_fingerprint_key("infrastructure", "venue-1"), _fingerprint_key("clients", "venue-1"))
+
+
+class ParseWatermarkTest(SimpleTestCase):
+    def test_aware_timestamp(self):
+        dt = _parse_watermark("2024-05-01T10:00:00+02:00")
+        self.assertEqual(dt, datetime.datetime(2024, 5, 1, 8, 0, tzinfo=datetime.timezone.utc))
+
+    def test_naive_timestamp_is_utc(self):
+        dt = _parse_watermark("2024-05-01T10:00:00")
+        self.assertEqual(dt, datetime.datetime(2024, 5, 1, 10, 0, tzinfo=datetime.timezone.utc))
+
+    def test_invalid_values(self):
+        for value in (None, "", "yesterday", 42):
+            self.assertIsNone(_parse_watermark(value))
+
+
+class VenueDeviceTypesTest(SimpleTestCase):
+    def _run(self, **flags):
+        values = {
+            "cfg": SimpleNamespace(allow_stub_devices=False), "do_aps": True, "do_switches": True,
+            "do_interfaces": True, "do_cabling": True, "do_wireless_links": True,
+        }
+        values.update(flags)
+        return SimpleNamespace(**values)
+
+    def _payload(self):
+        return _VenuePayload(
+            index=0, venue_id="venue-1", venue_name="HQ",
+            aps=[{"model": "R750"}, {"apModel": "R750"}, {}],
+            switches=[{"model": "ICX7150"}],
+            ports=[{"switchModel": "ICX8200"}],
+            topology={"nodes": [{"type": "Switch", "model": "ICX7650"}, {"type": "Unknown"}]},
+        )
+
+    def test_models_of_all_phases(self):
+        self.assertEqual(_venue_device_types(self._run(), self._payload()), {
+            ("RUCKUS Networks", "R750"), ("RUCKUS Networks", "Access Point"), ("RUCKUS Networks", "ICX7150"),
+            ("RUCKUS Networks", "ICX7650"), ("RUCKUS Networks", "Device"),
+        })
+
+    def test_disabled_phases(self):
+        run = self._run(cfg=SimpleNamespace(allow_stub_devices=True), do_aps=False, do_cabling=False, do_wireless_links=False)
+        self.assertEqual(
+            _venue_device_types(run, self._payload()),
+            {("RUCKUS Networks", "ICX7150"), ("RUCKUS Networks", "ICX8200")},
+        )
+
+
+class ClientStreamTest(SimpleTestCase):
+    def _pages(self, n):
+        return [[{"macAddress": f"aa:bb:cc:00:00:{i:02x}", "hostname": f"host-{i}"}] for i in range(n)]
+
+    def _produce(self, stream, pages, error=""):
+        def _run():
+            for page in pages:
+                if not stream.put(page):
+                    break
+            stream.finish(error)
+
+        thread = threading.Thread(target=_run, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        return thread
+
+    def test_pages_arrive_in_order_and_bounded(self):
+        stream = _ClientStream()
+        pages = self._pages(6)
+        self._produce(stream, pages)
+        received = []
+        for page in stream:
+            self.assertLessEqual(stream._q.qsize(), _CLIENT_STREAM_DEPTH)
+            received.append(page)
+        self.assertEqual(received, pages)
+        self.assertEqual(stream.rows, 6)
+        rows = [row for page in pages for row in page]
+        self.assertEqual(stream.digest(), _rows_digest(rows, _CLIENT_FINGERPRINT_FIELDS, _CLIENT_NESTED_FIELDS))
+
+    def test_fetch_error_fails_the_reader(self):
+        stream = _ClientStream()
+        self._produce(stream, self._pages(1), error="R1 down")
+        with self.assertRaisesMessage(RuntimeError, "R1 down"):
+            list(stream)
+
+    def test_close_releases_a_blocked_fetch_worker(self):
+        stream = _ClientStream()
+        thread = self._produce(stream, self._pages(_CLIENT_STREAM_DEPTH + 3))
+        next(iter(stream))
+        stream.close()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertLess(stream.rows, _CLIENT_STREAM_DEPTH + 3)
+
+    def test_pipeline_stop_releases_the_reader(self):
+        stop = threading.Event()
+        stream = _ClientStream(stop)
+        stop.set()
+        with self.assertRaises(RuntimeError):
+            list(stream)
@@ -0,0 +1,106 @@
+from collections import Counter
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase
+
+from dcim.models import Site
+from tenancy.models import Tenant
+
+from ruckus_r1_sync.models import RuckusR1TenantConfig, RuckusR1TopologySnapshot
+from ruckus_r1_sync.sync import (
+    _IdentityMap,
+    _MapWriter,
+    _SeenKeys,
+    _VenuePayload,
+    _apply_topology,
+    _map_writer,
+    _topology_hash,
+)
+
+
+def _topology(**node):
+    return {
+        "nodes": [{"type": "Switch", "name": "sw-1", "serial": "S1", **node}, {"type": "AP", "name": "ap-1", "serial": "A1"}],
+        "edges": [{"connectionType": "Wired", "fromSerial": "S1", "toSerial": "A1", "connectedPort": "1/1/1"}],
+    }
+
+
+class TopologySnapshotTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tenant = Tenant.objects.create(name="Tenant 1", slug="tenant-1")
+        cls.cfg = RuckusR1TenantConfig.objects.create(
+            tenant=tenant, name="R1", ruckus_tenant_id="r1-tenant", client_id="id", client_secret="secret",
+        )
+        cls.site = Site.objects.create(name="HQ", slug="hq")
+
+    def setUp(self):
+        self.applied = 0
+        self.seen = _SeenKeys()
+        token = _map_writer.set(_MapWriter(_IdentityMap(self.cfg), "venue-1", seen=self.seen))
+        self.addCleanup(_map_writer.reset, token)
+
+    def _sync_topology(self, cfg, site, location, blob, stats=None, keys=None):
+        self.applied += 1
+        keys.setdefault("device", set()).update({"S1", "A1"})
+        keys.setdefault("cable", set()).add("A1:eth0|S1:1/1/1")
+        return (1, 1, 0, 0)
+
+    def _apply(self, blob, force_full=False):
+        counts = Counter()
+        run = SimpleNamespace(cfg=self.cfg, force_full=force_full)
+        payload = _VenuePayload(index=0, venue_id="venue-1", venue_name="HQ", topology=blob)
+        with mock.patch("ruckus_r1_sync.sync._sync_topologies_for_venue", self._sync_topology):
+            result = _apply_topology(run, self.site, None, payload, counts)
+        return result, counts
+
+    def _snapshot(self):
+        return RuckusR1TopologySnapshot.objects.get(tenant_config=self.cfg, venue_id="venue-1")
+
+    def test_first_run_applies_and_stores_the_graph(self):
+        result, counts = self._apply(_topology())
+        self.assertEqual((result, counts["topologies_applied"], self.applied), ((1, 1, 0, 0), 1, 1))
+
+        snapshot = self._snapshot()
+        self.assertEqual(snapshot.get_blob(), _topology())
+        self.assertEqual((snapshot.node_count, snapshot.edge_count), (2, 1))
+        self.assertEqual(snapshot.applied_keys, {"device": ["A1", "S1"], "cable": ["A1:eth0|S1:1/1/1"]})
+        self.assertEqual(snapshot.previous_hash, "")
+        self.assertTrue(snapshot.changed_in_last_check)
+
+    def test_unchanged_graph_is_skipped_and_its_keys_stay_seen(self):
+        self._apply(_topology())
+        self.assertEqual(self.seen.get("device"), set())  # the patched apply marks nothing itself
+
+        result, counts = self._apply(_topology())
+        self.assertEqual((result, counts["topologies_unchanged"], self.applied), ((0, 0, 0, 0), 1, 1))
+        self.assertEqual(self.seen.get("device"), {"S1", "A1"})
+        self.assertEqual(self.seen.get("cable"), {"A1:eth0|S1:1/1/1"})
+        self.assertFalse(self._snapshot().changed_in_last_check)
+
+    def test_changed_graph_is_applied_again(self):
+        self._apply(_topology())
+        first = self._snapshot().content_hash
+
+        _, counts = self._apply(_topology(name="sw-1-renamed"))
+        snapshot = self._snapshot()
+        self.assertEqual((counts["topologies_applied"], self.applied), (1, 2))
+        self.assertEqual(snapshot.previous_hash, first)
+        self.assertNotEqual(snapshot.content_hash, first)
+        self.assertTrue(snapshot.changed_in_last_check)
+
+    def test_force_full_applies_an_unchanged_graph(self):
+        self._apply(_topology())
+        self._apply(_topology(), force_full=True)
+        self.assertEqual(self.applied, 2)
+
+    def test_hash_ignores_unused_fields(self):
+        self.assertEqual(
+            _topology_hash(self.site, None, False, _topology()),
+            _topology_hash(self.site, None, False, _topology(uptime=12345, clientCount=7)),
+        )
+        self.assertNotEqual(
+            _topology_hash(self.site, None, False, _topology()),
+            _topology_hash(self.site, None, True, _topology()),
+        )
@@ -26,5 +26,8 @@ urlpatterns = [
     path("configs/<int:pk>/refresh-venues/", views.RuckusR1TenantConfigRefreshVenuesView.as_view(), name="ruckusr1tenantconfig_refresh_venues"),
 
     path("logs/", views.RuckusR1SyncLogListView.as_view(), name="ruckusr1synclog_list"),
+    path("logs/<int:pk>/", views.RuckusR1SyncLogView.as_view(), name="ruckusr1synclog"),
+    path("logs/<int:pk>/profile/", views.RuckusR1SyncLogProfileView.as_view(), name="ruckusr1synclog_profile"),
     path("clients/", views.RuckusR1ClientListView.as_view(), name="ruckusr1client_list"),
+    path("clients/<int:pk>/raw/", views.RuckusR1ClientRawView.as_view(), name="ruckusr1client_raw"),
 ]
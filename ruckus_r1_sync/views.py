@@ -1,15 +1,16 @@
 from __future__ import annotations
 
 from django.contrib import messages
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.views import View
 
 from netbox.views import generic
 
 from .forms import RuckusR1TenantConfigForm
-from .models import RuckusR1TenantConfig, RuckusR1SyncLog, RuckusR1Client
+from .models import RuckusR1TenantConfig, RuckusR1SyncLog, RuckusR1SyncProfile, RuckusR1Client
 from .tables import RuckusR1TenantConfigTable, RuckusR1SyncLogTable, RuckusR1ClientTable
-from .sync import run_sync_for_tenantconfig, _make_client, _query_all
+from .sync import config_run_lock, run_sync_for_tenantconfig, _make_client, _query_all
 
 
 class RuckusR1TenantConfigListView(generic.ObjectListView):
@@ -29,7 +30,8 @@ class RuckusR1TenantConfigView(generic.ObjectView):
         ("Stub Objects", ("allow_stub_devices", "allow_stub_vlans", "allow_stub_wireless")),
         ("Sync Toggles", ("sync_wlans", "sync_aps", "sync_switches", "sync_interfaces", "sync_wifi_clients", "sync_wired_clients", "sync_cabling", "sync_wireless_links", "sync_vlans")),
         ("Authoritative", ("authoritative_devices", "authoritative_interfaces", "authoritative_ips", "authoritative_vlans", "authoritative_wireless", "authoritative_cabling")),
-        ("Status", ("last_sync", "last_sync_status", "last_sync_message")),
+        ("Performance", ("venue_workers", "incremental_sync", "full_sync_interval_hours", "changelog_mode", "client_storage_mode", "client_raw_storage", "query_stats", "profile_sync", "memory_stats")),
+        ("Status", ("last_sync", "last_full_sync", "last_sync_status", "last_sync_message")),
     )
 
 
@@ -46,7 +48,15 @@ class RuckusR1TenantConfigRunView(View):
     def post(self, request, pk):
         cfg = get_object_or_404(RuckusR1TenantConfig, pk=pk)
         try:
-            msg = run_sync_for_tenantconfig(cfg)
+            with config_run_lock(cfg) as acquired:
+                if not acquired:
+                    messages.warning(request, "Another sync of this config is running; try again when it has finished.")
+                    return redirect("plugins:ruckus_r1_sync:ruckusr1tenantconfig", pk=pk)
+                msg = run_sync_for_tenantconfig(
+                    cfg,
+                    force_full=bool(request.POST.get("force_full")),
+                    plan_only=bool(request.POST.get("plan_only")),
+                )
             messages.success(request, msg)
         except Exception as e:
             messages.error(request, f"Sync failed: {e}")
@@ -83,7 +93,31 @@ class RuckusR1SyncLogListView(generic.ObjectListView):
     actions = ()
 
 
+class RuckusR1SyncLogView(generic.ObjectView):
+    # the page shows the profile summary only; the pstats blob is loaded by the download view
+    queryset = RuckusR1SyncLog.objects.select_related("profile").defer("profile__data")
+    template_name = "ruckus_r1_sync/ruckusr1synclog.html"
+
+
+class RuckusR1SyncLogProfileView(View):
+    def get(self, request, pk):
+        log = get_object_or_404(RuckusR1SyncLog.objects.restrict(request.user, "view"), pk=pk)
+        try:
+            profile = log.profile
+        except RuckusR1SyncProfile.DoesNotExist:
+            raise Http404("This sync run was not profiled.")
+        response = HttpResponse(profile.get_data(), content_type="application/octet-stream")
+        response["Content-Disposition"] = f'attachment; filename="{profile.filename}"'
+        return response
+
+
 class RuckusR1ClientListView(generic.ObjectListView):
     queryset = RuckusR1Client.objects.all()
     table = RuckusR1ClientTable
     actions = ()
+
+
+class RuckusR1ClientRawView(View):
+    def get(self, request, pk):
+        client = get_object_or_404(RuckusR1Client.objects.restrict(request.user, "view"), pk=pk)
+        return JsonResponse(client.get_raw(), json_dumps_params={"indent": 2})